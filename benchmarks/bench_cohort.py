@@ -0,0 +1,84 @@
+"""
+Escrita em lote e consultas agregadas da base da unidade (smartcalc_core.cohort).
+
+Grava ``--rows`` observações sintéticas de ``--beds`` leitos espalhadas por
+``--days`` dias (ROX, gasometrias e IRRS misturados, como chegariam da
+ingestão) e mede a vazão de escrita e o tempo de cada consulta dos painéis.
+
+Uso:
+    python -m benchmarks.bench_cohort [--rows 2000000] [--beds 300] [--days 30] [--db /tmp/coorte.db]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from smartcalc_core.cohort import HOUR_MS, CohortStore, now_ms
+
+
+def fill(cohort, rows, beds, days, rng):
+    # Leituras em ordem de tempo: 60% ROX, 20% gasometria, 20% IRRS
+    end = now_ms()
+    times = np.sort(rng.integers(end - days * 24 * HOUR_MS, end, rows))
+    patients = rng.integers(1, beds + 1, rows).astype(str)
+    kind = rng.random(rows)
+    spo2, fio2, rr = rng.uniform(80, 100, rows), rng.uniform(0.21, 1.0, rows), rng.uniform(10, 40, rows)
+    pao2, tidal_volume = rng.uniform(50, 200, rows), rng.uniform(150, 600, rows)
+    for i in range(rows):
+        if kind[i] < 0.6:
+            cohort.add(patients[i], times[i], spo2=spo2[i], fio2=fio2[i], rr=rr[i])
+        elif kind[i] < 0.8:
+            cohort.add(patients[i], times[i], pao2=pao2[i], fio2=fio2[i])
+        else:
+            cohort.add(patients[i], times[i], rr=rr[i], tidal_volume=tidal_volume[i])
+    cohort.flush()
+    # Uma extubação por leito nos últimos dias
+    for bed in range(1, beds + 1):
+        cohort.record_extubation(str(bed), end - int(rng.integers(0, days * 24)) * HOUR_MS)
+    return end
+
+
+def timed(function, repeat=5):
+    # Menor tempo das repetições (a primeira prepara o statement)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--beds", type=int, default=300)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--db", help="Banco a usar (padrão: temporário, apagado no fim)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, "coorte.db")
+        cohort = CohortStore(path, batch_size=10_000, flush_interval=0)
+        start = time.perf_counter()
+        end = fill(cohort, args.rows, args.beds, args.days, np.random.default_rng(args.seed))
+        elapsed = time.perf_counter() - start
+        print(f"{args.rows} observações gravadas em {elapsed:.1f} s ({args.rows / elapsed:,.0f}/s)")
+
+        queries = {
+            "P/F < 150 e ROX < 3,85 (24 h)": lambda: cohort.patients_below(end=end, pao2_fio2=150, rox_index=3.85),
+            "ROX por hora (24 h)": lambda: cohort.hourly("rox_index", 24, end),
+            "P/F por hora (7 dias)": lambda: cohort.hourly("pao2_fio2", 24 * 7, end),
+            "IRRS antes da extubação (24 h)": lambda: cohort.before_extubation("irrs", 24, args.days * 24, end),
+        }
+        for label, query in queries.items():
+            seconds, result = timed(query)
+            print(f"{label:35s} {seconds * 1000:8.2f} ms  ({len(result)} linhas)")
+        cohort.close()
+
+
+if __name__ == "__main__":
+    main()
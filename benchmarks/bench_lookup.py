@@ -0,0 +1,86 @@
+"""
+Compara as tabelas pré-calculadas (smartcalc_core.lookup) com o cálculo direto.
+
+Para cada calculadora de entradas discretas, gera N consultas aleatórias
+dentro da grade e mede:
+
+    loop escalar   uma chamada de smartcalc_core.formulas por linha
+    batch          smartcalc_core.batch (NumPy, cálculo direto)
+    tabela         LookupTables, a partir dos valores
+    índices        LookupTables.at, a partir das posições na grade
+
+Uso:
+    python -m benchmarks.bench_lookup [--rows 1000000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from smartcalc_core import batch, formulas
+from smartcalc_core.lookup import LookupTables
+
+GENDERS = np.array(["Masculino", "Feminino"])
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def _scalar_loop(function, *columns):
+    for row in zip(*columns):
+        function(*row)
+
+
+def cases(rows, rng):
+    gender_idx = rng.integers(0, 2, rows)
+    gender = GENDERS[gender_idx]
+    age_idx = rng.integers(0, 83, rows)
+    spo2 = rng.integers(0, 101, rows)
+    fio2_idx = rng.integers(0, 80, rows)
+    rr = rng.integers(1, 101, rows)
+    aj = rng.integers(0, 101, rows)
+    age_chumlea = rng.integers(0, 105, rows)
+    height_idx = rng.integers(0, 81, rows)
+    return {
+        "pimax": (formulas.calculate_predicted_pimax, batch.calculate_predicted_pimax,
+                  (gender, age_idx + 18), (gender_idx, age_idx)),
+        "pemax": (formulas.calculate_predicted_pemax, batch.calculate_predicted_pemax,
+                  (gender, age_idx + 18), (gender_idx, age_idx)),
+        "height_chumlea": (formulas.calculate_height_chumlea, batch.calculate_height_chumlea,
+                           (gender, age_chumlea, aj), (gender_idx, age_chumlea, aj)),
+        "ideal_weight": (formulas.calculate_ideal_weight, batch.calculate_ideal_weight,
+                         (gender, height_idx + 130), (gender_idx, height_idx)),
+        "rox_index": (formulas.calculate_rox_index, batch.calculate_rox_index,
+                      (spo2, np.round(0.21 + fio2_idx * 0.01, 2), rr), (spo2, fio2_idx, rr)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    tables = LookupTables()
+    print(f"Montagem das tabelas: {(time.perf_counter() - start) * 1000:.1f} ms\n")
+    print(f"{'calculadora':16s} {'loop escalar':>14s} {'batch':>10s} {'tabela':>10s} {'índices':>10s}   (ms para {args.rows} linhas)")
+
+    rng = np.random.default_rng(0)
+    for name, (scalar, direct, values, indices) in cases(args.rows, rng).items():
+        table = getattr(tables, name)
+        scalar_args = [column.tolist() for column in values]
+        results = (
+            _timed(_scalar_loop, scalar, *scalar_args),
+            _timed(direct, *values),
+            _timed(table, *values),
+            _timed(table.at, *indices),
+        )
+        print(f"{name:16s} " + " ".join(f"{t * 1000:>{w}.1f}" for t, w in zip(results, (14, 10, 10, 10))))
+
+
+if __name__ == "__main__":
+    main()
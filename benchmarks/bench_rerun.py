@@ -0,0 +1,57 @@
+"""
+Mede o tempo de um rerun completo do smartcalc.py em cada categoria do menu.
+
+Usa o ``streamlit.testing.v1.AppTest``, que executa o script como o servidor
+faria, mas sem navegador. O tempo inclui a sobrecarga do AppTest, que é a
+mesma antes e depois de uma mudança.
+
+Uso:
+    python -m benchmarks.bench_rerun [--reruns 30]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "smartcalc.py")
+CATEGORIES = ("Oxigenoterapia de Alto Fluxo", "Força Muscular Respiratória", "Ventilação Mecânica", "Outros Índices")
+
+# Ventilação Mecânica com uma única calculadora montada
+SINGLE_CALCULATOR = "Driving Pressure (ΔP)"
+
+
+def bench_category(category, reruns, calculator=None):
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    at.sidebar.radio[0].set_value(category).run()
+    if calculator:
+        at.sidebar.selectbox(key="vm_calculator").set_value(calculator).run()
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+    if at.exception:
+        raise RuntimeError(f"{category}: {at.exception[0].value}")
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=30)
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    cases = [(category, category, None) for category in CATEGORIES]
+    cases.append((f"Ventilação: {SINGLE_CALCULATOR}", "Ventilação Mecânica", SINGLE_CALCULATOR))
+    for label, category, calculator in cases:
+        timings = bench_category(category, args.reruns, calculator)
+        print(f"{label:40s} mediana {statistics.median(timings) * 1000:7.2f} ms  mínimo {min(timings) * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Vazão dos backends de sessão com 1 a N processos trabalhando em paralelo.
+
+Cada processo simula requisições de clínicos: carrega o histórico de uma
+sessão qualquer (como um nó que nunca viu a sessão), calcula uma fórmula e
+grava o resultado. Com ``sqlite``, todos os processos usam o mesmo banco,
+como nós diferentes atrás do balanceador; com ``memory``, cada processo tem o
+seu, o que dá o teto sem compartilhamento.
+
+Uso:
+    python -m benchmarks.bench_sessions [--workers 4] [--requests 2000] [--sessions 200]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from smartcalc_core.formulas import calculate_rox_index
+from smartcalc_core.sessions import create_backend
+
+CATEGORY = "oxigenoterapia"
+
+
+def _worker(url, requests, sessions, seed, start_event):
+    backend = create_backend(url)
+    rng = random.Random(seed)
+    start_event.wait()
+    begin = time.perf_counter()
+    for _ in range(requests):
+        session = f"sessao-{rng.randrange(sessions)}"
+        history = backend.history(session, CATEGORY, 50)
+        value = calculate_rox_index(rng.randint(85, 99), 0.4, rng.randint(12, 35))
+        t = int(time.time() * 1000)
+        history.record("ROX Index", value, t)
+        backend.append(session, CATEGORY, "ROX Index", value, t)
+    return time.perf_counter() - begin
+
+
+def run(url, workers, requests, sessions):
+    # Devolve requisições por segundo somando todos os processos
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Manager() as manager:
+        start_event = manager.Event()
+        with ctx.Pool(workers) as pool:
+            results = [
+                pool.apply_async(_worker, (url, requests, sessions, seed, start_event)) for seed in range(workers)
+            ]
+            time.sleep(0.5)
+            begin = time.perf_counter()
+            start_event.set()
+            for result in results:
+                result.get()
+            elapsed = time.perf_counter() - begin
+    return workers * requests / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Número máximo de processos")
+    parser.add_argument("--requests", type=int, default=2000, help="Requisições por processo")
+    parser.add_argument("--sessions", type=int, default=200, help="Sessões distintas")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, url in (("memory", "memory"), ("sqlite", f"sqlite:///{os.path.join(tmp, 'sessions.db')}")):
+            create_backend(url)  # cria o esquema antes dos processos
+            base = None
+            for workers in range(1, args.workers + 1):
+                rate = run(url, workers, args.requests, args.sessions)
+                base = base or rate
+                print(f"{name:8s} {workers:3d} processo(s): {rate:10.0f} req/s  (x{rate / base:4.2f})")
+
+
+if __name__ == "__main__":
+    main()
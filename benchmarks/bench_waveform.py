@@ -0,0 +1,55 @@
+"""
+Quantos canais de curvas um processo analisa em tempo real.
+
+Simula ``--channels`` leitos com curvas de ``--fs`` Hz e entrega a cada canal
+um trecho de ``--chunk`` segundos por vez, como chegaria do ventilador. Mede o
+tempo de processamento por segundo de sinal de todos os canais juntos; abaixo
+de 1 s, o processo acompanha o tempo real.
+
+Uso:
+    python -m benchmarks.bench_waveform [--channels 300] [--fs 200] [--seconds 60]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from smartcalc_core.waveform import WaveformChannel, synthesize
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--channels", type=int, default=300)
+    parser.add_argument("--fs", type=int, default=200, help="Amostras por segundo")
+    parser.add_argument("--seconds", type=int, default=60, help="Duração do sinal simulado")
+    parser.add_argument("--chunk", type=float, default=1.0, help="Segundos por trecho entregue")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    signals = []
+    for _ in range(args.channels):
+        rr = int(rng.integers(12, 30))
+        pressure, flow = synthesize(
+            args.seconds * rr // 60 + 1, args.fs, resistance=rng.uniform(5, 20), compliance=rng.uniform(20, 80),
+            peep=rng.uniform(5, 12), rr=rr, noise=0.2, rng=rng,
+        )
+        signals.append((pressure[: args.seconds * args.fs], flow[: args.seconds * args.fs]))
+    channels = [WaveformChannel(args.fs) for _ in range(args.channels)]
+
+    step = int(args.chunk * args.fs)
+    breaths = 0
+    start = time.perf_counter()
+    for i in range(0, args.seconds * args.fs, step):
+        for channel, (pressure, flow) in zip(channels, signals):
+            breaths += len(channel.push(pressure[i:i + step], flow[i:i + step])["start"])
+    elapsed = time.perf_counter() - start
+
+    per_second = elapsed / args.seconds
+    print(f"{args.channels} canais a {args.fs} Hz, {args.seconds} s de sinal, {breaths} ciclos analisados")
+    print(f"{per_second * 1000:.1f} ms de CPU por segundo de sinal ({per_second * 100:.1f}% de um núcleo)")
+    print(f"capacidade estimada: {args.channels / per_second:.0f} canais em tempo real")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Teste de carga: centenas de sessões simultâneas num servidor do SmartCalc.
+
+Sobe um ``streamlit run smartcalc.py`` (ou usa um já rodando, com ``--url``)
+e abre ``--sessions`` conexões websocket, como navegadores. Cada sessão repete
+fluxos de uso sorteados: trocar a categoria do menu, preencher os selectboxes
+do ROX, da PImáx ou da ventilação mecânica e apertar Calcular. As mensagens
+são as mesmas do navegador (protobuf do Streamlit): o estado dos widgets vai
+no pedido de rerun, e cliques dentro de um fragmento rodam só o fragmento.
+
+Relata a vazão (reruns por segundo), a latência de rerun (do pedido ao fim
+do script; p50/p95/p99) e a memória do servidor por sessão (RSS depois de
+todas as sessões abertas, menos o RSS depois da sessão de aquecimento). As
+variáveis SMARTCALC_* valem para o servidor iniciado aqui, então a mesma
+carga compara configurações, por exemplo ``SMARTCALC_CACHE_SIZE=0``.
+
+Uso:
+    python -m benchmarks.loadtest [--sessions 200] [--flows 5] [--think 1.0] [--ramp 10]
+    python -m benchmarks.loadtest --url http://localhost:8501 --pid 12345
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "smartcalc.py")
+
+MENU_LABEL = "Escolha uma categoria:"
+
+
+# Fluxos: cada yield é um rerun, como um clique do usuário. Os widgets são
+# indicados pela key (ou pelo rótulo, se não tiverem key).
+def _rox_flow(rng):
+    yield {MENU_LABEL: "Oxigenoterapia de Alto Fluxo"}
+    yield {"rox_spo2": rng.randint(85, 99)}
+    yield {"rox_fio2": rng.choice((0.3, 0.4, 0.5, 0.6))}
+    yield {"rox_fr": rng.randint(14, 35)}
+    yield {"rox_button": True}
+
+
+def _pimax_flow(rng):
+    yield {MENU_LABEL: "Força Muscular Respiratória"}
+    yield {"pimax_gender": rng.choice(("Masculino", "Feminino"))}
+    yield {"pimax_age": rng.randint(18, 90)}
+    yield {"pimax_button": True}
+
+
+def _ventilation_flow(rng):
+    yield {MENU_LABEL: "Ventilação Mecânica"}
+    peep = rng.randint(5, 15)
+    yield {"dp_plateau": peep + rng.randint(8, 20)}
+    yield {"dp_peep": peep}
+    yield {"dp_button": True}
+    yield {"rva_peak": rng.randint(25, 40)}
+    yield {"rva_plateau": rng.randint(15, 24)}
+    yield {"rva_flow": 60}
+    yield {"rva_button": True}
+
+
+FLOWS = (_rox_flow, _pimax_flow, _ventilation_flow)
+
+
+def rss_bytes(pid):
+    """Memória residente do processo ``pid`` (Linux); None se não der para ler."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _percentile(values, q):
+    # ``values`` já ordenados; percentil pelo posto mais próximo
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
+
+
+class Session:
+    """
+    Uma sessão do navegador: guarda os widgets vistos e o estado enviado.
+
+    Parâmetros:
+        url (str): Endereço websocket (``ws://host:porta/_stcore/stream``).
+        timeout (float): Tempo máximo de um rerun (s).
+    """
+
+    def __init__(self, url, timeout=60.0):
+        self.url = url
+        self.timeout = timeout
+        self.widgets = {}  # key (ou rótulo) -> (id, fragment_id)
+        self.states = {}  # id -> WidgetState
+        self.exceptions = 0
+        self.query_string = ""  # último page_info_changed, devolvido em cada rerun
+        self._socket = None
+
+    async def connect(self):
+        self._socket = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        await self._socket.close()
+
+    def _register(self, msg):
+        delta = msg.delta
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.exceptions += 1
+            return
+        proto = getattr(element, kind) if kind else None
+        widget_id = getattr(proto, "id", "")
+        if not widget_id.startswith("$$ID-"):
+            return
+        key = widget_id.rsplit("-", 1)[1]
+        self.widgets[key if key != "None" else proto.label] = (widget_id, delta.fragment_id)
+
+    def _state(self, widget_id, value):
+        state = WidgetState(id=widget_id)
+        if value is True:
+            state.trigger_value = True
+        else:
+            state.string_value = str(value)
+        return state
+
+    async def rerun(self, changes=None):
+        """Aplica ``changes`` (key -> valor), pede o rerun e devolve a latência (s)."""
+        fragment_id = ""
+        triggers = []
+        for name, value in (changes or {}).items():
+            widget_id, fragment_id = self.widgets[name]
+            state = self._state(widget_id, value)
+            if value is True:
+                triggers.append(state)
+            else:
+                self.states[widget_id] = state
+        msg = BackMsg()
+        msg.rerun_script.widget_states.widgets.extend(list(self.states.values()) + triggers)
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.query_string = self.query_string
+        if not fragment_id:
+            # Rerun completo: os widgets da página anterior podem sumir
+            self.widgets = {}
+
+        start = time.perf_counter()
+        await self._socket.send(msg.SerializeToString())
+        while True:
+            data = await asyncio.wait_for(self._socket.recv(), self.timeout)
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof("type")
+            if kind == "delta":
+                self._register(forward)
+            elif kind == "page_info_changed":
+                self.query_string = forward.page_info_changed.query_string
+            elif kind == "script_finished":
+                if forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    elapsed = time.perf_counter() - start
+                    break
+        if not fragment_id:
+            # Como o navegador, só envia o estado dos widgets que estão na página
+            mounted = {widget_id for widget_id, _ in self.widgets.values()}
+            self.states = {widget_id: state for widget_id, state in self.states.items() if widget_id in mounted}
+        return elapsed
+
+
+class LoadTest:
+    """
+    Executa as sessões e acumula latências e erros.
+
+    Parâmetros:
+        url (str): Endereço websocket do servidor.
+        flows (int): Fluxos sorteados por sessão.
+        think (float): Pausa máxima (s) entre cliques, sorteada por clique.
+        ramp (float): Segundos para abrir todas as sessões.
+        seed (int): Semente dos sorteios.
+    """
+
+    def __init__(self, url, flows=5, think=1.0, ramp=10.0, seed=0):
+        self.url = url
+        self.flows = flows
+        self.think = think
+        self.ramp = ramp
+        self.seed = seed
+        self.latencies = []
+        self.errors = []
+
+    async def run_session(self, index, sessions, opened):
+        rng = random.Random(self.seed * 1_000_003 + index)
+        await asyncio.sleep(self.ramp * index / sessions)
+        session = Session(self.url)
+        try:
+            await session.connect()
+            self.latencies.append(await session.rerun())
+            opened.append(session)
+            for _ in range(self.flows):
+                for changes in rng.choice(FLOWS)(rng):
+                    if self.think:
+                        await asyncio.sleep(rng.uniform(0, self.think))
+                    self.latencies.append(await session.rerun(changes))
+            if session.exceptions:
+                self.errors.append(f"sessão {index}: {session.exceptions} exceção(ões) no script")
+        except Exception as e:  # noqa: BLE001 - uma sessão com erro não derruba o teste
+            self.errors.append(f"sessão {index}: {type(e).__name__}: {e}")
+        return session
+
+    async def run(self, sessions, pid=None):
+        """Roda ``sessions`` sessões ao mesmo tempo e devolve o relatório."""
+        opened = []
+        memory_before = rss_bytes(pid) if pid else None
+        start = time.perf_counter()
+        tasks = [self.run_session(i, sessions, opened) for i in range(sessions)]
+        results = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        # Com todas as sessões ainda abertas
+        memory_after = rss_bytes(pid) if pid else None
+        for session in results:
+            if session._socket is not None:
+                await session.close()
+
+        latencies = sorted(self.latencies)
+        report = {
+            "sessions": sessions,
+            "opened": len(opened),
+            "reruns": len(latencies),
+            "errors": len(self.errors),
+            "elapsed": elapsed,
+            "throughput": len(latencies) / elapsed,
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else float("nan"),
+            "memory_per_session": None,
+            "rss": memory_after,
+        }
+        if memory_before and memory_after and opened:
+            report["memory_per_session"] = (memory_after - memory_before) / len(opened)
+        return report
+
+
+def start_server(port, timeout=60.0):
+    """Sobe ``streamlit run smartcalc.py`` na porta e espera o health check."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"O servidor não respondeu em {timeout:.0f} s.")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200, help="Sessões abertas ao mesmo tempo")
+    parser.add_argument("--flows", type=int, default=5, help="Fluxos por sessão")
+    parser.add_argument("--think", type=float, default=1.0, help="Pausa máxima entre cliques (s)")
+    parser.add_argument("--ramp", type=float, default=10.0, help="Segundos para abrir todas as sessões")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Servidor já rodando (padrão: sobe um em porta livre)")
+    parser.add_argument("--pid", type=int, help="PID do servidor de --url, para medir a memória")
+    parser.add_argument("--output", help="Arquivo JSON com o relatório")
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    server = None
+    if args.url:
+        base, pid = args.url.rstrip("/"), args.pid
+    else:
+        port = _free_port()
+        server = start_server(port)
+        base, pid = f"http://localhost:{port}", server.pid
+    url = base.replace("http", "ws", 1) + "/_stcore/stream"
+
+    try:
+        # Uma sessão antes da medida: importações e caches do servidor não contam por sessão
+        asyncio.run(LoadTest(url, flows=len(FLOWS), think=0, ramp=0, seed=-1).run(1))
+        test = LoadTest(url, args.flows, args.think, args.ramp, args.seed)
+        report = asyncio.run(test.run(args.sessions, pid))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print(f"{report['opened']} de {report['sessions']} sessões abertas, {report['reruns']} reruns "
+          f"em {report['elapsed']:.1f} s ({report['errors']} com erro)")
+    print(f"vazão: {report['throughput']:.1f} reruns/s")
+    print(f"latência: p50 {report['p50'] * 1000:.1f} ms  p95 {report['p95'] * 1000:.1f} ms  "
+          f"p99 {report['p99'] * 1000:.1f} ms  máx {report['max'] * 1000:.1f} ms")
+    if report["memory_per_session"] is not None:
+        print(f"memória do servidor: {report['memory_per_session'] / 1024:.0f} KiB por sessão, "
+              f"{report['rss'] / 2**20:.0f} MiB no total")
+    for error in sorted(set(test.errors))[:5]:
+        print(f"erro: {error}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
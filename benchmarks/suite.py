@@ -0,0 +1,158 @@
+"""
+Suíte de benchmarks do SmartCalc com comparação contra uma linha de base.
+
+Mede:
+    import/*      tempo de importação (processo novo a cada medição)
+    scalar/*      cada fórmula de smartcalc_core.formulas, por chamada
+    batch/*       cada fórmula de smartcalc_core.batch, por linha
+    rerun/*       rerun completo do smartcalc.py em cada categoria do menu
+
+Os resultados (segundos; menor tempo das repetições, ou mediana dos reruns)
+vão para um JSON. Com ``--baseline``, cada medida é comparada à linha de base
+e o comando termina com código 1 se alguma ficar mais lenta que
+``--threshold`` vezes o valor de referência.
+
+Uso:
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --save-baseline            # grava benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 1.25
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from smartcalc_core import batch, formulas
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# Argumentos típicos de cada fórmula (VC do mechanical power em litros)
+SCALAR_ARGS = {
+    "calculate_height_chumlea": ("Masculino", 70, 50),
+    "calculate_ideal_weight": ("Feminino", 165),
+    "calculate_time_constant": (10, 50),
+    "calculate_driving_pressure": (25, 8),
+    "calculate_static_compliance": (450, 25, 8),
+    "calculate_resistance": (32, 25, 60),
+    "calculate_mechanical_power": (20, 0.45, 32, 17),
+    "calculate_muscular_pressure": (12,),
+    "calculate_irrs": (24, 0.35),
+    "calculate_predicted_pimax": ("Masculino", 60),
+    "calculate_predicted_pemax": ("Feminino", 60),
+    "calculate_rox_index": (94, 0.45, 24),
+    "calculate_ri_ratio": (620, 480, 450, 24, 5, 15),
+    "calculate_pao2_fio2": (85, 0.45),
+}
+
+
+def _repeat(function, repeat):
+    # Menor tempo entre as repetições: é a medida menos sensível a ruído
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(t / number for t in timer.repeat(repeat=repeat, number=number))
+
+
+def bench_import(repeat):
+    # Cada medição roda num interpretador novo, para não reaproveitar sys.modules
+    code = "import time; t = time.perf_counter(); import {}; print(time.perf_counter() - t)"
+    results = {}
+    for module in ("smartcalc_core", "smartcalc_core.batch"):
+        timings = [
+            float(subprocess.run(
+                [sys.executable, "-c", code.format(module)], cwd=ROOT, check=True, capture_output=True, text=True
+            ).stdout)
+            for _ in range(repeat)
+        ]
+        results[f"import/{module}"] = min(timings)
+    return results
+
+def bench_scalar(repeat):
+    return {
+        f"scalar/{name}": _repeat(lambda f=getattr(formulas, name), a=args: f(*a), repeat)
+        for name, args in SCALAR_ARGS.items()
+    }
+
+def bench_batch(rows, repeat):
+    results = {}
+    for name, args in SCALAR_ARGS.items():
+        columns = [
+            np.full(rows, arg, dtype=object if isinstance(arg, str) else np.float64) for arg in args
+        ]
+        function = getattr(batch, name)
+        results[f"batch/{name}"] = _repeat(lambda f=function, c=columns: f(*c), repeat) / rows
+    return results
+
+def bench_rerun(reruns):
+    from benchmarks.bench_rerun import CATEGORIES, bench_category
+
+    logging.disable(logging.WARNING)
+    return {f"rerun/{category}": statistics.median(bench_category(category, reruns)) for category in CATEGORIES}
+
+
+def compare(results, baseline, threshold):
+    # Devolve as medidas que ficaram mais lentas que o limite
+    regressions = []
+    for name, value in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference:
+            ratio = value / reference
+            flag = "  <-- REGRESSÃO" if ratio > threshold else ""
+            print(f"{name:50s} {reference * 1e6:12.3f} us -> {value * 1e6:12.3f} us  x{ratio:5.2f}{flag}")
+            if ratio > threshold:
+                regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    parser.add_argument("--baseline", help="JSON de referência para comparar")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="Grava os resultados como referência")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Razão máxima aceita (padrão: 1,25)")
+    parser.add_argument("--rows", type=int, default=100_000, help="Linhas por medida em lote")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--reruns", type=int, default=20, help="Reruns por categoria (0 desativa)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    results.update(bench_import(args.repeat))
+    results.update(bench_scalar(args.repeat))
+    results.update(bench_batch(args.rows, args.repeat))
+    if args.reruns:
+        results.update(bench_rerun(args.reruns))
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} medida(s) acima de x{args.threshold}: {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        for name, value in sorted(results.items()):
+            print(f"{name:50s} {value * 1e6:12.3f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,69 @@
+import math
+import os
+import time
+
+import altair as alt
+import numpy as np
 import streamlit as st
 
+from smartcalc_core import (
+    calculate_driving_pressure,
+    calculate_height_chumlea,
+    calculate_ideal_weight,
+    calculate_irrs,
+    calculate_mechanical_power,
+    calculate_muscular_pressure,
+    calculate_pao2_fio2,
+    calculate_predicted_pemax,
+    calculate_predicted_pimax,
+    calculate_resistance,
+    calculate_ri_ratio,
+    calculate_rox_index,
+    calculate_static_compliance,
+    calculate_time_constant,
+)
+from smartcalc_core import metrics, profiling, ui_assets
+from smartcalc_core.alerts import DRIVING_PRESSURE_LIMIT, MECHANICAL_POWER_LIMIT
+from smartcalc_core.cache import cache_info, memoize
+from smartcalc_core.cohort import get_cohort
+from smartcalc_core.colstore import bed_store, now_ms
+from smartcalc_core.expressions import get_expressions
+from smartcalc_core.history import DEFAULT_CAPACITY
+from smartcalc_core.registry import FORMULAS, to_formula_units, validate
+from smartcalc_core.sessions import get_backend, new_session_id
+from smartcalc_core.sweep import sweep, tidal_volumes, to_records
+from smartcalc_core.waveform import analyze as analyze_waveform
+
+# Resultados compartilhados entre as sessões (SMARTCALC_CACHE_SIZE=0 desativa),
+# com métricas opcionais (SMARTCALC_METRICS)
+calculate_driving_pressure = metrics.instrument(memoize(calculate_driving_pressure))
+calculate_height_chumlea = metrics.instrument(memoize(calculate_height_chumlea))
+calculate_ideal_weight = metrics.instrument(memoize(calculate_ideal_weight))
+calculate_irrs = metrics.instrument(memoize(calculate_irrs))
+calculate_mechanical_power = metrics.instrument(memoize(calculate_mechanical_power))
+calculate_muscular_pressure = metrics.instrument(memoize(calculate_muscular_pressure))
+calculate_pao2_fio2 = metrics.instrument(memoize(calculate_pao2_fio2))
+calculate_predicted_pemax = metrics.instrument(memoize(calculate_predicted_pemax))
+calculate_predicted_pimax = metrics.instrument(memoize(calculate_predicted_pimax))
+calculate_resistance = metrics.instrument(memoize(calculate_resistance))
+calculate_ri_ratio = metrics.instrument(memoize(calculate_ri_ratio))
+calculate_rox_index = metrics.instrument(memoize(calculate_rox_index))
+calculate_static_compliance = metrics.instrument(memoize(calculate_static_compliance))
+calculate_time_constant = metrics.instrument(memoize(calculate_time_constant))
+
+if metrics.ENABLED:
+    metrics.start_server()
+    rerun_start = time.perf_counter()
+
+
+def profile_requested():
+    # Profiling pedido pela URL (?profile=1), aceito só com SMARTCALC_PROFILE definido
+    return st.query_params.get("profile") == "1"
+
+
+profiled_run = profiling.begin(force=profiling.ENABLED and profile_requested())
+profiled = profiling.profile_fragment(profile_requested)
+
 # Configuração da página
 st.set_page_config(
     page_title="SmartCalc",  # Título da página
@@ -8,153 +72,479 @@ st.set_page_config(
     initial_sidebar_state="expanded",  # Estado inicial da barra lateral
 )
 
-if 'oxigenoterapia' not in st.session_state:
-    st.session_state.oxigenoterapia = {}
-if 'forca_inspiratoria' not in st.session_state:
-    st.session_state.forca_inspiratoria = {}
-if 'ventilacao_mecanica' not in st.session_state:
-    st.session_state.ventilacao_mecanica = {}
-
-
-
-def calculate_height_chumlea(gender, age, aj):
-    if gender == "Homem":
-        return 64.19 - (0.04 * age) + (2.02 * aj)
-    else:
-        return 84.88 - (0.24 * age) + (1.83 * aj)
-
-def calculate_ideal_weight(gender, height):
-    if gender == "Homem":
-        return 50 + 0.91 * (height - 152.4)
-    else:
-        return 45.5 + 0.91 * (height - 152.4)
-
-def calculate_time_constant(rva, cst):
-    return (rva * cst) / 1000
-
-def calculate_driving_pressure(plateau_pressure, peep):
-    return plateau_pressure - peep
-
-def calculate_static_compliance(tidal_volume, plateau_pressure, peep):
-    return tidal_volume / (plateau_pressure - peep)
-
-def calculate_resistance(peak_pressure, plateau_pressure, flow):
-    return (peak_pressure - plateau_pressure) / flow
+# Histórico dos resultados da sessão, por categoria, com tamanho máximo
+HISTORY_SIZE = int(os.environ.get("SMARTCALC_HISTORY_SIZE", DEFAULT_CAPACITY))
+HISTORY_CATEGORIES = ("oxigenoterapia", "forca_inspiratoria", "ventilacao_mecanica", "outros_indices")
+
+# A sessão vem da URL (?session=...), então qualquer processo pode atendê-la;
+# o histórico é carregado do backend (SMARTCALC_SESSION_BACKEND)
+session_id = st.query_params.get("session", "")
+if not session_id or len(session_id) > 64:
+    session_id = new_session_id()
+    st.query_params["session"] = session_id
+
+if st.session_state.get("session_id") != session_id:
+    st.session_state.session_id = session_id
+    for category in HISTORY_CATEGORIES:
+        st.session_state[category] = get_backend().history(session_id, category, HISTORY_SIZE)
+
+# Histórico por leito dos índices de ventilação (opcional)
+STORE_DIR = os.environ.get("SMARTCALC_STORE_DIR")
+
+# Base da unidade com ROX, PaO2/FiO2 e IRRS de todos os leitos (opcional)
+COHORT = get_cohort()
+
+
+def store_ventilation_metric(**values):
+    # Acrescenta uma linha ao histórico do leito, se o armazenamento estiver ativo
+    bed = st.session_state.get("bed", "")
+    if STORE_DIR and bed:
+        try:
+            bed_store(STORE_DIR, bed).append([now_ms()], **values)
+        except ValueError as e:
+            st.warning(f"Resultado não armazenado: {e}")
+
+
+def store_cohort(**inputs):
+    # Medidas de entrada do índice para a base da unidade (gravadas em lote)
+    bed = st.session_state.get("bed", "")
+    if COHORT is not None and bed:
+        COHORT.add(bed, **inputs)
+
+
+def record_result(category, name, value):
+    # Guarda o resultado no histórico da sessão e mostra os anteriores
+    history = st.session_state[category]
+    previous = history.latest(name, 5)
+    t = now_ms()
+    history.record(name, value, t)
+    get_backend().append(st.session_state.session_id, category, name, value, t)
+    if previous:
+        st.caption("Anteriores: " + ", ".join(f"{v:.2f}" for v in previous))
+
+
+def show_session_history(category):
+    # Tabela com os resultados da categoria nesta sessão
+    history = st.session_state[category]
+    if len(history):
+        with st.expander(f"🕘 Resultados desta sessão ({len(history)})"):
+            entries = history.entries()
+            st.dataframe(
+                {
+                    "Hora": entries["timestamp"].astype("datetime64[ms]"),
+                    "Calculadora": entries["calculator"],
+                    "Resultado": entries["value"].round(2),
+                },
+                hide_index=True,
+            )
 
-def calculate_mechanical_power(fr, vc, ppico, dp):
-    return 0.098 * fr * vc * (ppico - dp / 2)
 
-def calculate_muscular_pressure(delta_pocc):
-    return delta_pocc * 0.75
+def formula_inputs(name):
+    # Widgets gerados a partir do registro de fórmulas, na ordem dos parâmetros
+    values = []
+    for item in FORMULAS[name].inputs:
+        if item.options is None:
+            values.append(st.text_input(item.label, value="", key=item.key))
+        else:
+            values.append(st.selectbox(item.label, item.options, format_func=str, key=item.key))
+    return values
 
-def calculate_irrs(fr, vt):
-    return fr / vt
 
-def calculate_predicted_pimax(gender, age):
-    if gender == "Homem":
-        return 155.3 - (0.80 * age)
-    else:
-        return 110.4 - (0.49 * age)
+def render_formula(name, help_title, help_text, button="Calcular", key=None):
+    """
+    Título, fórmula, widgets e botão de uma calculadora do registro.
 
-def calculate_predicted_pemax(gender, age):
-    if gender == "Homem":
-        return 165.3 - (0.81 * age)
-    else:
-        return 115.6 - (0.61 * age)
+    Devolve os valores informados quando o botão é clicado com todos os
+    campos preenchidos, numéricos e dentro das faixas do registro; senão
+    mostra o aviso e devolve None.
+    """
+    formula = FORMULAS[name]
+    st.subheader(formula.title)
+    with st.expander(help_title):
+        st.write(help_text)
+    values = formula_inputs(name)
+    if not st.button(button, key=key):
+        return None
+    if "" in values:
+        st.warning("Por favor, preencha todos os campos para realizar o cálculo.")
+        return None
+    try:
+        # Campos de texto chegam como str; os selectboxes já são números
+        values = [value if item.options else float(value) for item, value in zip(formula.inputs, values)]
+    except ValueError:
+        st.error("Por favor, insira valores numéricos válidos.")
+        return None
+    # float() aceita "nan" e "inf", que validate não recusa
+    if not all(math.isfinite(value) for value in values if not isinstance(value, str)):
+        st.error("Por favor, insira valores numéricos válidos.")
+        return None
+    errors = validate(formula, values)
+    if errors:
+        st.error(" ".join(errors))
+        return None
+    return values
+
+
+def show_result(name, value, category):
+    # Linha de resultado com o rótulo e a unidade do registro, e o histórico
+    formula = FORMULAS[name]
+    st.write(f"**{formula.output}:** {value:.2f} {formula.unit}".rstrip())
+    record_result(category, formula.title, value)
+
+
+# Cada calculadora é um fragmento: clicar em "Calcular" executa novamente só
+# a função da calculadora, e não a página inteira.
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_rox_index():
+    values = render_formula("rox_index", "ℹ️  Fórmula    ", "(SpO2 / FiO2)/ FR", key="rox_button")
+    if values is not None:
+        spo2, fio2, fr_rox = values
+        show_result("rox_index", calculate_rox_index(spo2, fio2, fr_rox), "oxigenoterapia")
+        store_cohort(spo2=spo2, fio2=fio2, rr=fr_rox)
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_pimax():
+    values = render_formula("pimax", "ℹ️ Fórmula de Neder", """
+        **Fórmulas de PImáx**:
+        - **Masculino** = 155,3 - (0,80 x idade)
+        - **Feminino** = 110,4 - (0,49 x idade)
+        """, "Calcular PImáx", "pimax_button")
+    if values is not None:
+        show_result("pimax", calculate_predicted_pimax(*values), "forca_inspiratoria")
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_pemax():
+    values = render_formula("pemax", "ℹ️ Fórmula de Neder", """
+        **Fórmulas de PEmáx**:
+        - **Masculino** = 165,3 - (0,81 x idade)
+        - **Feminino** = 115,6 - (0,61 x idade)
+        """, "Calcular PEmáx", "pemax_button")
+    if values is not None:
+        show_result("pemax", calculate_predicted_pemax(*values), "forca_inspiratoria")
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_height_chumlea():
+    values = render_formula("height_chumlea", "ℹ️ Fórmula de Chumlea", """
+        **Masculino**	(2,02 x AJ) - (0,04 x I) + 64,19
+        **Feminino** (1,83 x AJ) - (0,24 x I) + 84,88
+               """, key="chumlea_button")
+    if values is not None:
+        show_result("height_chumlea", calculate_height_chumlea(*values), "ventilacao_mecanica")
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_predicted_weight():
+    values = render_formula("ideal_weight", "ℹ️ Fórmula", """
+        **Masculino**	50 + 0,91 x (Altura - 152,4 cm)
+        **Feminino**  45,5 + 0,91 x (Altura - 152,4 cm)
+               """, key="weight_button")
+    if values is not None:
+        show_result("ideal_weight", calculate_ideal_weight(*values), "ventilacao_mecanica")
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_time_constant():
+    values = render_formula("time_constant", "ℹ️ Fórmula ", "(Rva x Cst) / 1000", key="time_constant_button")
+    if values is not None:
+        time_constant = calculate_time_constant(*values)
+        show_result("time_constant", time_constant, "ventilacao_mecanica")
+        store_ventilation_metric(time_constant=time_constant)
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_driving_pressure():
+    values = render_formula("driving_pressure", "ℹ️ Fórmula ", """
+        ΔP = Pressão de platô - PEEP
+        \n OBS: Manter DP < 15 cmH2O
+               """, key="dp_button")
+    if values is not None:
+        driving_pressure = calculate_driving_pressure(*values)
+        show_result("driving_pressure", driving_pressure, "ventilacao_mecanica")
+        store_ventilation_metric(driving_pressure=driving_pressure)
+        if driving_pressure > DRIVING_PRESSURE_LIMIT:
+            st.error("Resultado maior que o permitido. Tome medidas de ventilação protetora.")
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_static_compliance():
+    values = render_formula("static_compliance", "ℹ️ Fórmula ", "Volume corrente / (Platô - PEEP)", key="cst_button")
+    if values is not None:
+        tidal_volume, plateau_pressure_cst, peep_cst = values
+        if plateau_pressure_cst == peep_cst:
+            st.warning("A pressão de platô deve ser diferente da PEEP.")
+            return
+        compliance = calculate_static_compliance(tidal_volume, plateau_pressure_cst, peep_cst)
+        show_result("static_compliance", compliance, "ventilacao_mecanica")
+        store_ventilation_metric(static_compliance=compliance)
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_resistance():
+    values = render_formula("resistance", "ℹ️ Fórmula", """
+        (Pressão de pico - Pressão de platô) / Fluxo
+
+               """, key="rva_button")
+    if values is not None:
+        resistance = calculate_resistance(*values)
+        if resistance is None:
+            st.warning("O fluxo deve ser maior que zero para realizar o cálculo.")
+            return
+        show_result("resistance", resistance, "ventilacao_mecanica")
+        store_ventilation_metric(resistance=resistance)
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_pao2_fio2():
+    values = render_formula("pao2_fio2", "ℹ️ Fórmula:", "PaO2 / FiO2")
+    if values is not None:
+        pao2, fio2 = values
+        # Calcula a relação usando a função
+        resultado, erro = calculate_pao2_fio2(pao2, fio2)
+
+        # Exibe o resultado ou a mensagem de erro
+        if erro:
+            st.error(erro)
+        else:
+            show_result("pao2_fio2", resultado, "ventilacao_mecanica")
+            store_cohort(pao2=pao2, fio2=fio2)
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_muscular_pressure():
+    values = render_formula("muscular_pressure", "ℹ️ Fórmula ", """
+        -0,75 x ΔPocc
+        \n OBS: Utilize o valor absoluto da ΔPocc
+               """, key="pmus_button")
+    if values is not None:
+        show_result("muscular_pressure", calculate_muscular_pressure(*values), "ventilacao_mecanica")
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_irrs():
+    values = render_formula("irrs", "ℹ️ Fórmula ", "FR / VC (L)", "Calcular IRRS", "irrs_button")
+    if values is not None:
+        fr_irrs, vt_irrs = values
+        show_result("irrs", calculate_irrs(fr_irrs, vt_irrs), "ventilacao_mecanica")
+        store_cohort(rr=fr_irrs, tidal_volume=vt_irrs * 1000)
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_ri_ratio():
+    values = render_formula("ri_ratio", "ℹ️ Fórmula de Pan e col.:", """
+        R/I ratio = {[(VTeH →L – VTeH) / VTi x (PplatL – PEEPL) / (PEEPH – PEEPL)] – 1}
+               """, key="calculate_button")
+    if values is not None:
+        try:
+            show_result("ri_ratio", calculate_ri_ratio(*values), "ventilacao_mecanica")
+        except ZeroDivisionError:
+            st.error(
+                "Certifique-se de que o valor de PEEP alto seja diferente do PEEP baixo e que VTi não seja zero.")
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_mechanical_power():
+    values = render_formula("mechanical_power", "ℹ️ Fórmula (Gattinoni)", """
+                0.098 x FR x VC x (Ppico - DP/2)
+                       """, key="mp_button")
+    if values is not None:
+        # VC em mL, convertido para litros pelo registro
+        mechanical_power = calculate_mechanical_power(*to_formula_units(FORMULAS["mechanical_power"], values))
+        show_result("mechanical_power", mechanical_power, "ventilacao_mecanica")
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_expression(expression):
+    # Calculadora definida por expressão (smartcalc_core.expressions)
+    st.subheader(expression.title)
+    with st.expander("ℹ️ Fórmula"):
+        st.code(expression.source, language=None)
+    values = [
+        st.text_input(f"{label} ({unit}):" if unit else f"{label}:", value="", key=f"expr_{expression.name}_{name}")
+        for name, label, unit in expression.inputs
+    ]
+    if st.button("Calcular", key=f"expr_{expression.name}_button"):
+        try:
+            result = expression(*values)
+        except ValueError:
+            st.error("Por favor, insira valores numéricos válidos.")
+        except (ArithmeticError, TypeError):
+            st.error("Não foi possível calcular com os valores informados.")
+        else:
+            st.write(f"**{expression.title}:** {result:.2f} {expression.unit}".rstrip())
+            record_result("outros_indices", expression.title, result)
+
+
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_waveform():
+    st.subheader("Curvas de Pressão e Fluxo")
+    with st.expander("ℹ️ Como funciona"):
+        st.write("""
+        Envie um CSV com as colunas **pressure** (cmH2O) e **flow** (L/min) amostradas
+        pelo ventilador, com pausa inspiratória. Cada ciclo é separado pelo início da
+        inspiração; Cst, Rva e constante de tempo usam pico, platô, PEEP e fluxo de
+        cada ciclo, e a equação do movimento (P = E·V + R·V' + P0) é ajustada por
+        mínimos quadrados.
+               """)
+    uploaded = st.file_uploader("Curvas (CSV):", type=["csv"], key="waveform_file")
+    fs = st.number_input("Frequência de amostragem (Hz):", min_value=10, max_value=1000, value=100, key="waveform_fs")
+
+    if st.button("Analisar", key="waveform_button"):
+        if uploaded is None:
+            st.warning("Por favor, envie o arquivo com as curvas.")
+            return
+        try:
+            data = np.genfromtxt(uploaded, delimiter=",", names=True)
+            results = analyze_waveform(data["pressure"], data["flow"], fs)
+        except (ValueError, KeyError, IndexError):
+            st.error("O arquivo deve ter as colunas numéricas pressure e flow.")
+            return
+        if not len(results["start"]):
+            st.warning("Nenhum ciclo completo encontrado nas curvas.")
+            return
+
+        compliance = float(np.nanmedian(results["static_compliance"]))
+        resistance = float(np.nanmedian(results["resistance"]))
+        time_constant = float(np.nanmedian(results["time_constant"]))
+        st.write(f"**Ciclos analisados:** {len(results['start'])}")
+        st.write(f"**Complacência Estática (mediana):** {compliance:.2f} ml/cmH2O")
+        st.write(f"**Resistência de Vias Aéreas (mediana):** {resistance:.2f} cmH2O/L/s")
+        st.write(f"**Constante de Tempo (mediana):** {time_constant:.2f} s")
+        st.write(
+            f"**Equação do movimento (mediana):** C = {np.nanmedian(results['compliance_fit']):.2f} ml/cmH2O, "
+            f"R = {np.nanmedian(results['resistance_fit']):.2f} cmH2O/L/s"
+        )
+        st.dataframe(results, hide_index=True)
+        if not np.isnan(compliance):
+            record_result("ventilacao_mecanica", "Complacência Estática (Cst)", compliance)
+            record_result("ventilacao_mecanica", "Resistência de Vias Aéreas (Rva)", resistance)
+            record_result("ventilacao_mecanica", "Constante de Tempo", time_constant)
+            store_ventilation_metric(
+                static_compliance=compliance, resistance=resistance, time_constant=time_constant
+            )
 
-def calculate_rox_index(spo2, fio2, fr):
-    return (spo2 / fio2) / fr
 
-def calculate_pao2_fio2(pao2, fio2):
-    """
-    Calcula a relação PaO2/FiO2.
+@st.fragment
+@profiled
+@metrics.instrument_block
+def render_sweep():
+    st.subheader("Simulação de Ajustes (what-if)")
+    with st.expander("ℹ️ Como funciona"):
+        st.write(f"""
+        Calcula o mechanical power e a driving pressure para todas as combinações de
+        FR, volume corrente (4 a 8 mL/kg do peso predito), PEEP e pressão de platô.
+        A pressão de pico de cada combinação é o platô mais o componente resistivo
+        (pico - platô) informado. Acima de {MECHANICAL_POWER_LIMIT} J/min e de
+        {DRIVING_PRESSURE_LIMIT} cmH2O de ΔP há maior risco de lesão pulmonar.
+               """)
+    gender = st.selectbox("Gênero:", ui_assets.GENDERS, key="sweep_gender")
+    height = st.selectbox("Altura (cm):", ui_assets.HEIGHT, key="sweep_height")
+    rr_range = st.slider("Frequência Respiratória (FR):", 6, 40, (10, 35), key="sweep_rr")
+    peep_range = st.slider("PEEP (cmH2O):", 0, 25, (5, 15), key="sweep_peep")
+    plateau_range = st.slider("Pressão de Platô (cmH2O):", 10, 40, (15, 30), key="sweep_plateau")
+    resistive_pressure = st.number_input(
+        "Pico - platô (cmH2O):", min_value=0.0, max_value=30.0, value=5.0, step=0.5, key="sweep_resistive"
+    )
 
-    Parâmetros:
-        pao2 (float): Pressão arterial de oxigênio (PaO2).
-        fio2 (float): Fração inspirada de oxigênio (FiO2).
+    if gender == "" or height == "":
+        st.info("Selecione gênero e altura para calcular o peso predito.")
+        return
+
+    ml_per_kg = np.arange(4, 8.25, 0.25)
+    grid = sweep(
+        np.arange(rr_range[0], rr_range[1] + 1),
+        tidal_volumes(gender, height, ml_per_kg),
+        np.arange(peep_range[0], peep_range[1] + 1),
+        np.arange(plateau_range[0], plateau_range[1] + 1),
+        resistive_pressure,
+    )
+    peep = st.select_slider("PEEP do mapa (cmH2O):", grid["peep"].astype(int), key="sweep_peep_slice")
+    plateau = st.select_slider("Platô do mapa (cmH2O):", grid["plateau"].astype(int), key="sweep_plateau_slice")
+    i = int(np.searchsorted(grid["peep"], peep))
+    j = int(np.searchsorted(grid["plateau"], plateau))
+    driving_pressure = grid["driving_pressure"][i, j]
+
+    if np.isnan(driving_pressure):
+        st.warning("O platô deve ser maior que a PEEP.")
+        return
+    st.write(f"**Driving Pressure:** {driving_pressure:.0f} cmH2O")
+    if driving_pressure > DRIVING_PRESSURE_LIMIT:
+        st.error(f"⚠️ Driving Pressure acima de {DRIVING_PRESSURE_LIMIT} cmH2O.")
+
+    records = to_records("FR", grid["rr"], "mL/kg", ml_per_kg, grid["mechanical_power"][:, :, i, j], "MP (J/min)")
+    st.altair_chart(
+        alt.Chart(alt.Data(values=records)).mark_rect().encode(
+            x=alt.X("FR:O"),
+            y=alt.Y("mL/kg:O", sort="descending"),
+            color=alt.Color("MP (J/min):Q", scale=alt.Scale(scheme="redyellowgreen", reverse=True)),
+            tooltip=["FR:O", "mL/kg:O", alt.Tooltip("MP (J/min):Q", format=".1f")],
+        )
+    )
+    power = grid["mechanical_power"]
+    valid = np.count_nonzero(~np.isnan(power))
+    safe = np.count_nonzero(power <= MECHANICAL_POWER_LIMIT)
+    st.caption(
+        f"{safe} de {valid} combinações válidas ({safe / valid:.0%}) "
+        f"com mechanical power até {MECHANICAL_POWER_LIMIT} J/min."
+    )
 
-    Retorna:
-        float: Relação PaO2/FiO2 calculada.
-        str: Mensagem de erro, caso os valores sejam inválidos.
-    """
-    try:
-        # Verifica se PaO2 e FiO2 são válidos
-        if pao2 is None or fio2 is None:
-            return None, "Os valores de PaO2 e FiO2 não podem estar vazios."
-        if fio2 <= 0:
-            return None, "O valor de FiO2 deve ser maior que zero."
 
-        # Calcula a relação PaO2/FiO2
-        relacao = pao2 / fio2
-        return relacao, None
-    except Exception as e:
-        return None, f"Ocorreu um erro: {str(e)}"
+# Calculadoras da Ventilação Mecânica, na ordem da grade
+VENTILATION_CALCULATORS = {
+    "Altura estimada": render_height_chumlea,
+    "Peso predito": render_predicted_weight,
+    "Constante de Tempo": render_time_constant,
+    "Driving Pressure (ΔP)": render_driving_pressure,
+    "Complacência Estática (Cst)": render_static_compliance,
+    "Resistência de Vias Aéreas (Rva)": render_resistance,
+    "Relação PaO2/FiO2": render_pao2_fio2,
+    "Pressão Muscular (Pmus)": render_muscular_pressure,
+    "IRRS": render_irrs,
+    "R/I Ratio": render_ri_ratio,
+    "Mechanical Power": render_mechanical_power,
+}
 
+# Modos de análise das curvas e de simulação (só na escolha individual)
+WAVEFORM_MODE = "Curvas (pressão/fluxo)"
+SWEEP_MODE = "Simulação (what-if)"
 
-st.markdown(
-    """
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap');
-
-    /* Configurações gerais */
-    body {
-        font-family: 'Roboto', sans-serif;
-    }
-
-    /* Layout responsivo */
-    .main {
-        padding-top: 10px !important;
-        padding-left: 20px !important;
-        padding-right: 20px !important;
-    }
-
-    /* Sidebar estilizada */
-    [data-testid="stSidebar"] {
-        background-color: #f0f4f7;
-        color: #333333;
-        border-right: 1px solid #e0e0e0;
-    }
-    [data-testid="stSidebar"] * {
-        color: #004080 !important;
-    }
-    [data-testid="stSidebar"] a {
-        color: #007BFF !important;
-        text-decoration: none;
-    }
-    [data-testid="stSidebar"] a:hover {
-        color: #0056b3 !important;
-        text-decoration: underline;
-    }
-
-    /* Header com gradiente */
-    .header {
-        background: linear-gradient(to right, #09184D, #004080);
-        padding: 20px;
-        border-radius: 10px;
-        text-align: center;
-        color: white;
-        font-family: 'Roboto', sans-serif;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
 
-# Header com gradiente
-st.markdown(
-    """
-    <style>
-    .header {
-        background-color: #333333; /* Cor de fundo alterada */
-    }
-    </style>
-    <div class="header">
-        <h1>Facilite sua Análise</h1>
-        <p>Cálculos práticos e rápidos no seu atendimento</p>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+# Estilos e header com gradiente
+st.markdown(ui_assets.HEADER_HTML, unsafe_allow_html=True)
 
 
 st.sidebar.title("Menu")
@@ -162,9 +552,10 @@ st.sidebar.title("Menu")
 # Abas para organizar as fórmulas
 menu = st.sidebar.radio(
     "Escolha uma categoria:",
-    ("Oxigenoterapia de Alto Fluxo", "Força Muscular Respiratória", "Ventilação Mecânica")
+    ("Oxigenoterapia de Alto Fluxo", "Força Muscular Respiratória", "Ventilação Mecânica", "Outros Índices")
 )
 st.text("")
+bed = st.sidebar.text_input("Leito:", value="", key="bed") if STORE_DIR or COHORT is not None else ""
 
 if menu == "Oxigenoterapia de Alto Fluxo":
     # Centralizando o título
@@ -179,45 +570,23 @@ if menu == "Oxigenoterapia de Alto Fluxo":
     with col1:
         left_spacer, col1, right_spacer = st.columns([0.25, 0.5, 0.25])  # Centraliza e ajusta largura
         with col1:
-            st.subheader("ROX Index")
-            with st.expander("ℹ️  Fórmula    "):
-                st.write(""" (SpO2 / FiO2)/ FR
-                       """)
-
-            # Campo SpO2 com opção de vazio
-            spo2_options = [""] + list(range(0, 101))  # Opções de SpO2: vazio e números inteiros de 0 a 100
-            spo2 = st.selectbox(
-                "SpO2 (%):",
-                options=spo2_options,
-                format_func=lambda x: "" if x == "" else x,  # Exibe "Selecione" para vazio
-                key="rox_spo2"
-            )
-
-            # Campo FiO2 com opção de vazio
-            fio2_options = [""] + [round(i * 0.01, 2) for i in range(21, 101)]
-            fio2 = st.selectbox(
-                "FiO2 (fração):",
-                options=fio2_options,
-                format_func=lambda x: "" if x == "" else x,  # Exibe "Selecione" para vazio
-                key="rox_fio2"
-            )
-
-            # Campo Frequência Respiratória com opção de vazio
-            fr_rox_options = [""] + list(range(0, 101))
-            fr_rox = st.selectbox(
-                "Frequência Respiratória (FR):",
-                options=fr_rox_options,
-                format_func=lambda x: "" if x == "" else x,  # Exibe "Selecione" para vazio
-                key="rox_fr"
-            )
-
-            # Botão para calcular
-            if st.button("Calcular", key="rox_button"):
-                if spo2 == "" or fio2 == "" or fr_rox == "":
-                    st.error("Por favor, preencha todos os campos antes de calcular.")
-                else:
-                    rox_index = calculate_rox_index(spo2, fio2, fr_rox)
-                    st.write(f"**ROX Index:** {rox_index:.2f}")
+            render_rox_index()
+            show_session_history("oxigenoterapia")
+
+    if COHORT is not None:
+        with st.expander("🏥 Unidade (últimas 24 h)"):
+            beds = COHORT.patients_below(pao2_fio2=150, rox_index=3.85)
+            st.write(f"**Leitos com PaO2/FiO2 < 150 e ROX < 3,85:** {', '.join(beds) if beds else 'nenhum'}")
+            hourly = COHORT.hourly("rox_index")
+            if hourly:
+                st.line_chart(
+                    {
+                        "Hora": np.array([row[0] for row in hourly]).astype("datetime64[ms]"),
+                        "ROX médio": [row[2] for row in hourly],
+                        "ROX mínimo": [row[3] for row in hourly],
+                    },
+                    x="Hora",
+                )
 
 if menu == "Força Muscular Respiratória":
     # Centralizando o título
@@ -232,71 +601,12 @@ if menu == "Força Muscular Respiratória":
     spacer1, col2, spacer2, col3, spacer3 = st.columns([0.5, 1, 0.25, 1, 0.5])
 
     with col2:
-        st.subheader("Pimáx Predita")
-        # Importa a biblioteca necessária
-        import streamlit as st
-
-        # Subheader com ícone interativo
-        with st.expander("ℹ️ Fórmula de Neder"):
-            st.write("""
-            **Fórmulas de PImáx**:
-            - **Masculino** = 155,3 - (0,80 x idade)
-            - **Feminino** = 110,4 - (0,49 x idade)
-            """)
-
-        # Seleção de gênero e idade
-        gender_pimax = st.selectbox("Gênero:", [""] + ["Masculino", "Feminino"], key="pimax_gender")
-        age_pimax = st.selectbox("Idade (anos):", [""] + list(range(18, 101)), key="pimax_age")
-
-
-        # Função para cálculo de PImáx
-        def calculate_pimax(gender, age):
-            if gender == "Masculino":
-                return 155.3 - (0.80 * age)
-            elif gender == "Feminino":
-                return 110.4 - (0.49 * age)
-
-
-        # Botão para calcular
-        if st.button("Calcular PImáx", key="pimax_button"):
-            if gender_pimax and age_pimax != "":
-                age_pimax = int(age_pimax)  # Converte a idade para inteiro
-                pimax = calculate_pimax(gender_pimax, age_pimax)
-                st.write(f"**PImáx Predita:** {pimax:.2f} cmH2O")
-            else:
-                st.warning("Por favor, selecione o gênero e a idade.")
+        render_pimax()
 
     with col3:
-        # Subheader com ícone interativo
-        st.subheader("PEmáx Predita")
-        with st.expander("ℹ️ Fórmula de Neder"):
-            st.write(""" 
-            **Fórmulas de PEmáx**:
-            - **Masculino** = 165,3 - (0,81 x idade)
-            - **Feminino** = 115,6 - (0,61 x idade)
-            """)
-
-        # Seleção de gênero e idade
-        gender_pemax = st.selectbox("Gênero:", [""] + ["Masculino", "Feminino"], key="pemax_gender")
-        age_pemax = st.selectbox("Idade (anos):", [""] + list(range(18, 101)), key="pemax_age")
-
-
-        # Função para cálculo de PEmáx
-        def calculate_pemax(gender, age):
-            if gender == "Masculino":
-                return 165.3 - (0.81 * age)
-            elif gender == "Feminino":
-                return 115.6 - (0.61 * age)
-
-
-        # Botão para calcular
-        if st.button("Calcular PEmáx", key="pemax_button"):
-            if gender_pemax and age_pemax != "":
-                age_pemax = int(age_pemax)  # Converte a idade para inteiro
-                pemax = calculate_pemax(gender_pemax, age_pemax)
-                st.write(f"**PEmáx Predita:** {pemax:.2f} cmH₂O")
-            else:
-                st.warning("Por favor, selecione o gênero e a idade.")
+        render_pemax()
+
+    show_session_history("forca_inspiratoria")
 
 if menu == "Ventilação Mecânica":
     # Centralizando o título
@@ -308,294 +618,73 @@ if menu == "Ventilação Mecânica":
     )
     st.text("")
     st.text("")
-    col4, spacer1, col5, spacer2, col6 = st.columns([1, 0.4, 1, 0.4, 1])
-    col7, spacer3, col8, spacer4, col9 = st.columns([1, 0.4, 1, 0.4, 1])
-    col10, spacer5, col11, spacer6, col12 = st.columns([1, 0.4, 1, 0.4, 1])
-    col13, spacer7, col14, spacer8 = st.columns([1, 0.4, 1, 0.4])
-
-    with col4:
-        st.subheader("Altura estimada")
-        with st.expander("ℹ️ Fórmula de Chumlea"):
-            st.write("""
-            **Masculino**	(2,02 x AJ) - (0,04 x I) + 64,19
-            **Feminino** (1,83 x AJ) - (0,24 x I) + 84,88
-                   """)
-
-
-        def calculate_height_chumlea(gender, age, aj):
-            if gender == "Masculino":
-                return (2.02 * aj) - (0.04 * age) + 64.19
-            elif gender == "Feminino":
-                return (1.83 * aj) - (0.24 * age) + 84.88
-            else:
-                return None
-
-
-        gender_chumlea = st.selectbox("Gánero:", ["", "Masculino", "Feminino"], key="chumlea_gender")
-        age_chumlea = st.selectbox("Idade (anos):", [""] + list(range(0, 105)), key="chumlea_age")
-        aj_chumlea = st.selectbox("AJ (cm):", [""] + [round(i * 1, 1) for i in range(0, 101)], key="chumlea_aj")
+    calculator = st.sidebar.selectbox(
+        "Calculadora:", ("Todas",) + tuple(VENTILATION_CALCULATORS) + (WAVEFORM_MODE, SWEEP_MODE), key="vm_calculator"
+    )
 
-        if st.button("Calcular", key="chumlea_button"):
-            if gender_chumlea and age_chumlea != "" and aj_chumlea != "":
-                height = calculate_height_chumlea(gender_chumlea, float(age_chumlea), float(aj_chumlea))
-                st.write(f"**Altura Calculada:** {height:.2f} cm")
-            else:
-                st.warning("Por favor, preencha todos os campos para realizar o cálculo.")
-
-    with col5:
-        st.subheader("Peso predito")
-        with st.expander("ℹ️ Fórmula"):
-            st.write("""
-            **Masculino**	50 + 0,91 x (Altura - 152,4 cm)
-            **Feminino**  45,5 + 0,91 x (Altura - 152,4 cm)
-                   """)
-
-
-        def calculate_ideal_weight(gender, height):
-            if gender == "Masculino":
-                return 50 + 0.91 * (height - 152.4)
-            elif gender == "Feminino":
-                return 45.5 + 0.91 * (height - 152.4)
+    if calculator == "Todas":
+        col4, spacer1, col5, spacer2, col6 = st.columns([1, 0.4, 1, 0.4, 1])
+        col7, spacer3, col8, spacer4, col9 = st.columns([1, 0.4, 1, 0.4, 1])
+        col10, spacer5, col11, spacer6, col12 = st.columns([1, 0.4, 1, 0.4, 1])
+        col13, spacer7, col14, spacer8 = st.columns([1, 0.4, 1, 0.4])
+        columns = (col4, col5, col6, col7, col8, col9, col10, col11, col12, col13, col14)
+        for column, render in zip(columns, VENTILATION_CALCULATORS.values()):
+            with column:
+                render()
+    else:
+        # Apenas a calculadora escolhida é montada
+        left_spacer, col_calc, right_spacer = st.columns([0.25, 0.5, 0.25])
+        with col_calc:
+            if calculator == WAVEFORM_MODE:
+                render_waveform()
+            elif calculator == SWEEP_MODE:
+                render_sweep()
             else:
-                return None
+                VENTILATION_CALCULATORS[calculator]()
 
+    show_session_history("ventilacao_mecanica")
 
-        gender_weight = st.selectbox("Género:", ["", "Masculino", "Feminino"], key="weight_gender")
-        height_weight = st.selectbox("Altura (cm):", [""] + [round(i * 1, 1) for i in range(130, 211)],
-                                     key="weight_height")
-
-        if st.button("Calcular", key="weight_button"):
-            if gender_weight and height_weight != "":
-                ideal_weight = calculate_ideal_weight(gender_weight, float(height_weight))
-                st.write(f"**Peso Ideal:** {ideal_weight:.2f} kg")
+    if STORE_DIR and bed:
+        with st.expander(f"📈 Histórico do leito {bed} (últimas 6 h)"):
+            try:
+                history = bed_store(STORE_DIR, bed).last(6 * 3600)
+            except ValueError as e:
+                st.warning(str(e))
             else:
-                st.warning("Por favor, preencha todos os campos para realizar o cálculo.")
-
-    with col6:
-        st.subheader("Constante de Tempo")
-        with st.expander("ℹ️ Fórmula "):
-            st.write(""" 
-            (Rva x Cst) / 1000
-                   """)
-
-        # Opções para os dropdowns
-        rva_options = [""] + list(range(1, 81))  # Adiciona uma opção vazia antes dos valores de 1 a 100
-        cst_options = [""] + list(range(1, 201))  # Adiciona uma opção vazia antes dos valores de 1 a 100
-
-        # Campos de entrada com dropdown
-        rva = st.selectbox("Rva (cmH2O/L.s):", options=rva_options, key="time_constant_rva")
-        cst = st.selectbox("Cst (L/cmH2O):", options=cst_options, key="time_constant_cst")
-
-        # Botão para calcular a constante de tempo
-        if st.button("Calcular", key="time_constant_button"):
-            time_constant = calculate_time_constant(rva, cst)
-            st.write(f"**Constante de Tempo:** {time_constant:.2f} s")
-
-    with col7:
-        st.subheader("Driving Pressure (ΔP)")
-        with st.expander("ℹ️ Fórmula "):
-            st.write("""
-            ΔP = Pressão de platô - PEEP
-            \n OBS: Manter DP < 15 cmH2O
-                   """)
-        plateau_pressure = st.selectbox("Pressão de Platô (cmH2O):", [""] + [round(i * 1, 1) for i in range(0, 501)], key="dp_plateau")
-        peep = st.selectbox("PEEP (cmH2O):", [""] + [round(i * 1, 1) for i in range(0, 301)], key="dp_peep")
-        if st.button("Calcular", key="dp_button"):
-            driving_pressure = calculate_driving_pressure(plateau_pressure, peep)
-            st.write(f"**Driving Pressure:** {driving_pressure:.2f} cmH2O")
-            if driving_pressure > 15:
-                st.error("Resultado maior que o permitido. Tome medidas de ventilação protetora.")
-
-    with col8:
-        st.subheader("Complacência Estática (Cst)")
-        with st.expander("ℹ️ Fórmula "):
-            st.write("""
-            Volume corrente / (Platô - PEEP)
-                   """)
-        tidal_volume = st.selectbox("Volume Corrente (ml):", [""] + list (range(0, 1501, 10)), key="cst_tidal_volume")
-        plateau_pressure_cst = st.selectbox("Pressão de Platô (cmH2O):", [""] + [round(i * 1, 1) for i in range(0, 51)], key="cst_plateau")
-        peep_cst = st.selectbox("PEEP (cmH2O):", [""] + [round(i * 1, 1) for i in range(0, 31)], key="cst_peep")
-        if st.button("Calcular", key="cst_button"):
-            compliance = calculate_static_compliance(tidal_volume, plateau_pressure_cst, peep_cst)
-            st.write(f"**Complacência Estática:** {compliance:.2f} ml/cmH2O")
-
-
-    with col9:
-        st.subheader("Resistência de Vias Aéreas (Rva)")
-        with st.expander("ℹ️ Fórmula"):
-            st.write("""
-            (Pressão de pico - Pressão de platô) / Fluxo
-
-                   """)
-
-
-        def calculate_resistance(peak_pressure, plateau_pressure, flow_lmin):
-            flow_ls = flow_lmin / 60  # Converter fluxo de L/min para L/s
-            return (peak_pressure - plateau_pressure) / flow_ls if flow_ls > 0 else None
-
-
-        peak_pressure = st.selectbox("Pressão de Pico (cmH2O):", [""] + [round(i * 1, 1) for i in range(0, 101)],
-                                     key="rva_peak")
-        plateau_pressure_rva = st.selectbox("Pressão de Platô (cmH2O):", [""] + [round(i * 1, 1) for i in range(0, 51)],
-                                            key="rva_plateau")
-        flow = st.selectbox("Fluxo (L/min):", [""] + [round(i * 1, 1) for i in range(0, 601)], key="rva_flow")
-
-        if st.button("Calcular", key="rva_button"):
-            if peak_pressure != "" and plateau_pressure_rva != "" and flow != "":
-                resistance = calculate_resistance(float(peak_pressure), float(plateau_pressure_rva), float(flow))
-                if resistance is not None:
-                    st.write(f"**Resistência de Vias Aéreas:** {resistance:.2f} cmH2O/L/s")
+                if len(history["timestamp"]):
+                    st.line_chart({name: values for name, values in history.items() if name != "timestamp"})
                 else:
-                    st.warning("O fluxo deve ser maior que zero para realizar o cálculo.")
-            else:
-                st.warning("Por favor, preencha todos os campos para realizar o cálculo.")
-
-    with col10:
-        st.subheader("Relação PaO2/FiO2")
-        with st.expander("ℹ️ Fórmula:"):
-            st.write(""" PaO2 / FiO2
-                               """)
-
-        # Campos de entrada
-        pao2 = st.selectbox(
-            "Pressão arterial de oxigênio (PaO2):",
-            [""] + list(range(0, 1001)),  # Valores de 0 a 1000
-            key="pao2"
-        )
-        fio2 = st.selectbox(
-            "Fração inspirada de oxigênio (FiO2):",
-            [""] + [round(x, 2) for x in [i * 0.01 for i in range(21, 101)]],  # Valores de 0.21 a 1.0
-            key="fio2"
-        )
-
-        # Botão para calcular
-        if st.button("Calcular"):
-            # Converte os valores para float
-            pao2 = float(pao2) if pao2 != "" else None
-            fio2 = float(fio2) if fio2 != "" else None
-
-            # Calcula a relação usando a função
-            resultado, erro = calculate_pao2_fio2(pao2, fio2)
+                    st.write("Nenhum resultado armazenado para este leito.")
 
-            # Exibe o resultado ou a mensagem de erro
-            if erro:
-                st.error(erro)
-            else:
-                st.write(f"**Relação PaO2/FiO2:** {resultado:.2f}")
-
-    with col11:
-        st.subheader("Pressão Muscular (Pmus)")
-        with st.expander("ℹ️ Fórmula "):
-            st.write("""
-            -0,75 x ΔPocc
-            \n OBS: Utilize o valor absoluto da ΔPocc
-                   """)
-        delta_pocc = st.selectbox("ΔPocc:", [""] + [round(i * 1, 1) for i in range(0, 101)], key="pmus_delta_pocc")
-        if st.button("Calcular", key="pmus_button"):
-            pmus = calculate_muscular_pressure(delta_pocc)
-            st.write(f"**Pressão Muscular:** {pmus:.2f} cmH2O")
-
-    with col12:
-        st.subheader("Índice de respiração rápida e superficial")
-        with st.expander("ℹ️ Fórmula "):
-            st.write("""
-            FR / VC (L)
-                   """)
-        fr_irrs = st.selectbox("Frequência Respiratória (FR):", [""] + list(range(0, 81)), key="irrs_fr")
-        vt_irrs = st.selectbox("Volume Corrente (L):", [""] + [round(i * 0.01, 2) for i in range(10, 101)],
-                               key="irrs_vt")
-
-        if st.button("Calcular IRRS", key="irrs_button"):
-            if fr_irrs != "" and vt_irrs != "":
-                irrs = calculate_irrs(float(fr_irrs), float(vt_irrs))
-                st.write(f"**IRRS:** {irrs:.2f}")
-            else:
-                st.warning("Por favor, preencha todos os campos para realizar o cálculo.")
-
-    with col13:
-        st.subheader("R/I Ratio")
-        st.write("")
-        with st.expander("ℹ️ Fórmula de Pan e col.:"):
-            st.write("""
-            R/I ratio = {[(VTeH →L – VTeH) / VTi x (PplatL – PEEPL) / (PEEPH – PEEPL)] – 1}
-                   """)
-        vteh_l = st.text_input("VTeH →L (mL):", value="", key="vteh_l")
-        vteh = st.text_input("VTeH (mL):", value="", key="vteh")
-        vti = st.text_input("VTi (mL):", value="", key="vti")
-        pplatl = st.text_input("PplatL (cmH2O):", value="", key="pplatl")
-        peepl = st.text_input("PEEPL (cmH2O):", value="", key="peepl")
-        peeph = st.text_input("PEEPH (cmH2O):", value="", key="peeph")
-
-        if st.button("Calcular", key="calculate_button"):
-            try:
-                # Converter os valores para float, se possível
-                vteh_l = float(vteh_l) if vteh_l else 0.0
-                vteh = float(vteh) if vteh else 0.0
-                vti = float(vti) if vti else 1.0  # Evitar divisão por zero
-                pplatl = float(pplatl) if pplatl else 0.0
-                peepl = float(peepl) if peepl else 0.0
-                peeph = float(peeph) if peeph else 0.0
-
-                # Cálculo
-                delta_vt = (vteh_l - vteh) / vti
-                delta_p = (pplatl - peepl) / (peeph - peepl)
-                ri_ratio = (delta_vt * delta_p) - 1
-
-                st.write(f"**R/I Ratio:** {ri_ratio:.2f}")
-
-            except ValueError:
-                st.error("Por favor, insira valores numéricos válidos.")
-            except ZeroDivisionError:
-                st.error(
-                    "Certifique-se de que o valor de PEEP alto seja diferente do PEEP baixo e que VTi não seja zero.")
-
-        with col14:
-            st.subheader("Mechanical Power")
-            with st.expander("ℹ️ Fórmula (Gattinoni)"):
-                st.write("""
-                        0.098 x FR x VC x (Ppico - DP/2)
-                               """)
-
-            fr = st.text_input("Frequência Respiratória (FR):", value="", key="mp_fr")
-            vc = st.text_input("Volume Corrente (ml):", value="", key="mp_vc")
-            ppico = st.text_input("Pressão Pico (cmH2O):", value="", key="mp_ppico")
-            dp = st.text_input("Driving Pressure (cmH2O):", value="", key="mp_dp")
-
-            if st.button("Calcular", key="mp_button"):
-                try:
-                    # Conversão para float
-                    fr = float(fr)
-                    vc = float(vc) / 1000  # Converter para litros
-                    ppico = float(ppico)
-                    dp = float(dp)
-
-                    # Cálculo da Mechanical Power
-                    mechanical_power = 0.098 * fr * vc * (ppico - dp / 2)
-                    st.write(f"**Mechanical Power:** {mechanical_power:.2f} J/min")
-
-                except ValueError:
-                    st.error("Por favor, insira valores numéricos válidos.")
+if menu == "Outros Índices":
+    st.markdown(
+        """
+        <h2 style="text-align: center;">Outros Índices</h2>
+        """,
+        unsafe_allow_html=True
+    )
+    expressions = list(get_expressions().values())
+    for start in range(0, len(expressions), 2):
+        spacer1, col_left, spacer2, col_right, spacer3 = st.columns([0.5, 1, 0.25, 1, 0.5])
+        for column, expression in zip((col_left, col_right), expressions[start:start + 2]):
+            with column:
+                render_expression(expression)
+
+    show_session_history("outros_indices")
+
+# Contadores do cache, para dimensionar SMARTCALC_CACHE_SIZE
+if os.environ.get("SMARTCALC_CACHE_STATS"):
+    info = cache_info()
+    lookups = info["hits"] + info["misses"]
+    st.sidebar.caption(
+        f"Cache: {info['size']}/{info['maxsize']} resultados, "
+        f"{info['hits']} acertos, {info['misses']} faltas, {info['evictions']} remoções"
+        + (f" ({info['hits'] / lookups:.0%} de acerto)" if lookups else "")
+    )
 
 # Rodapé
-st.markdown(
-    """
-    <hr style="border:1px solid #e1e1e1;margin-top:20px;">
-    <div style="text-align: center;">
-        <p style="font-size:14px;color:grey;">
-            Desenvolvido por Dyego Tavares de Lima - Fisioterapeuta Intensivista | 2025 <br> Qualquer sugestão, entre em contato conosco.
-        </p>
-        <p style="font-size:14px;color:grey;">
-            <a href="https://www.instagram.com/fisioterapeuta.dyegotavares" target="_blank" style="text-decoration:none;color:#3f729b;">
-                <img src="https://upload.wikimedia.org/wikipedia/commons/a/a5/Instagram_icon.png" alt="Instagram" style="width:20px;height:20px;vertical-align:middle;margin-right:5px;">
-                Instagram
-            </a> 
-            |
-            <a href="https://wa.me/5583998113637" target="_blank" style="text-decoration:none;color:#25d366;">
-                <img src="https://upload.wikimedia.org/wikipedia/commons/6/6b/WhatsApp.svg" alt="WhatsApp" style="width:20px;height:20px;vertical-align:middle;margin-right:5px;">
-                WhatsApp
-            </a>
-        </p>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+st.markdown(ui_assets.FOOTER_HTML, unsafe_allow_html=True)
+
+if metrics.ENABLED:
+    metrics.observe_rerun(menu, time.perf_counter() - rerun_start)
+profiling.end(profiled_run, menu)
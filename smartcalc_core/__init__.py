@@ -0,0 +1,53 @@
+"""
+Núcleo de cálculo do SmartCalc.
+
+Importar este pacote não carrega o Streamlit: a interface continua em
+``smartcalc.py``, que apenas consome as fórmulas daqui. Os submódulos que
+dependem de bibliotecas externas (NumPy etc.) só são importados no primeiro
+acesso, por exemplo ``smartcalc_core.batch``.
+"""
+
+import importlib
+
+from smartcalc_core.formulas import (
+    calculate_driving_pressure,
+    calculate_height_chumlea,
+    calculate_ideal_weight,
+    calculate_irrs,
+    calculate_mechanical_power,
+    calculate_muscular_pressure,
+    calculate_pao2_fio2,
+    calculate_predicted_pemax,
+    calculate_predicted_pimax,
+    calculate_resistance,
+    calculate_ri_ratio,
+    calculate_rox_index,
+    calculate_static_compliance,
+    calculate_time_constant,
+)
+
+__all__ = [
+    "calculate_driving_pressure",
+    "calculate_height_chumlea",
+    "calculate_ideal_weight",
+    "calculate_irrs",
+    "calculate_mechanical_power",
+    "calculate_muscular_pressure",
+    "calculate_pao2_fio2",
+    "calculate_predicted_pemax",
+    "calculate_predicted_pimax",
+    "calculate_resistance",
+    "calculate_ri_ratio",
+    "calculate_rox_index",
+    "calculate_static_compliance",
+    "calculate_time_constant",
+]
+
+# Submódulos carregados sob demanda
+_LAZY_SUBMODULES = ("alerts", "api", "batch", "cache", "cohort", "colstore", "expressions", "history", "ingest", "lookup", "metrics", "parallel", "profiling", "registry", "sessions", "stream", "sweep", "trend", "waveform")
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
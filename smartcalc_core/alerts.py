@@ -0,0 +1,172 @@
+"""
+Alertas em tempo real para vários leitos, sobre as fórmulas do SmartCalc.
+
+Cada evento é um dicionário com o leito, o instante e as medidas disponíveis
+(spo2, fio2, rr, pao2, peak_pressure, plateau_pressure, peep, tidal_volume em
+mL). ``AlertEngine.process`` calcula os índices possíveis (ROX, PaO2/FiO2, ΔP,
+IRRS, mechanical power) e avalia as regras configuradas.
+
+Um alerta é emitido só quando a regra muda de estado num leito: "raised" ao
+cruzar o limite e "cleared" ao voltar além do limite de histerese. Enquanto a
+condição persiste, nada é repetido.
+
+Uso (replay de um arquivo JSON Lines, um evento por linha):
+    python -m smartcalc_core.alerts eventos.jsonl [--rules regras.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import NamedTuple
+
+from smartcalc_core.formulas import (
+    calculate_driving_pressure,
+    calculate_irrs,
+    calculate_mechanical_power,
+    calculate_pao2_fio2,
+    calculate_rox_index,
+)
+
+# Mesmo limite usado na calculadora de Driving Pressure do aplicativo
+DRIVING_PRESSURE_LIMIT = 15
+MECHANICAL_POWER_LIMIT = 17  # J/min
+
+
+class Rule(NamedTuple):
+    """
+    Regra de alerta sobre um índice.
+
+    ``op`` é ">" ou "<". A regra dispara quando ``valor op threshold`` e só
+    volta ao normal quando o valor passa de ``clear`` no sentido oposto (sem
+    ``clear``, usa o próprio ``threshold``).
+    """
+
+    name: str
+    metric: str
+    op: str
+    threshold: float
+    clear: float = None
+    severity: str = "warning"
+    message: str = ""
+
+
+class Alert(NamedTuple):
+    bed: str
+    t: float
+    rule: str
+    state: str  # "raised" ou "cleared"
+    value: float
+    severity: str
+    message: str
+
+
+DEFAULT_RULES = (
+    Rule("driving_pressure_alto", "driving_pressure", ">", DRIVING_PRESSURE_LIMIT, 14,
+         "critical", "ΔP acima de 15 cmH2O. Tome medidas de ventilação protetora."),
+    Rule("rox_baixo", "rox_index", "<", 3.85, 4.0, "warning", "ROX abaixo de 3,85."),
+    Rule("rox_muito_baixo", "rox_index", "<", 2.85, 3.0, "critical", "ROX abaixo de 2,85."),
+    Rule("pf_leve", "pao2_fio2", "<", 300, 310, "info", "PaO2/FiO2 < 300 (hipoxemia leve)."),
+    Rule("pf_moderada", "pao2_fio2", "<", 200, 210, "warning", "PaO2/FiO2 < 200 (hipoxemia moderada)."),
+    Rule("pf_grave", "pao2_fio2", "<", 100, 110, "critical", "PaO2/FiO2 < 100 (hipoxemia grave)."),
+    Rule("irrs_alto", "irrs", ">", 105, 100, "warning", "IRRS acima de 105."),
+    Rule("mechanical_power_alto", "mechanical_power", ">", MECHANICAL_POWER_LIMIT, 16, "warning", "Mechanical power acima de 17 J/min."),
+)
+
+
+def derive_metrics(event):
+    """Índices calculáveis a partir das medidas presentes no evento."""
+    get = event.get
+    metrics = {}
+    spo2, fio2, rr, pao2 = get("spo2"), get("fio2"), get("rr"), get("pao2")
+    plateau, peep, peak, vt = get("plateau_pressure"), get("peep"), get("peak_pressure"), get("tidal_volume")
+    if spo2 is not None and fio2 and rr:
+        metrics["rox_index"] = calculate_rox_index(spo2, fio2, rr)
+    if pao2 is not None and fio2 is not None:
+        relacao, erro = calculate_pao2_fio2(pao2, fio2)
+        if erro is None:
+            metrics["pao2_fio2"] = relacao
+    if plateau is not None and peep is not None:
+        metrics["driving_pressure"] = calculate_driving_pressure(plateau, peep)
+    if rr is not None and vt:
+        metrics["irrs"] = calculate_irrs(rr, vt / 1000)
+        if peak is not None and "driving_pressure" in metrics:
+            metrics["mechanical_power"] = calculate_mechanical_power(rr, vt / 1000, peak, metrics["driving_pressure"])
+    return metrics
+
+
+class AlertEngine:
+    """
+    Avalia as regras para todos os leitos, com estado por (leito, regra).
+
+    Parâmetros:
+        rules (Sequence[Rule]): Regras ativas (padrão: ``DEFAULT_RULES``).
+    """
+
+    def __init__(self, rules=DEFAULT_RULES):
+        self.rules = tuple(rules)
+        for rule in self.rules:
+            if rule.op not in (">", "<"):
+                raise ValueError(f"Operador inválido na regra {rule.name!r}: {rule.op!r}")
+        self._by_metric = {}
+        for rule in self.rules:
+            self._by_metric.setdefault(rule.metric, []).append(rule)
+        self._active = set()  # (leito, regra) em alerta
+
+    def process(self, event):
+        """Processa um evento e devolve a lista de alertas emitidos (geralmente vazia)."""
+        bed = event["bed"]
+        t = event.get("t")
+        alerts = []
+        for metric, value in derive_metrics(event).items():
+            for rule in self._by_metric.get(metric, ()):
+                key = (bed, rule.name)
+                clear = rule.threshold if rule.clear is None else rule.clear
+                if key in self._active:
+                    if (value < clear) if rule.op == ">" else (value > clear):
+                        self._active.discard(key)
+                        alerts.append(Alert(bed, t, rule.name, "cleared", value, rule.severity, rule.message))
+                elif (value > rule.threshold) if rule.op == ">" else (value < rule.threshold):
+                    self._active.add(key)
+                    alerts.append(Alert(bed, t, rule.name, "raised", value, rule.severity, rule.message))
+        return alerts
+
+    def active(self, bed=None):
+        # Regras em alerta, de todos os leitos ou de um só
+        return sorted(key for key in self._active if bed is None or key[0] == bed)
+
+
+def load_rules(path):
+    """Lê regras de um arquivo JSON: lista de objetos com os campos de ``Rule``."""
+    with open(path) as f:
+        return [Rule(**item) for item in json.load(f)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m smartcalc_core.alerts", description="Replay de eventos com alertas.")
+    parser.add_argument("events", help="Arquivo JSON Lines com um evento por linha ('-' para stdin)")
+    parser.add_argument("--rules", help="Arquivo JSON com as regras (padrão: regras embutidas)")
+    args = parser.parse_args(argv)
+
+    engine = AlertEngine(load_rules(args.rules) if args.rules else DEFAULT_RULES)
+    source = sys.stdin if args.events == "-" else open(args.events)
+    count = 0
+    start = time.perf_counter()
+    with source:
+        for line in source:
+            if not line.strip():
+                continue
+            count += 1
+            for alert in engine.process(json.loads(line)):
+                print(json.dumps(alert._asdict(), ensure_ascii=False))
+    elapsed = time.perf_counter() - start
+    if count:
+        print(
+            f"{count} eventos em {elapsed:.2f} s ({count / elapsed:.0f} eventos/s, "
+            f"{elapsed / count * 1e6:.1f} us/evento)",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+API HTTP/JSON assíncrona com as mesmas fórmulas do aplicativo.
+
+Servidor HTTP/1.1 mínimo sobre ``asyncio`` (sem dependências externas), com
+conexões keep-alive. Se o ``uvloop`` estiver instalado, é usado no lugar do
+loop padrão.
+
+Rotas:
+    GET  /health                        -> {"status": "ok"}
+    GET  /calculators                   -> calculadoras e seus parâmetros
+    POST /calculators/<nome>            -> {"result": valor}
+    POST /calculators/<nome>/batch      -> {"results": [valor ou null, ...]}
+
+O corpo de uma chamada simples traz os parâmetros da fórmula, por exemplo
+``{"spo2": 95, "fio2": 0.4, "fr": 22}``. O lote recebe
+``{"patients": [{...}, {...}]}`` e é calculado de uma vez com
+``smartcalc_core.batch``; entradas fora da faixa ou não finitas viram
+``null``, e valores de tipo errado (texto, booleano, ``gender`` que não é
+texto) ou inteiros grandes demais para um float recusam o lote com 422,
+como na chamada simples. Com
+``SMARTCALC_LOOKUP=1`` (ou o caminho de um ``.npz`` gerado por
+``python -m smartcalc_core.lookup``), os lotes das calculadoras de entradas
+discretas usam as tabelas pré-calculadas de ``smartcalc_core.lookup``.
+
+Uso:
+    python -m smartcalc_core.api --host 127.0.0.1 --port 8000
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+
+import numpy as np
+
+from smartcalc_core import batch, formulas
+from smartcalc_core.lookup import LookupTables, get_tables
+from smartcalc_core.registry import FORMULAS, RANGES, to_formula_units, validate
+
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+# Nome na API -> (nome da função, parâmetros), a partir do registro de fórmulas.
+# Os parâmetros usam as unidades da interface (VC do mechanical power em mL).
+CALCULATORS = {
+    name: (formula.function, tuple(item.name for item in formula.inputs)) for name, formula in FORMULAS.items()
+}
+
+# Tabelas pré-calculadas (opcional)
+LOOKUP = os.environ.get("SMARTCALC_LOOKUP")
+
+# Parâmetros que não são numéricos
+TEXT_PARAMS = ("gender",)
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _check_number(p, value):
+    # Mesma regra na chamada simples e no lote: número JSON, nem texto nem booleano
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ApiError(422, f"O parâmetro {p!r} deve ser numérico.")
+    try:
+        return float(value)
+    except OverflowError:
+        # Inteiro JSON grande demais para um float (ex.: 10**400)
+        raise ApiError(422, f"O parâmetro {p!r} deve ser um número finito.") from None
+
+def _check_text(p, value):
+    if not isinstance(value, str):
+        raise ApiError(422, f"O parâmetro {p!r} deve ser um texto.")
+    return value
+
+def _arguments(name, payload):
+    params = CALCULATORS[name][1]
+    if not isinstance(payload, dict):
+        raise ApiError(400, "O corpo deve ser um objeto JSON.")
+    missing = [p for p in params if payload.get(p) is None]
+    if missing:
+        raise ApiError(422, f"Parâmetros ausentes: {', '.join(missing)}")
+    args = []
+    for p in params:
+        value = payload[p]
+        if p in TEXT_PARAMS:
+            _check_text(p, value)
+        else:
+            value = _check_number(p, value)
+            if not math.isfinite(value):
+                raise ApiError(422, f"O parâmetro {p!r} deve ser um número finito.")
+        args.append(value)
+    errors = validate(FORMULAS[name], args)
+    if errors:
+        raise ApiError(422, " ".join(errors))
+    return to_formula_units(FORMULAS[name], args)
+
+def calculate(name, payload):
+    """Calcula uma fórmula para um paciente; levanta ApiError se inválido."""
+    if name not in CALCULATORS:
+        raise ApiError(404, f"Calculadora desconhecida: {name!r}")
+    args = _arguments(name, payload)
+    try:
+        result = getattr(formulas, CALCULATORS[name][0])(*args)
+    except ZeroDivisionError:
+        raise ApiError(422, "Divisão por zero com os valores informados.") from None
+    if name == "pao2_fio2":
+        result, error = result
+        if error:
+            raise ApiError(422, error)
+    if result is None or not math.isfinite(result):
+        raise ApiError(422, "Valores inválidos para esta fórmula.")
+    return result
+
+def calculate_batch(name, payload):
+    """Calcula uma fórmula para uma lista de pacientes de uma só vez."""
+    if name not in CALCULATORS:
+        raise ApiError(404, f"Calculadora desconhecida: {name!r}")
+    patients = payload.get("patients") if isinstance(payload, dict) else None
+    if not isinstance(patients, list) or not all(isinstance(p, dict) for p in patients):
+        raise ApiError(400, "O corpo deve ser {\"patients\": [{...}, ...]}.")
+    if not patients:
+        return []
+    function, params = CALCULATORS[name]
+    columns = []
+    for p in params:
+        if p in TEXT_PARAMS:
+            columns.append(["" if patient.get(p) is None else _check_text(p, patient[p]) for patient in patients])
+        else:
+            columns.append([
+                math.nan if patient.get(p) is None else _check_number(p, patient[p]) for patient in patients
+            ])
+    # Valores fora da faixa do registro ou não finitos viram null, como as entradas inválidas
+    arrays = []
+    for p, column, (low, high) in zip(params, columns, RANGES[name]):
+        array = np.asarray(column)
+        if p not in TEXT_PARAMS:
+            array = np.where(np.isfinite(array), array, math.nan)
+            if low is not None:
+                array = np.where(array < low, math.nan, array)
+            if high is not None:
+                array = np.where(array > high, math.nan, array)
+        arrays.append(array)
+    columns = to_formula_units(FORMULAS[name], arrays)
+    if LOOKUP and name in LookupTables.NAMES:
+        values = getattr(get_tables(None if LOOKUP == "1" else LOOKUP), name)(*columns)
+    else:
+        values = getattr(batch, function)(*columns)
+    return [v if math.isfinite(v) else None for v in values.tolist()]
+
+
+def route(method, path, payload):
+    """Resolve uma requisição e devolve (status, objeto JSON)."""
+    parts = [p for p in path.split("?", 1)[0].split("/") if p]
+    if parts == ["health"]:
+        return 200, {"status": "ok"}
+    if parts == ["calculators"]:
+        if method != "GET":
+            raise ApiError(405, "Use GET.")
+        return 200, {name: list(params) for name, (_, params) in CALCULATORS.items()}
+    if len(parts) in (2, 3) and parts[0] == "calculators":
+        if method != "POST":
+            raise ApiError(405, "Use POST.")
+        if len(parts) == 3:
+            if parts[2] != "batch":
+                raise ApiError(404, "Rota não encontrada.")
+            return 200, {"results": calculate_batch(parts[1], payload)}
+        return 200, {"result": calculate(parts[1], payload)}
+    raise ApiError(404, "Rota não encontrada.")
+
+
+def _response(status, body, keep_alive):
+    data = json.dumps(body, ensure_ascii=False, allow_nan=False).encode()
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + data
+
+async def handle_connection(reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            try:
+                method, path, version = request_line.decode("latin-1").split()
+            except ValueError:
+                writer.write(_response(400, {"error": "Requisição inválida."}, False))
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+            try:
+                length = int(headers.get("content-length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                writer.write(_response(400, {"error": "Content-Length inválido."}, False))
+                break
+            if length > MAX_BODY_SIZE:
+                writer.write(_response(413, {"error": "Corpo da requisição muito grande."}, False))
+                break
+            body = await reader.readexactly(length) if length else b""
+            # A resposta é serializada aqui dentro: um valor não serializável
+            # vira 500, e não uma conexão derrubada
+            try:
+                payload = json.loads(body) if body else {}
+                response = _response(*route(method, path, payload), keep_alive)
+            except json.JSONDecodeError:
+                response = _response(400, {"error": "JSON inválido."}, keep_alive)
+            except ApiError as e:
+                response = _response(e.status, {"error": e.message}, keep_alive)
+            except Exception as e:
+                response = _response(500, {"error": f"Ocorreu um erro: {str(e)}"}, keep_alive)
+            writer.write(response)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8000):
+    server = await asyncio.start_server(handle_connection, host, port, backlog=1024)
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m smartcalc_core.api", description="API JSON do SmartCalc.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+    if LOOKUP:
+        get_tables(None if LOOKUP == "1" else LOOKUP)
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    run = asyncio.run if uvloop is None else uvloop.run
+    print(f"SmartCalc API em http://{args.host}:{args.port}")
+    try:
+        run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
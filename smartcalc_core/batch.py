@@ -0,0 +1,158 @@
+"""
+Versões vetorizadas (NumPy) das fórmulas do SmartCalc.
+
+Cada função recebe escalares ou arrays (com broadcasting) e devolve um
+array float64. Os casos que as funções escalares tratam um a um (FiO2 <= 0,
+fluxo zero, PEEPH == PEEPL, ...) viram NaN na posição correspondente, sem
+interromper o lote.
+"""
+
+import numpy as np
+
+from smartcalc_core.formulas import FEMALE, MALE
+
+NaN = np.nan
+
+
+def _as_float(*values):
+    return np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in values))
+
+def _divide(numerator, denominator, valid):
+    # Divide apenas onde `valid` é verdadeiro; o restante fica NaN
+    out = np.full(np.shape(valid), NaN)
+    np.divide(numerator, denominator, out=out, where=valid)
+    return out
+
+def _gender_masks(gender):
+    """
+    Converte o gênero em duas máscaras booleanas (masculino, feminino).
+
+    Aceita rótulos ("Masculino", "Feminino", "Homem", "Mulher") ou um array
+    booleano em que True significa masculino.
+    """
+    gender = np.asarray(gender)
+    if gender.dtype == np.bool_:
+        return gender, ~gender
+    return np.isin(gender, MALE), np.isin(gender, FEMALE)
+
+def _by_gender(gender, male_coef, female_coef, x, y=None):
+    # Avalia intercepto + a * x (+ b * y) com coeficientes escolhidos por gênero
+    male, female = _gender_masks(gender)
+
+    def coef(i):
+        return np.where(male, male_coef[i], np.where(female, female_coef[i], NaN))
+
+    result = coef(0) + coef(1) * np.asarray(x, dtype=np.float64)
+    if y is not None:
+        result = result + coef(2) * np.asarray(y, dtype=np.float64)
+    return result
+
+
+def calculate_height_chumlea(gender, age, aj):
+    return _by_gender(gender, (64.19, -0.04, 2.02), (84.88, -0.24, 1.83), age, aj)
+
+def calculate_ideal_weight(gender, height):
+    height = np.asarray(height, dtype=np.float64)
+    return _by_gender(gender, (50.0, 0.91), (45.5, 0.91), height - 152.4)
+
+def calculate_predicted_pimax(gender, age):
+    return _by_gender(gender, (155.3, -0.80), (110.4, -0.49), age)
+
+def calculate_predicted_pemax(gender, age):
+    return _by_gender(gender, (165.3, -0.81), (115.6, -0.61), age)
+
+def calculate_time_constant(rva, cst):
+    rva, cst = _as_float(rva, cst)
+    return (rva * cst) / 1000
+
+def calculate_driving_pressure(plateau_pressure, peep):
+    plateau_pressure, peep = _as_float(plateau_pressure, peep)
+    return plateau_pressure - peep
+
+def calculate_static_compliance(tidal_volume, plateau_pressure, peep):
+    tidal_volume, plateau_pressure, peep = _as_float(tidal_volume, plateau_pressure, peep)
+    delta = plateau_pressure - peep
+    return _divide(tidal_volume, delta, delta != 0)
+
+def calculate_resistance(peak_pressure, plateau_pressure, flow_lmin):
+    peak_pressure, plateau_pressure, flow_lmin = _as_float(peak_pressure, plateau_pressure, flow_lmin)
+    flow_ls = flow_lmin / 60  # Converter fluxo de L/min para L/s
+    return _divide(peak_pressure - plateau_pressure, flow_ls, flow_ls > 0)
+
+def calculate_mechanical_power(fr, vc, ppico, dp):
+    # Fórmula simplificada de Gattinoni (VC em litros)
+    fr, vc, ppico, dp = _as_float(fr, vc, ppico, dp)
+    return 0.098 * fr * vc * (ppico - dp / 2)
+
+def calculate_muscular_pressure(delta_pocc):
+    return np.asarray(delta_pocc, dtype=np.float64) * 0.75
+
+def calculate_irrs(fr, vt):
+    fr, vt = _as_float(fr, vt)
+    return _divide(fr, vt, vt != 0)
+
+def calculate_rox_index(spo2, fio2, fr):
+    spo2, fio2, fr = _as_float(spo2, fio2, fr)
+    return _divide(spo2, fio2 * fr, (fio2 > 0) & (fr != 0))
+
+def calculate_pao2_fio2(pao2, fio2):
+    """
+    Calcula a relação PaO2/FiO2 em lote.
+
+    Diferente da versão escalar, não devolve mensagem de erro: as posições
+    com FiO2 <= 0 ou valores ausentes (NaN) ficam NaN.
+    """
+    pao2, fio2 = _as_float(pao2, fio2)
+    return _divide(pao2, fio2, fio2 > 0)
+
+def calculate_ri_ratio(vteh_l, vteh, vti, pplatl, peepl, peeph):
+    vteh_l, vteh, vti, pplatl, peepl, peeph = _as_float(vteh_l, vteh, vti, pplatl, peepl, peeph)
+    delta_peep = peeph - peepl
+    valid = (vti != 0) & (delta_peep != 0)
+    delta_vt = _divide(vteh_l - vteh, vti, valid)
+    delta_p = _divide(pplatl - peepl, delta_peep, valid)
+    return (delta_vt * delta_p) - 1
+
+
+def compute_table(table):
+    """
+    Calcula todos os índices possíveis a partir de uma tabela colunar.
+
+    Parâmetros:
+        table (Mapping[str, array]): Colunas de entrada. Nomes reconhecidos:
+            spo2, fio2, pao2, rr, tidal_volume (mL), peak_pressure,
+            plateau_pressure, peep, flow (L/min).
+
+    Retorna:
+        dict[str, numpy.ndarray]: Apenas os índices cujas colunas de entrada
+        estão presentes na tabela.
+    """
+    def has(*names):
+        return all(name in table for name in names)
+
+    result = {}
+    if has("spo2", "fio2", "rr"):
+        result["rox_index"] = calculate_rox_index(table["spo2"], table["fio2"], table["rr"])
+    if has("pao2", "fio2"):
+        result["pao2_fio2"] = calculate_pao2_fio2(table["pao2"], table["fio2"])
+    if has("rr", "tidal_volume"):
+        # IRRS usa o volume corrente em litros
+        result["irrs"] = calculate_irrs(table["rr"], np.asarray(table["tidal_volume"], dtype=np.float64) / 1000)
+    if has("plateau_pressure", "peep"):
+        result["driving_pressure"] = calculate_driving_pressure(table["plateau_pressure"], table["peep"])
+    if has("tidal_volume", "plateau_pressure", "peep"):
+        result["static_compliance"] = calculate_static_compliance(
+            table["tidal_volume"], table["plateau_pressure"], table["peep"]
+        )
+    if has("peak_pressure", "plateau_pressure", "flow"):
+        result["resistance"] = calculate_resistance(table["peak_pressure"], table["plateau_pressure"], table["flow"])
+    if "resistance" in result and "static_compliance" in result:
+        result["time_constant"] = calculate_time_constant(result["resistance"], result["static_compliance"])
+    if "driving_pressure" in result and has("rr", "tidal_volume", "peak_pressure"):
+        result["mechanical_power"] = calculate_mechanical_power(
+            table["rr"],
+            np.asarray(table["tidal_volume"], dtype=np.float64) / 1000,
+            table["peak_pressure"],
+            result["driving_pressure"],
+        )
+    return result
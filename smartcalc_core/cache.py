@@ -0,0 +1,111 @@
+"""
+Cache LRU compartilhado pelas sessões do processo.
+
+No Streamlit, cada sessão roda o script na sua própria thread, mas os módulos
+importados são do processo. ``memoize`` envolve uma fórmula com um cache
+único, protegido por lock, onde os mesmos argumentos (por exemplo, o mesmo
+gênero e idade da PImáx) devolvem o resultado já calculado por qualquer
+sessão. Quando o cache enche, sai o resultado usado há mais tempo.
+
+O tamanho vem de ``SMARTCALC_CACHE_SIZE`` (padrão 4096 resultados; 0 desativa).
+``cache_info()`` devolve os contadores de acertos, faltas e remoções.
+
+Uso:
+    calculate_rox_index = memoize(calculate_rox_index)
+    cache_info()  # {"hits": ..., "misses": ..., "evictions": ..., "size": ..., "maxsize": ...}
+"""
+
+import functools
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class LRUCache:
+    """
+    Mapeamento limitado com remoção do item menos usado recentemente.
+
+    Parâmetros:
+        maxsize (int): Número máximo de resultados guardados.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, compute):
+        """Devolve o resultado de ``key``, calculando com ``compute()`` se necessário."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+        # Calcula fora do lock; exceções não são guardadas
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def info(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+_cache = LRUCache(int(os.environ.get("SMARTCALC_CACHE_SIZE", DEFAULT_CACHE_SIZE)))
+
+
+def memoize(function, cache=None):
+    """
+    Versão de ``function`` com resultados guardados no cache do processo.
+
+    Argumentos que não podem ser chave de dicionário passam direto para a
+    função. Com o cache desativado (tamanho 0), devolve a própria função.
+    """
+    cache = _cache if cache is None else cache
+    if cache.maxsize <= 0:
+        return function
+    name = function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args):
+        key = (name, args)
+        try:
+            hash(key)
+        except TypeError:
+            return function(*args)
+        return cache.get(key, lambda: function(*args))
+
+    return wrapper
+
+
+def cache_info():
+    """Contadores do cache do processo."""
+    return _cache.info()
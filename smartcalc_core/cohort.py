@@ -0,0 +1,311 @@
+"""
+Base da unidade: ROX, PaO2/FiO2 e IRRS de todos os leitos, para análises.
+
+Cada resultado calculado (no aplicativo ou na ingestão) vira uma linha com as
+medidas de entrada e os índices derivados. As escritas são acumuladas em
+memória e gravadas em lote (uma transação por lote, com ``executemany``); os
+índices de cada lote são calculados de uma vez com as fórmulas vetorizadas de
+``smartcalc_core.batch``, as mesmas do aplicativo, e gravados em colunas
+próprias. Cada índice derivado tem um índice SQLite parcial (só as linhas em
+que ele existe) por (t, valor, leito) e outro por (leito, t, valor), e cada lote atualiza o resumo
+``hourly`` (n, soma, mínimo e máximo por índice, hora e leito). Os painéis da
+unidade leem o resumo, algumas linhas por leito e hora, em vez das
+observações: o tempo de resposta não cresce com o tamanho da tabela. Só as
+pontas de uma janela que não começa ou termina numa hora cheia leem as
+observações, e só pelo índice.
+
+As consultas agregadas são textos fixos, montados uma vez na importação; o
+SQLite as prepara na primeira execução de cada conexão e reaproveita daí em
+diante (cache de statements do ``sqlite3``).
+
+Uso:
+    cohort = CohortStore("/dados/coorte.db")
+    cohort.add("12", spo2=88, fio2=0.6, rr=32)          # ROX
+    cohort.add("12", pao2=70, fio2=0.6)                 # PaO2/FiO2
+    cohort.flush()
+    cohort.patients_below(pao2_fio2=150, rox_index=3.85, hours=24)
+    cohort.before_extubation("irrs", hours=24)
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from smartcalc_core.batch import calculate_irrs, calculate_pao2_fio2, calculate_rox_index
+
+INPUTS = ("spo2", "fio2", "rr", "pao2", "tidal_volume")  # VC em mL
+DERIVED = ("rox_index", "pao2_fio2", "irrs")
+_INPUT_SET = frozenset(INPUTS)
+
+DEFAULT_BATCH_SIZE = 1_000
+DEFAULT_FLUSH_INTERVAL = 1.0  # s
+HOUR_MS = 3_600_000
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS observations ("
+    "patient TEXT NOT NULL, t INTEGER NOT NULL, "
+    + ", ".join(f"{name} REAL" for name in INPUTS + DERIVED) + ")",
+    *(
+        f"CREATE INDEX IF NOT EXISTS observations_{name} ON observations (t, {name}, patient) "
+        f"WHERE {name} IS NOT NULL"
+        for name in DERIVED
+    ),
+    *(
+        f"CREATE INDEX IF NOT EXISTS observations_{name}_patient ON observations (patient, t, {name}) "
+        f"WHERE {name} IS NOT NULL"
+        for name in DERIVED
+    ),
+    "CREATE TABLE IF NOT EXISTS hourly ("
+    "metric TEXT NOT NULL, hour INTEGER NOT NULL, patient TEXT NOT NULL, "
+    "n INTEGER NOT NULL, total REAL NOT NULL, minimum REAL NOT NULL, maximum REAL NOT NULL, "
+    "PRIMARY KEY (metric, hour, patient)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS extubations (patient TEXT NOT NULL, t INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS extubations_t ON extubations (t, patient)",
+)
+
+_INSERT = f"INSERT INTO observations VALUES ({', '.join('?' * (2 + len(INPUTS) + len(DERIVED)))})"
+_UPSERT_HOURLY = (
+    "INSERT INTO hourly VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (metric, hour, patient) DO UPDATE SET "
+    "n = n + excluded.n, total = total + excluded.total, "
+    "minimum = min(minimum, excluded.minimum), maximum = max(maximum, excluded.maximum)"
+)
+
+# Consultas agregadas, uma por índice derivado (nomes de coluna não podem ser parâmetros).
+# Horas completas saem do resumo ``hourly``; só as pontas da janela leem as observações.
+_BELOW = {
+    name: f"SELECT DISTINCT patient FROM observations WHERE t >= ? AND t < ? AND {name} < ?"
+    for name in DERIVED
+}
+_BELOW_HOURLY = (
+    "SELECT DISTINCT patient FROM hourly WHERE metric = ? AND hour >= ? AND hour < ? AND minimum < ?"
+)
+_HOURLY = (
+    "SELECT hour, SUM(n), SUM(total) / SUM(n), MIN(minimum), MAX(maximum) FROM hourly "
+    "WHERE metric = ? AND hour >= ? AND hour < ? GROUP BY hour ORDER BY hour"
+)
+_BEFORE_EXTUBATION = {
+    name: (
+        f"SELECT (e.t - o.t) / {HOUR_MS} AS hours_before, COUNT(*), AVG(o.{name}), MIN(o.{name}), MAX(o.{name}) "
+        f"FROM extubations e JOIN observations o ON o.patient = e.patient AND o.t >= e.t - ? AND o.t < e.t "
+        f"WHERE e.t >= ? AND e.t < ? AND o.{name} IS NOT NULL GROUP BY hours_before ORDER BY hours_before"
+    )
+    for name in DERIVED
+}
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def _check_metric(metric):
+    if metric not in DERIVED:
+        raise ValueError(f"Índice desconhecido: {metric!r} (use {', '.join(DERIVED)}).")
+
+
+def derive(columns):
+    """
+    Índices derivados de colunas de entrada (arrays; ausente = NaN).
+
+    Linhas sem as entradas de um índice, ou com divisão por zero, ficam NaN.
+    """
+    spo2, fio2, rr, pao2, tidal_volume = (columns[name] for name in INPUTS)
+    return {
+        "rox_index": calculate_rox_index(spo2, fio2, rr),
+        "pao2_fio2": calculate_pao2_fio2(pao2, fio2),
+        "irrs": calculate_irrs(rr, tidal_volume / 1000),
+    }
+
+
+def _summarize(patients, times, derived):
+    # Linhas (índice, hora, leito, n, soma, mínimo, máximo) do lote, para o resumo por hora
+    names, codes = np.unique(patients, return_inverse=True)
+    keys = times // HOUR_MS * len(names) + codes.ravel()
+    summaries = []
+    for metric in DERIVED:
+        values = derived[metric]
+        valid = ~np.isnan(values)
+        if not valid.any():
+            continue
+        groups, group = np.unique(keys[valid], return_inverse=True)
+        values = values[valid]
+        minimum = np.full(len(groups), np.inf)
+        maximum = np.full(len(groups), -np.inf)
+        np.minimum.at(minimum, group, values)
+        np.maximum.at(maximum, group, values)
+        summaries.extend(zip(
+            [metric] * len(groups),
+            (groups // len(names) * HOUR_MS).tolist(),
+            names[groups % len(names)].tolist(),
+            np.bincount(group).tolist(),
+            np.bincount(group, weights=values).tolist(),
+            minimum.tolist(),
+            maximum.tolist(),
+        ))
+    return summaries
+
+
+class CohortStore:
+    """
+    Resultados da unidade num banco SQLite, com escritas em lote.
+
+    Parâmetros:
+        path (str): Arquivo do banco (criado se não existir).
+        batch_size (int): Linhas acumuladas antes de gravar.
+        flush_interval (float): Tempo máximo (s) que uma linha espera no
+            buffer; uma thread em segundo plano grava o que sobrar. ``0``
+            desativa a thread (grava só por tamanho ou com ``flush``).
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        db = self._connection()
+        with db:
+            for statement in _SCHEMA:
+                db.execute(statement)
+        if flush_interval:
+            threading.Thread(target=self._flush_loop, name="cohort-flush", daemon=True).start()
+
+    def _connection(self):
+        # Uma conexão por thread, como em sessions.SQLiteBackend
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30, cached_statements=256)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def add(self, patient, t=None, **inputs):
+        """
+        Acumula uma observação; grava o lote quando ele completa.
+
+        ``inputs`` são medidas de ``INPUTS`` (VC em mL); as ausentes ficam nulas.
+        """
+        unknown = inputs.keys() - _INPUT_SET
+        if unknown:
+            raise ValueError(f"Medidas desconhecidas: {', '.join(sorted(unknown))}")
+        row = (str(patient), now_ms() if t is None else int(t), inputs)
+        with self._lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Grava as observações acumuladas numa transação; devolve quantas."""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        # Colunas do lote inteiro (None vira NaN) e índices derivados de uma vez
+        columns = {
+            name: np.array([inputs.get(name) for _, _, inputs in rows], dtype=np.float64) for name in INPUTS
+        }
+        derived = derive(columns)
+        table = np.column_stack([columns[name] for name in INPUTS] + [derived[name] for name in DERIVED])
+        # NaN vira NULL, para ficar fora dos índices parciais
+        records = table.astype(object)
+        records[np.isnan(table)] = None
+        patients, times = zip(*((patient, t) for patient, t, _ in rows))
+        summaries = _summarize(np.array(patients), np.array(times, dtype=np.int64), derived)
+        with self._write_lock, self._connection() as db:
+            db.executemany(_INSERT, [(p, t, *r) for p, t, r in zip(patients, times, records.tolist())])
+            db.executemany(_UPSERT_HOURLY, summaries)
+        return len(rows)
+
+    def record_extubation(self, patient, t=None):
+        """Registra a extubação do leito (para ``before_extubation``)."""
+        with self._write_lock, self._connection() as db:
+            db.execute("INSERT INTO extubations VALUES (?, ?)", (str(patient), now_ms() if t is None else int(t)))
+
+    def _window(self, hours, end):
+        # [início, fim) em ms; o fim inclui o milissegundo atual
+        end = now_ms() if end is None else int(end)
+        return end - int(hours * HOUR_MS), end + 1
+
+    def patients_below(self, hours=24, end=None, **limits):
+        """
+        Leitos com algum valor abaixo do limite em cada índice, na janela.
+
+        Exemplo: ``patients_below(pao2_fio2=150, rox_index=3.85)`` são os
+        leitos que tiveram P/F < 150 e ROX < 3,85 nas últimas 24 h.
+        """
+        if not limits:
+            raise ValueError("Informe ao menos um limite, por exemplo pao2_fio2=150.")
+        start, stop = self._window(hours, end)
+        # Horas completas dentro da janela vêm do resumo; as pontas, das observações
+        first_hour = -(-start // HOUR_MS) * HOUR_MS
+        last_hour = stop // HOUR_MS * HOUR_MS
+        if first_hour >= last_hour:
+            first_hour = last_hour = stop
+        db = self._connection()
+        patients = None
+        for metric, limit in limits.items():
+            _check_metric(metric)
+            found = {row[0] for row in db.execute(_BELOW[metric], (start, first_hour, limit))}
+            found.update(row[0] for row in db.execute(_BELOW_HOURLY, (metric, first_hour, last_hour, limit)))
+            found.update(row[0] for row in db.execute(_BELOW[metric], (last_hour, stop, limit)))
+            patients = found if patients is None else patients & found
+        return sorted(patients)
+
+    def hourly(self, metric, hours=24, end=None):
+        """
+        Resumo da unidade por hora: (início da hora em ms, n, média, mínimo, máximo).
+
+        Inclui as horas inteiras que tocam a janela.
+        """
+        _check_metric(metric)
+        start, stop = self._window(hours, end)
+        return self._connection().execute(_HOURLY, (metric, start // HOUR_MS * HOUR_MS, stop)).fetchall()
+
+    def before_extubation(self, metric="irrs", hours=24, since_hours=24 * 30, end=None):
+        """
+        Evolução do índice nas ``hours`` horas antes de cada extubação.
+
+        Considera as extubações das últimas ``since_hours`` horas e devolve,
+        por hora antes da extubação (0 = última hora): (horas, n, média,
+        mínimo, máximo).
+        """
+        _check_metric(metric)
+        start, stop = self._window(since_hours, end)
+        return self._connection().execute(
+            _BEFORE_EXTUBATION[metric], (int(hours * HOUR_MS), start, stop)
+        ).fetchall()
+
+    def close(self):
+        self.flush()
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+_cohort = None
+_cohort_lock = threading.Lock()
+
+
+def get_cohort():
+    """Base do processo a partir de ``SMARTCALC_COHORT_DB``; None se não configurada."""
+    global _cohort
+    path = os.environ.get("SMARTCALC_COHORT_DB")
+    if not path:
+        return None
+    with _cohort_lock:
+        if _cohort is None:
+            _cohort = CohortStore(path)
+            atexit.register(_cohort.flush)
+    return _cohort
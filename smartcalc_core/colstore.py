@@ -0,0 +1,168 @@
+"""
+Armazenamento colunar mapeado em memória para os índices por ciclo.
+
+Cada série (por exemplo, um leito) é um diretório com:
+
+    meta.json        nomes das colunas
+    timestamp.i8     instante de cada linha (int64, milissegundos desde epoch)
+    <coluna>.f4      uma coluna float32 por índice
+
+Os arquivos só crescem (append-only). A leitura usa ``numpy.memmap``, então
+uma consulta por intervalo devolve fatias das páginas mapeadas, sem cópia e
+sem parsing. O timestamp é gravado por último: um leitor nunca vê uma linha
+cujas colunas ainda não foram escritas.
+
+Vários processos podem gravar na mesma série: ``append`` segura um
+``flock`` exclusivo no arquivo ``.lock`` do diretório enquanto confere o
+tamanho e escreve. Sem ``fcntl`` (Windows), só um processo pode gravar.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Colunas padrão da seção de Ventilação Mecânica
+VENTILATION_COLUMNS = ("static_compliance", "resistance", "time_constant", "driving_pressure")
+
+TIMESTAMP_FILE = "timestamp.i8"
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+class ColumnStore:
+    """
+    Série append-only de colunas float32 indexadas por timestamp.
+
+    Parâmetros:
+        path (str): Diretório da série (criado se não existir).
+        columns (Sequence[str]): Colunas da série. Ignorado quando a série já
+            existe; nesse caso valem as colunas gravadas em ``meta.json``.
+    """
+
+    def __init__(self, path, columns=VENTILATION_COLUMNS):
+        self.path = path
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.columns = tuple(json.load(f)["columns"])
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.columns = tuple(columns)
+            with open(meta_path, "w") as f:
+                json.dump({"columns": list(self.columns)}, f)
+        self._maps = None
+        self._mapped_rows = -1
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def __len__(self):
+        try:
+            return os.path.getsize(self._file(TIMESTAMP_FILE)) // 8
+        except FileNotFoundError:
+            return 0
+
+    def append(self, timestamps, **columns):
+        """
+        Acrescenta linhas à série.
+
+        Parâmetros:
+            timestamps (array de int): Instantes em ms, em ordem não
+                decrescente e não anteriores à última linha gravada.
+            **columns: Um array por coluna; colunas omitidas ficam NaN.
+        """
+        timestamps = np.atleast_1d(np.asarray(timestamps, dtype=np.int64))
+        unknown = set(columns) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Colunas desconhecidas: {', '.join(sorted(unknown))}")
+        if np.any(np.diff(timestamps) < 0):
+            raise ValueError("Os timestamps devem estar em ordem crescente.")
+        data = {}
+        for name in self.columns:
+            values = columns.get(name)
+            if values is None:
+                data[name] = np.full(len(timestamps), np.nan, dtype=np.float32)
+            else:
+                data[name] = np.broadcast_to(np.asarray(values, dtype=np.float32), timestamps.shape)
+
+        with open(self._file(LOCK_FILE), "ab") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            rows = len(self)
+            if rows and len(timestamps) and timestamps[0] < self._last_timestamp(rows):
+                raise ValueError("Os timestamps não podem ser anteriores à última linha gravada.")
+            for name, values in data.items():
+                # Grava logo após a última linha completa; bytes de uma escrita
+                # interrompida (sem o timestamp) são sobrescritos
+                with os.fdopen(os.open(self._file(f"{name}.f4"), os.O_WRONLY | os.O_CREAT, 0o644), "wb") as f:
+                    f.seek(rows * 4)
+                    f.write(values.tobytes())
+            with open(self._file(TIMESTAMP_FILE), "ab") as f:
+                f.write(timestamps.tobytes())
+
+    def _last_timestamp(self, rows):
+        with open(self._file(TIMESTAMP_FILE), "rb") as f:
+            f.seek((rows - 1) * 8)
+            return np.frombuffer(f.read(8), dtype=np.int64)[0]
+
+    def _rows(self):
+        # Linhas com todas as colunas gravadas: um arquivo de coluna menor que
+        # o de timestamps (cópia parcial, disco cheio) limita a leitura
+        rows = len(self)
+        for name in self.columns:
+            try:
+                rows = min(rows, os.path.getsize(self._file(f"{name}.f4")) // 4)
+            except FileNotFoundError:
+                return 0
+        return rows
+
+    def _remap(self):
+        rows = self._rows()
+        if rows != self._mapped_rows:
+            if rows == 0:
+                self._maps = {"timestamp": np.empty(0, dtype=np.int64)}
+                self._maps.update((name, np.empty(0, dtype=np.float32)) for name in self.columns)
+            else:
+                self._maps = {"timestamp": np.memmap(self._file(TIMESTAMP_FILE), np.int64, "r", shape=(rows,))}
+                for name in self.columns:
+                    self._maps[name] = np.memmap(self._file(f"{name}.f4"), np.float32, "r", shape=(rows,))
+            self._mapped_rows = rows
+        return self._maps
+
+    def range(self, start_ms, end_ms=None):
+        """
+        Linhas com ``start_ms <= timestamp < end_ms``.
+
+        Retorna:
+            dict[str, numpy.ndarray]: "timestamp" e uma entrada por coluna,
+            todas fatias (views) dos arquivos mapeados.
+        """
+        maps = self._remap()
+        ts = maps["timestamp"]
+        lo = np.searchsorted(ts, start_ms, side="left")
+        hi = len(ts) if end_ms is None else np.searchsorted(ts, end_ms, side="left")
+        return {name: values[lo:hi] for name, values in maps.items()}
+
+    def last(self, seconds, now=None):
+        # Ex.: store.last(6 * 3600) para as últimas 6 horas
+        end = now_ms() if now is None else now
+        return self.range(end - int(seconds * 1000), end + 1)
+
+
+def bed_store(root, bed, columns=VENTILATION_COLUMNS):
+    """Abre (ou cria) a série de um leito dentro de ``root``."""
+    bed = str(bed).strip()
+    if not bed or not all(c.isalnum() or c in "-_" for c in bed):
+        raise ValueError(f"Identificador de leito inválido: {bed!r}")
+    return ColumnStore(os.path.join(root, f"leito-{bed}"), columns)
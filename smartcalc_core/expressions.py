@@ -0,0 +1,218 @@
+"""
+Calculadoras definidas por expressões aritméticas sobre entradas nomeadas.
+
+Uma expressão como ``tidal_volume / (peak_pressure - peep)`` é analisada uma
+única vez com ``ast``: só números, nomes das entradas, ``+ - * / **``,
+parênteses e as funções de ``FUNCTIONS`` são aceitos. A árvore validada vira
+uma função Python compilada (``lambda entradas: expressão``), chamada
+diretamente daí em diante, sem ``eval`` por chamada. Como as funções são as
+do NumPy, a mesma função serve para um paciente (floats) e para colunas
+inteiras (arrays), na velocidade de uma expressão NumPy escrita à mão.
+
+Fórmulas extras podem ser declaradas num arquivo JSON indicado por
+``SMARTCALC_FORMULAS_FILE``:
+
+    [{"name": "cdyn", "title": "Complacência Dinâmica", "unit": "mL/cmH2O",
+      "expression": "vt / (ppico - peep)",
+      "inputs": [{"name": "vt", "label": "VC (mL)"}, {"name": "ppico", "label": "Pico"},
+                 {"name": "peep", "label": "PEEP"}]}]
+
+Uso:
+    cdyn = BUILTIN["dynamic_compliance"]
+    cdyn(450, 30, 8)                                  # um paciente
+    cdyn.evaluate({"tidal_volume": vt, "peak_pressure": pico, "peep": peep})  # arrays
+"""
+
+import ast
+import json
+import os
+
+import numpy as np
+
+MAX_EXPRESSION_LENGTH = 500
+
+FUNCTIONS = {
+    "sqrt": np.sqrt,
+    "log": np.log,
+    "exp": np.exp,
+    "abs": np.abs,
+    "min": np.minimum,
+    "max": np.maximum,
+}
+
+_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd)
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+class _Validator(ast.NodeTransformer):
+    # Recusa tudo o que não for aritmética sobre as entradas; inteiros viram
+    # float para que potências enormes estourem em vez de travar o processo
+
+    def __init__(self, inputs):
+        self.inputs = set(inputs)
+
+    def generic_visit(self, node):
+        if not isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Load) + _OPERATORS):
+            raise ExpressionError(f"Construção não permitida: {type(node).__name__}")
+        return super().generic_visit(node)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ExpressionError(f"Constante não permitida: {node.value!r}")
+        return ast.copy_location(ast.Constant(float(node.value)), node)
+
+    def visit_Name(self, node):
+        if node.id not in self.inputs:
+            raise ExpressionError(f"Entrada desconhecida: {node.id!r}")
+        return node
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+            raise ExpressionError("Só são permitidas as funções " + ", ".join(FUNCTIONS) + ".")
+        # Todas são ufuncs: ``nin`` é o número de argumentos
+        arity = FUNCTIONS[node.func.id].nin
+        if len(node.args) != arity:
+            raise ExpressionError(f"{node.func.id}() recebe {arity} argumento(s), não {len(node.args)}.")
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+
+def compile_expression(source, inputs):
+    """
+    Valida ``source`` e devolve uma função com os parâmetros ``inputs``.
+
+    Levanta ExpressionError se a expressão usar algo fora da aritmética
+    permitida ou nomes que não estão em ``inputs``.
+    """
+    if len(source) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Expressão maior que {MAX_EXPRESSION_LENGTH} caracteres.")
+    for name in inputs:
+        if not name.isidentifier() or name in FUNCTIONS:
+            raise ExpressionError(f"Nome de entrada inválido: {name!r}")
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Expressão inválida: {e.msg}") from None
+    body = _Validator(inputs).visit(tree).body
+    function = ast.Expression(ast.Lambda(
+        args=ast.arguments(
+            posonlyargs=[], args=[ast.arg(name) for name in inputs], kwonlyargs=[], kw_defaults=[], defaults=[]
+        ),
+        body=body,
+    ))
+    ast.fix_missing_locations(function)
+    code = compile(function, "<expressão>", "eval")
+    # Única avaliação: cria a função, sem acesso a builtins
+    return eval(code, {"__builtins__": {}, **FUNCTIONS})
+
+
+class Expression:
+    """
+    Calculadora definida por uma expressão.
+
+    Parâmetros:
+        name (str): Identificador (sem espaços).
+        title (str): Título exibido no aplicativo.
+        source (str): Expressão aritmética sobre as entradas.
+        inputs (Sequence[tuple]): (nome, rótulo) ou (nome, rótulo, unidade) de cada entrada.
+        unit (str): Unidade do resultado.
+    """
+
+    def __init__(self, name, title, source, inputs, unit=""):
+        self.name = name
+        self.title = title
+        self.source = source
+        self.inputs = tuple((item + ("",))[:3] for item in map(tuple, inputs))
+        self.unit = unit
+        self.function = compile_expression(source, [item[0] for item in self.inputs])
+
+    def __call__(self, *args):
+        """
+        Valor para um paciente.
+
+        Levanta ValueError se uma entrada não for um número finito e
+        ArithmeticError (ZeroDivisionError, OverflowError, ...) se o resultado
+        não for um número real finito: as funções do NumPy devolvem inf, NaN
+        ou complexo em vez de levantar, como fazem as fórmulas escalares.
+        """
+        values = [float(arg) for arg in args]
+        if not all(np.isfinite(values)):
+            raise ValueError("As entradas devem ser números finitos.")
+        with np.errstate(all="ignore"):
+            result = self.function(*values)
+        if isinstance(result, complex) or not np.isfinite(result):
+            raise ArithmeticError(f"Resultado indefinido para os valores informados: {result}")
+        return float(result)
+
+    def evaluate(self, columns):
+        """
+        Calcula a expressão para colunas inteiras.
+
+        ``columns`` mapeia o nome de cada entrada para um array. Linhas
+        inválidas (divisão por zero, log de negativo, entrada NaN) ficam NaN.
+        """
+        arrays = [np.asarray(columns[name], dtype=np.float64) for name, _, _ in self.inputs]
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            result = np.asarray(self.function(*arrays), dtype=np.float64)
+        result[~np.isfinite(result)] = np.nan
+        return result
+
+
+BUILTIN = {expression.name: expression for expression in (
+    Expression(
+        "dynamic_compliance", "Complacência Dinâmica (Cdyn)", "tidal_volume / (peak_pressure - peep)",
+        (("tidal_volume", "Volume Corrente", "mL"), ("peak_pressure", "Pressão de Pico", "cmH2O"),
+         ("peep", "PEEP", "cmH2O")),
+        "mL/cmH2O",
+    ),
+    Expression(
+        "oxygenation_index", "Índice de Oxigenação (IO)", "fio2 * 100 * mean_airway_pressure / pao2",
+        (("fio2", "FiO2", "fração"), ("mean_airway_pressure", "Pressão Média de Vias Aéreas", "cmH2O"),
+         ("pao2", "PaO2", "mmHg")),
+    ),
+    Expression(
+        "ventilatory_ratio", "Ventilatory Ratio (VR)",
+        "(minute_ventilation * 1000 * paco2) / (predicted_weight * 100 * 37.5)",
+        (("minute_ventilation", "Volume Minuto", "L/min"), ("paco2", "PaCO2", "mmHg"),
+         ("predicted_weight", "Peso Predito", "kg")),
+    ),
+    Expression(
+        "p01_pimax", "P0.1 / PImáx", "abs(p01) / abs(pimax)",
+        (("p01", "P0.1", "cmH2O"), ("pimax", "PImáx", "cmH2O")),
+    ),
+)}
+
+
+def load_expressions(path):
+    """Lê calculadoras de um arquivo JSON (lista de objetos como no exemplo acima)."""
+    with open(path) as f:
+        items = json.load(f)
+    return {
+        item["name"]: Expression(
+            item["name"],
+            item.get("title", item["name"]),
+            item["expression"],
+            [(i["name"], i.get("label", i["name"]), i.get("unit", "")) for i in item["inputs"]],
+            item.get("unit", ""),
+        )
+        for item in items
+    }
+
+
+_loaded = None
+
+
+def get_expressions():
+    """
+    Calculadoras embutidas mais as de ``SMARTCALC_FORMULAS_FILE``, se houver.
+
+    O arquivo é lido e compilado na primeira chamada do processo.
+    """
+    global _loaded
+    if _loaded is None:
+        path = os.environ.get("SMARTCALC_FORMULAS_FILE")
+        _loaded = {**BUILTIN, **load_expressions(path)} if path else dict(BUILTIN)
+    return _loaded
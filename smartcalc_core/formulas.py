@@ -0,0 +1,104 @@
+"""
+Fórmulas do SmartCalc em Python puro.
+
+Este módulo não importa o Streamlit nem bibliotecas externas, podendo ser
+usado tanto pelo aplicativo quanto por rotinas em lote e serviços.
+"""
+
+# Rótulos de gênero aceitos (o aplicativo usa "Masculino"/"Feminino")
+MALE = ("Masculino", "Homem")
+FEMALE = ("Feminino", "Mulher")
+
+
+def calculate_height_chumlea(gender, age, aj):
+    if gender in MALE:
+        return (2.02 * aj) - (0.04 * age) + 64.19
+    elif gender in FEMALE:
+        return (1.83 * aj) - (0.24 * age) + 84.88
+    else:
+        return None
+
+def calculate_ideal_weight(gender, height):
+    if gender in MALE:
+        return 50 + 0.91 * (height - 152.4)
+    elif gender in FEMALE:
+        return 45.5 + 0.91 * (height - 152.4)
+    else:
+        return None
+
+def calculate_time_constant(rva, cst):
+    return (rva * cst) / 1000
+
+def calculate_driving_pressure(plateau_pressure, peep):
+    return plateau_pressure - peep
+
+def calculate_static_compliance(tidal_volume, plateau_pressure, peep):
+    return tidal_volume / (plateau_pressure - peep)
+
+def calculate_resistance(peak_pressure, plateau_pressure, flow_lmin):
+    flow_ls = flow_lmin / 60  # Converter fluxo de L/min para L/s
+    return (peak_pressure - plateau_pressure) / flow_ls if flow_ls > 0 else None
+
+def calculate_mechanical_power(fr, vc, ppico, dp):
+    # Fórmula simplificada de Gattinoni (VC em litros)
+    return 0.098 * fr * vc * (ppico - dp / 2)
+
+def calculate_muscular_pressure(delta_pocc):
+    return delta_pocc * 0.75
+
+def calculate_irrs(fr, vt):
+    return fr / vt
+
+def calculate_predicted_pimax(gender, age):
+    if gender in MALE:
+        return 155.3 - (0.80 * age)
+    elif gender in FEMALE:
+        return 110.4 - (0.49 * age)
+    else:
+        return None
+
+def calculate_predicted_pemax(gender, age):
+    if gender in MALE:
+        return 165.3 - (0.81 * age)
+    elif gender in FEMALE:
+        return 115.6 - (0.61 * age)
+    else:
+        return None
+
+def calculate_rox_index(spo2, fio2, fr):
+    return (spo2 / fio2) / fr
+
+def calculate_ri_ratio(vteh_l, vteh, vti, pplatl, peepl, peeph):
+    """
+    Calcula a R/I ratio (Pan e col.).
+
+    Levanta ZeroDivisionError quando PEEPH == PEEPL ou VTi == 0.
+    """
+    delta_vt = (vteh_l - vteh) / vti
+    delta_p = (pplatl - peepl) / (peeph - peepl)
+    return (delta_vt * delta_p) - 1
+
+def calculate_pao2_fio2(pao2, fio2):
+    """
+    Calcula a relação PaO2/FiO2.
+
+    Parâmetros:
+        pao2 (float): Pressão arterial de oxigênio (PaO2).
+        fio2 (float): Fração inspirada de oxigênio (FiO2).
+
+    Retorna:
+        float: Relação PaO2/FiO2 calculada.
+        str: Mensagem de erro, caso os valores sejam inválidos.
+    """
+    try:
+        # Verifica se PaO2 e FiO2 são válidos
+        if pao2 is None or fio2 is None:
+            return None, "Os valores de PaO2 e FiO2 não podem estar vazios."
+        if fio2 <= 0:
+            return None, "O valor de FiO2 deve ser maior que zero."
+
+        # Calcula a relação PaO2/FiO2
+        relacao = pao2 / fio2
+        return relacao, None
+    except Exception as e:
+        return None, f"Ocorreu um erro: {str(e)}"
@@ -0,0 +1,99 @@
+"""
+Histórico compacto dos resultados calculados numa sessão.
+
+Cada categoria do aplicativo guarda seus resultados num ``ResultHistory``: um
+buffer circular de tamanho fixo sobre arrays NumPy (instante em ms, código da
+calculadora e valor), em vez de uma lista de dicionários. A memória é
+alocada uma vez e não cresce; quando o buffer enche, o resultado mais antigo
+é sobrescrito. Com a capacidade padrão (500), cada histórico ocupa cerca de
+9 KB.
+
+Uso:
+    history = ResultHistory(500)
+    history.record("ROX Index", 4.87)
+    history.latest("ROX Index", 5)     # valores, do mais recente ao mais antigo
+    history.entries()                  # colunas para st.dataframe
+"""
+
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_CAPACITY = 500
+
+# Nomes das calculadoras, compartilhados por todas as sessões do processo;
+# cada registro guarda só o código (posição nesta lista)
+_names = []
+_codes = {}
+_codes_lock = threading.Lock()
+
+
+def _code(name):
+    code = _codes.get(name)
+    if code is None:
+        # Sessões em threads diferentes podem registrar o mesmo nome ao mesmo tempo
+        with _codes_lock:
+            code = _codes.get(name)
+            if code is None:
+                _names.append(name)
+                code = _codes[name] = len(_names) - 1
+    return code
+
+
+class ResultHistory:
+    """
+    Buffer circular dos últimos ``capacity`` resultados.
+
+    Parâmetros:
+        capacity (int): Número máximo de resultados guardados.
+    """
+
+    __slots__ = ("capacity", "_times", "_codes", "_values", "_next", "_size")
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("A capacidade deve ser de pelo menos um resultado.")
+        self.capacity = capacity
+        self._times = np.zeros(capacity, dtype=np.int64)
+        self._codes = np.zeros(capacity, dtype=np.uint16)
+        self._values = np.zeros(capacity, dtype=np.float64)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def record(self, name, value, t=None):
+        """Registra ``value`` da calculadora ``name`` (``t`` em ms, padrão: agora)."""
+        i = self._next
+        self._times[i] = int(time.time() * 1000) if t is None else t
+        self._codes[i] = _code(name)
+        self._values[i] = value
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _order(self):
+        # Posições do mais antigo ao mais recente
+        start = (self._next - self._size) % self.capacity
+        return (start + np.arange(self._size)) % self.capacity
+
+    def latest(self, name, n=5):
+        """Últimos ``n`` valores de uma calculadora, do mais recente ao mais antigo."""
+        code = _codes.get(name)
+        if code is None or not self._size:
+            return []
+        order = self._order()[::-1]
+        return self._values[order[self._codes[order] == code][:n]].tolist()
+
+    def entries(self):
+        """Todos os resultados, do mais recente ao mais antigo, em colunas."""
+        order = self._order()[::-1]
+        return {
+            "timestamp": self._times[order],
+            "calculator": [_names[code] for code in self._codes[order].tolist()],
+            "value": self._values[order],
+        }
+
+    def clear(self):
+        self._next = self._size = 0
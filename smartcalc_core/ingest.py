@@ -0,0 +1,302 @@
+"""
+Recepção assíncrona das leituras de ventiladores e monitores à beira do leito.
+
+Cada dispositivo abre uma conexão TCP e envia uma leitura por linha, no
+formato (parecido com um segmento HL7):
+
+    LEITO|campo=valor|campo=valor|...
+
+por exemplo ``12|spo2=94|fio2=0.4|rr=22|peak_pressure=30|plateau_pressure=24|peep=8|tidal_volume=450|flow=60``.
+``t`` (segundos desde epoch) é opcional; sem ele vale a hora de chegada.
+
+Todas as conexões são atendidas por um único loop ``asyncio``. As leituras
+vão para uma fila limitada; quando o consumidor atrasa, ``queue.put`` espera,
+a conexão para de ser lida e o TCP segura o dispositivo (backpressure), sem
+crescer a memória. O consumidor tira as leituras em lotes, calcula os índices
+com as fórmulas do aplicativo, avalia os alertas de ``smartcalc_core.alerts``
+e, com ``--store-dir``, grava os índices de ventilação no mesmo armazenamento
+que o histórico do aplicativo lê (``SMARTCALC_STORE_DIR``). Com
+``--cohort-db``, as leituras com ROX, PaO2/FiO2 ou IRRS vão também para a base
+da unidade (``smartcalc_core.cohort``). As gravações em disco rodam numa
+thread (``asyncio.to_thread``), sem parar o loop que atende as conexões.
+
+Uma leitura que falha no cálculo é contada em ``invalid`` e descartada; se o
+consumidor parar por outro motivo, ``serve`` termina com o erro, em vez de
+deixar a fila encher e os dispositivos esperando.
+
+Uso:
+    python -m smartcalc_core.ingest serve --port 2575 --store-dir /dados/leitos --cohort-db /dados/coorte.db
+    python -m smartcalc_core.ingest simulate --port 2575 --beds 300 --rate 1
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+
+from smartcalc_core import alerts, cohort
+from smartcalc_core.colstore import VENTILATION_COLUMNS, bed_store
+from smartcalc_core.formulas import calculate_resistance, calculate_static_compliance, calculate_time_constant
+
+DEFAULT_PORT = 2575
+DEFAULT_QUEUE_SIZE = 10_000
+BATCH_SIZE = 1_000
+MAX_LINE_SIZE = 4096
+
+FIELDS = (
+    "t", "spo2", "fio2", "rr", "pao2", "peak_pressure",
+    "plateau_pressure", "peep", "tidal_volume", "flow",
+)
+
+
+def parse_line(line):
+    """
+    Converte uma linha do protocolo num evento ``{"bed": ..., campo: float}``.
+
+    Levanta ValueError se a linha for inválida ou tiver valores não finitos
+    (nan, inf). Campos desconhecidos são ignorados.
+    """
+    bed, *pairs = line.strip().split("|")
+    if not bed:
+        raise ValueError("Linha sem leito.")
+    event = {"bed": bed}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise ValueError(f"Campo inválido: {pair!r}")
+        if key in FIELDS:
+            event[key] = float(value)
+            if not math.isfinite(event[key]):
+                raise ValueError(f"Valor não finito: {pair!r}")
+    return event
+
+
+def compute_metrics(event):
+    """Índices de oxigenação, alertas e ventilação calculáveis com o evento."""
+    metrics = alerts.derive_metrics(event)
+    get = event.get
+    peak, plateau, peep = get("peak_pressure"), get("plateau_pressure"), get("peep")
+    tidal_volume, flow = get("tidal_volume"), get("flow")
+    if tidal_volume is not None and plateau is not None and peep is not None and plateau != peep:
+        metrics["static_compliance"] = calculate_static_compliance(tidal_volume, plateau, peep)
+    if peak is not None and plateau is not None and flow is not None:
+        resistance = calculate_resistance(peak, plateau, flow)
+        if resistance is not None:
+            metrics["resistance"] = resistance
+            if "static_compliance" in metrics:
+                metrics["time_constant"] = calculate_time_constant(resistance, metrics["static_compliance"])
+    return metrics
+
+
+class Ingestor:
+    """
+    Servidor de ingestão com fila limitada entre as conexões e o consumidor.
+
+    Parâmetros:
+        queue_size (int): Leituras máximas aguardando processamento.
+        store_dir (str, opcional): Diretório dos armazenamentos por leito.
+        rules (Sequence[alerts.Rule]): Regras de alerta.
+        on_alert (callable, opcional): Chamado com cada ``alerts.Alert``.
+        cohort_store (cohort.CohortStore, opcional): Base da unidade.
+    """
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE, store_dir=None, rules=alerts.DEFAULT_RULES, on_alert=None,
+                 cohort_store=None):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.store_dir = store_dir
+        self.cohort_store = cohort_store
+        self.engine = alerts.AlertEngine(rules)
+        self.on_alert = on_alert
+        self.connections = 0
+        self.received = 0
+        self.processed = 0
+        self.invalid = 0
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Linha maior que o limite do StreamReader
+                    self.invalid += 1
+                    break
+                if not line:
+                    break
+                try:
+                    event = parse_line(line.decode("utf-8"))
+                except (UnicodeDecodeError, ValueError):
+                    self.invalid += 1
+                    continue
+                event.setdefault("t", time.time())
+                self.received += 1
+                await self.queue.put(event)
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    def _store(self, rows):
+        # Uma escrita por leito para o lote inteiro
+        for bed, items in rows.items():
+            items.sort(key=lambda item: item[0])
+            timestamps = [t for t, _ in items]
+            columns = {
+                name: [metrics.get(name, float("nan")) for _, metrics in items] for name in VENTILATION_COLUMNS
+            }
+            try:
+                bed_store(self.store_dir, bed).append(timestamps, **columns)
+            except (ValueError, OverflowError) as e:
+                print(f"Leito {bed!r}: leituras não armazenadas: {e}", file=sys.stderr)
+
+    def process(self, events):
+        """
+        Calcula índices e alertas de um lote de eventos.
+
+        Retorna:
+            tuple: Gravações pendentes do lote, ``(linhas por leito,
+            observações da base)``, para ``write``.
+        """
+        rows = {}
+        observations = []
+        for event in events:
+            try:
+                t = int(event["t"] * 1000)
+                if not 0 <= t < 2 ** 63:
+                    raise ValueError(f"Instante fora da faixa: {event['t']}")
+                metrics = compute_metrics(event)
+                for alert in self.engine.process(event):
+                    if self.on_alert is not None:
+                        self.on_alert(alert)
+            except Exception as e:
+                self.invalid += 1
+                print(f"Leitura descartada ({type(e).__name__}: {e}): {event}", file=sys.stderr)
+                continue
+            if self.store_dir and any(name in metrics for name in VENTILATION_COLUMNS):
+                rows.setdefault(event["bed"], []).append((t, metrics))
+            if self.cohort_store is not None and any(name in metrics for name in cohort.DERIVED):
+                inputs = {name: event[name] for name in cohort.INPUTS if name in event}
+                observations.append((event["bed"], t, inputs))
+            self.processed += 1
+        return rows, observations
+
+    def write(self, rows, observations):
+        """Grava os índices por leito e as observações da base (bloqueante)."""
+        if rows:
+            self._store(rows)
+        for bed, t, inputs in observations:
+            self.cohort_store.add(bed, t, **inputs)
+
+    async def consume(self):
+        while True:
+            events = [await self.queue.get()]
+            while len(events) < BATCH_SIZE and not self.queue.empty():
+                events.append(self.queue.get_nowait())
+            rows, observations = self.process(events)
+            if rows or observations:
+                await asyncio.to_thread(self.write, rows, observations)
+            for _ in events:
+                self.queue.task_done()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, report_every=10):
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_SIZE, backlog=1024)
+        consumer = asyncio.create_task(self.consume())
+        try:
+            async with server:
+                while True:
+                    done, _ = await asyncio.wait({consumer}, timeout=report_every)
+                    if done:
+                        # Sem consumidor a fila enche e as conexões param para sempre
+                        consumer.result()
+                        raise RuntimeError("O consumidor da fila terminou.")
+                    print(
+                        f"conexões={self.connections} recebidas={self.received} processadas={self.processed} "
+                        f"inválidas={self.invalid} fila={self.queue.qsize()}",
+                        file=sys.stderr,
+                    )
+        finally:
+            consumer.cancel()
+
+
+def format_line(bed, reading):
+    return "|".join([str(bed)] + [f"{key}={value}" for key, value in reading.items()]) + "\n"
+
+
+async def simulate_bed(host, port, bed, rate, duration):
+    """Envia leituras plausíveis de um leito a ``rate`` linhas por segundo."""
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random(bed)
+    reading = {"spo2": 95.0, "fio2": 0.4, "rr": 20.0, "pao2": 90.0, "peak_pressure": 30.0,
+               "plateau_pressure": 22.0, "peep": 8.0, "tidal_volume": 450.0, "flow": 60.0}
+    deadline = time.monotonic() + duration
+    sent = 0
+    try:
+        while time.monotonic() < deadline:
+            # Passeio aleatório em torno dos valores iniciais
+            reading["spo2"] = min(100.0, max(80.0, reading["spo2"] + rng.uniform(-1, 1)))
+            reading["rr"] = min(40.0, max(8.0, reading["rr"] + rng.uniform(-1, 1)))
+            reading["pao2"] = min(150.0, max(40.0, reading["pao2"] + rng.uniform(-3, 3)))
+            reading["plateau_pressure"] = min(35.0, max(12.0, reading["plateau_pressure"] + rng.uniform(-0.5, 0.5)))
+            reading["peak_pressure"] = reading["plateau_pressure"] + 8
+            line = format_line(bed, {"t": round(time.time(), 3), **{k: round(v, 2) for k, v in reading.items()}})
+            writer.write(line.encode())
+            await writer.drain()
+            sent += 1
+            await asyncio.sleep(1 / rate)
+    finally:
+        writer.close()
+    return sent
+
+
+async def simulate(host="127.0.0.1", port=DEFAULT_PORT, beds=100, rate=1.0, duration=60.0):
+    counts = await asyncio.gather(
+        *(simulate_bed(host, port, f"leito-{i + 1}", rate, duration) for i in range(beds))
+    )
+    return sum(counts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m smartcalc_core.ingest", description="Ingestão de leituras dos leitos.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Recebe leituras dos dispositivos")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    serve.add_argument("--store-dir", help="Grava os índices de ventilação por leito neste diretório")
+    serve.add_argument("--rules", help="Arquivo JSON com as regras de alerta")
+    serve.add_argument("--cohort-db", help="Grava ROX, PaO2/FiO2 e IRRS na base da unidade (SQLite)")
+    sim = commands.add_parser("simulate", help="Simula dispositivos enviando leituras")
+    sim.add_argument("--host", default="127.0.0.1")
+    sim.add_argument("--port", type=int, default=DEFAULT_PORT)
+    sim.add_argument("--beds", type=int, default=100)
+    sim.add_argument("--rate", type=float, default=1.0, help="Leituras por segundo por leito")
+    sim.add_argument("--duration", type=float, default=60.0, help="Duração em segundos")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "serve":
+            ingestor = Ingestor(
+                args.queue_size,
+                args.store_dir,
+                alerts.load_rules(args.rules) if args.rules else alerts.DEFAULT_RULES,
+                on_alert=lambda alert: print(json.dumps(alert._asdict(), ensure_ascii=False), flush=True),
+                cohort_store=cohort.CohortStore(args.cohort_db) if args.cohort_db else None,
+            )
+            print(f"Ingestão em {args.host}:{args.port}", file=sys.stderr)
+            asyncio.run(ingestor.serve(args.host, args.port))
+        else:
+            start = time.perf_counter()
+            sent = asyncio.run(simulate(args.host, args.port, args.beds, args.rate, args.duration))
+            elapsed = time.perf_counter() - start
+            print(f"{sent} leituras de {args.beds} leitos em {elapsed:.1f} s ({sent / elapsed:.0f}/s)")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Tabelas pré-calculadas para as calculadoras de entradas discretas.
+
+As calculadoras abaixo só recebem valores das listas dos selectboxes, então
+todos os resultados possíveis cabem numa grade pequena:
+
+    pimax, pemax      gênero x idade 18-100
+    height_chumlea    gênero x idade 0-104 x AJ 0-100
+    ideal_weight      gênero x altura 130-210
+    rox_index         SpO2 0-100 x FiO2 0,21-1,00 x FR 0-100
+
+As grades são calculadas uma vez com ``smartcalc_core.batch`` (ou carregadas
+de um arquivo ``.npz``) e as consultas viram indexação. Valores fora da grade
+são calculados diretamente, então o resultado é sempre o mesmo de
+``smartcalc_core.batch``.
+
+Uso:
+    tables = get_tables()                 # monta na primeira chamada
+    tables.pimax(["Masculino"], [40])
+    tables.save("lookup.npz"); LookupTables.load("lookup.npz")
+
+Para gerar o arquivo:
+    python -m smartcalc_core.lookup lookup.npz
+"""
+
+import sys
+
+import numpy as np
+
+from smartcalc_core import batch
+from smartcalc_core.formulas import FEMALE, MALE
+
+
+class Axis:
+    """Eixo numérico regular: start, start + step, ..., stop (inclusive)."""
+
+    def __init__(self, start, stop, step=1):
+        self.start = start
+        self.step = step
+        self.size = int(round((stop - start) / step)) + 1
+
+    def values(self):
+        return np.round(self.start + np.arange(self.size) * self.step, 10)
+
+    def index(self, x):
+        # Índice na grade e máscara dos valores que caem exatamente num ponto dela
+        x = np.asarray(x)
+        if x.dtype.kind in "iu" and self.step == 1 and isinstance(self.start, int):
+            # Entradas inteiras num eixo de passo 1: o índice é só um deslocamento
+            idx = x - self.start
+            valid = (idx >= 0) & (idx < self.size)
+            return np.where(valid, idx, 0), valid
+        x = x.astype(np.float64)
+        position = (x - self.start) / self.step
+        idx = np.rint(np.nan_to_num(position, nan=-1.0)).astype(np.intp)
+        valid = (idx >= 0) & (idx < self.size) & (np.abs(position - idx) < 1e-6)
+        return np.where(valid, idx, 0), valid
+
+
+class GenderAxis:
+    """Eixo de gênero: 0 = masculino, 1 = feminino."""
+
+    size = 2
+
+    def values(self):
+        return np.array([MALE[0], FEMALE[0]])
+
+    def index(self, gender):
+        gender = np.asarray(gender)
+        if gender.dtype == np.bool_:
+            return np.where(gender, 0, 1), np.ones(gender.shape, dtype=bool)
+        male = np.isin(gender, MALE)
+        female = np.isin(gender, FEMALE)
+        return np.where(male, 0, 1), male | female
+
+
+class Table:
+    """
+    Resultados de ``direct`` em todos os pontos de uma grade.
+
+    Parâmetros:
+        direct (callable): Função vetorizada de ``smartcalc_core.batch``.
+        axes (Sequence[Axis | GenderAxis]): Um eixo por argumento.
+        values (numpy.ndarray, opcional): Grade já calculada.
+    """
+
+    def __init__(self, direct, axes, values=None):
+        self.direct = direct
+        self.axes = tuple(axes)
+        if values is None:
+            grid = np.meshgrid(*(axis.values() for axis in self.axes), indexing="ij")
+            values = direct(*grid)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+
+    def __call__(self, *args):
+        args = np.broadcast_arrays(*(np.asarray(a) for a in args))
+        indices = []
+        valid = np.ones(args[0].shape, dtype=bool)
+        for axis, arg in zip(self.axes, args):
+            idx, ok = axis.index(arg)
+            indices.append(idx)
+            valid &= ok
+        # Com argumentos escalares a indexação devolve um escalar numpy, que
+        # não aceita atribuição; asarray o transforma num array 0-d
+        result = np.asarray(self.values[tuple(indices)])
+        if not valid.all():
+            # Fora da grade: cálculo direto só para essas posições
+            result[~valid] = self.direct(*(arg[~valid] for arg in args))
+        return result[()] if result.ndim == 0 else result
+
+    def at(self, *indices):
+        """Consulta direta por índices da grade (ex.: posição escolhida no selectbox)."""
+        return self.values[indices]
+
+
+class LookupTables:
+    """Conjunto das tabelas das calculadoras de entradas discretas."""
+
+    NAMES = ("pimax", "pemax", "height_chumlea", "ideal_weight", "rox_index")
+
+    def __init__(self, values=None):
+        values = values or {}
+        gender = GenderAxis()
+        adult_age = Axis(18, 100)
+        self.pimax = Table(batch.calculate_predicted_pimax, (gender, adult_age), values.get("pimax"))
+        self.pemax = Table(batch.calculate_predicted_pemax, (gender, adult_age), values.get("pemax"))
+        self.height_chumlea = Table(
+            batch.calculate_height_chumlea, (gender, Axis(0, 104), Axis(0, 100)), values.get("height_chumlea")
+        )
+        self.ideal_weight = Table(batch.calculate_ideal_weight, (gender, Axis(130, 210)), values.get("ideal_weight"))
+        self.rox_index = Table(
+            batch.calculate_rox_index, (Axis(0, 100), Axis(0.21, 1.0, 0.01), Axis(0, 100)), values.get("rox_index")
+        )
+
+    def save(self, path):
+        np.savez_compressed(path, **{name: getattr(self, name).values for name in self.NAMES})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({name: data[name] for name in cls.NAMES})
+
+
+_tables = None
+
+
+def get_tables(path=None):
+    """Tabelas do processo, montadas (ou carregadas de ``path``) na primeira chamada."""
+    global _tables
+    if _tables is None:
+        _tables = LookupTables.load(path) if path else LookupTables()
+    return _tables
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Uso: python -m smartcalc_core.lookup ARQUIVO.npz")
+    LookupTables().save(sys.argv[1])
@@ -0,0 +1,202 @@
+"""
+Métricas opcionais do aplicativo no formato de texto do Prometheus.
+
+Desligadas por padrão. Com ``SMARTCALC_METRICS=1`` (ou o número de uma
+porta), o processo do Streamlit passa a contar chamadas, erros e latência de
+cada fórmula e de cada calculadora, além da duração dos reruns por categoria
+do menu, e expõe tudo em ``http://127.0.0.1:<porta>/metrics`` (porta padrão
+9108).
+
+Desligadas, ``instrument`` e ``instrument_block`` devolvem a própria função,
+então não há custo algum no caminho das fórmulas.
+
+Uso:
+    calculate_rox_index = instrument(calculate_rox_index)
+
+    @instrument_block
+    def render_rox_index(): ...
+"""
+
+import bisect
+import functools
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 9108
+
+_setting = os.environ.get("SMARTCALC_METRICS", "")
+ENABLED = _setting not in ("", "0")
+PORT = int(_setting) if _setting.isdigit() and _setting != "1" else DEFAULT_PORT
+
+# Limites dos buckets em segundos: de 1 us (fórmulas) a 10 s (reruns lentos)
+LATENCY_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+
+class Counter:
+    def __init__(self, name, help, label):
+        self.name = name
+        self.help = help
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value, amount=1):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for value, count in sorted(self._values.items()):
+                lines.append(f'{self.name}{{{self.label}="{value}"}} {count}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, label, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = buckets
+        self._values = {}  # valor do rótulo -> [contagem por bucket..., soma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, seconds):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            data = self._values.get(label_value)
+            if data is None:
+                data = self._values[label_value] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                data[i] += 1
+            data[-2] += seconds
+            data[-1] += 1
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for value, data in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, data):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{self.label}="{value}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{self.label}="{value}",le="+Inf"}} {data[-1]}')
+                lines.append(f'{self.name}_sum{{{self.label}="{value}"}} {data[-2]}')
+                lines.append(f'{self.name}_count{{{self.label}="{value}"}} {data[-1]}')
+        return lines
+
+
+CALLS = Counter("smartcalc_formula_calls_total", "Chamadas de cada fórmula.", "formula")
+ERRORS = Counter("smartcalc_formula_errors_total", "Chamadas com exceção ou entrada inválida.", "formula")
+LATENCY = Histogram("smartcalc_formula_seconds", "Duração de cada chamada de fórmula.", "formula")
+BLOCK_LATENCY = Histogram("smartcalc_calculator_seconds", "Duração da montagem de cada calculadora.", "calculator")
+BLOCK_ERRORS = Counter("smartcalc_calculator_errors_total", "Exceções ao montar cada calculadora.", "calculator")
+RERUN_LATENCY = Histogram("smartcalc_rerun_seconds", "Duração de cada rerun completo, por categoria.", "category")
+
+METRICS = (CALLS, ERRORS, LATENCY, BLOCK_LATENCY, BLOCK_ERRORS, RERUN_LATENCY)
+
+
+def _is_invalid(result):
+    # As fórmulas sinalizam entrada inválida com None ou com (valor, erro)
+    return result is None or (isinstance(result, tuple) and len(result) == 2 and result[1] is not None)
+
+
+def instrument(function, name=None):
+    """Conta chamadas, erros e latência de uma fórmula (sem efeito se desligado)."""
+    if not ENABLED:
+        return function
+    name = name or function.__name__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except Exception:
+            ERRORS.inc(name)
+            raise
+        finally:
+            LATENCY.observe(name, time.perf_counter() - start)
+            CALLS.inc(name)
+        if _is_invalid(result):
+            ERRORS.inc(name)
+        return result
+
+    return wrapper
+
+
+def instrument_block(function):
+    """Decorador que mede a montagem de uma calculadora (sem efeito se desligado)."""
+    if not ENABLED:
+        return function
+    name = function.__name__.removeprefix("render_")
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except Exception:
+            BLOCK_ERRORS.inc(name)
+            raise
+        finally:
+            BLOCK_LATENCY.observe(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def observe_rerun(category, seconds):
+    RERUN_LATENCY.observe(category, seconds)
+
+
+def render():
+    """Todas as métricas no formato de texto do Prometheus."""
+    from smartcalc_core.cache import cache_info
+
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.expose())
+    info = cache_info()
+    for key, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge")):
+        name = f"smartcalc_cache_{key}" + ("_total" if kind == "counter" else "")
+        lines.extend((f"# TYPE {name} {kind}", f"{name} {info[key]}"))
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_server(port=None, host="127.0.0.1"):
+    """Sobe o endpoint /metrics numa thread, uma única vez por processo."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port or PORT), _Handler)
+            except OSError as e:
+                # Porta ocupada (outro processo do aplicativo): segue sem endpoint
+                print(f"Métricas sem endpoint na porta {port or PORT}: {e}", file=sys.stderr)
+                _server = False
+                return None
+            threading.Thread(target=_server.serve_forever, name="smartcalc-metrics", daemon=True).start()
+    return _server or None
@@ -0,0 +1,170 @@
+"""
+Execução paralela (multi-processo) do cálculo em lote e do backfill.
+
+Dois modos:
+
+* ``compute_table_parallel``: divide uma tabela colunar em fatias que não
+  separam o mesmo paciente e calcula cada fatia num processo do pool. As
+  colunas de entrada e de saída ficam em memória compartilhada
+  (``multiprocessing.shared_memory``); os processos recebem apenas o nome do
+  bloco e os limites da fatia, sem serializar linhas. Cada processo escreve
+  na sua faixa do bloco de saída, então o resultado já sai na ordem original.
+* ``backfill_files``: processa vários arquivos de log (um por processo) com
+  ``smartcalc_core.stream.process_file``.
+
+Uso:
+    python -m smartcalc_core.parallel logs/*.csv --out-dir derivados --workers 16
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from smartcalc_core.batch import compute_table
+from smartcalc_core.stream import DEFAULT_CHUNK_SIZE, _parse_mapping, process_file
+
+# Fatias por processo: mais de uma equilibra pacientes de tamanhos diferentes
+SHARDS_PER_WORKER = 4
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def _compute_shard(in_name, out_name, rows, in_columns, out_columns, lo, hi):
+    # Os workers compartilham o resource_tracker do processo principal, que é
+    # quem cria e remove os blocos
+    in_block = shared_memory.SharedMemory(name=in_name)
+    out_block = shared_memory.SharedMemory(name=out_name)
+    try:
+        inputs = np.ndarray((len(in_columns), rows), dtype=np.float64, buffer=in_block.buf)
+        outputs = np.ndarray((len(out_columns), rows), dtype=np.float64, buffer=out_block.buf)
+        derived = compute_table({name: inputs[i, lo:hi] for i, name in enumerate(in_columns)})
+        for i, name in enumerate(out_columns):
+            outputs[i, lo:hi] = derived[name]
+        del inputs, outputs
+    finally:
+        in_block.close()
+        out_block.close()
+    return hi - lo
+
+def _shard_bounds(rows, shards, patient_ids=None):
+    # Limites aproximadamente iguais, ajustados para não cortar um paciente ao meio
+    cuts = np.linspace(0, rows, shards + 1).astype(np.int64)
+    if patient_ids is not None and rows:
+        starts = np.flatnonzero(np.r_[True, patient_ids[1:] != patient_ids[:-1]])
+        cuts = starts[np.minimum(np.searchsorted(starts, cuts), len(starts) - 1)]
+        cuts[0], cuts[-1] = 0, rows
+    cuts = np.unique(cuts)
+    return list(zip(cuts[:-1].tolist(), cuts[1:].tolist()))
+
+
+def compute_table_parallel(table, patient_ids=None, workers=None):
+    """
+    Versão multi-processo de ``smartcalc_core.batch.compute_table``.
+
+    Parâmetros:
+        table (Mapping[str, array]): Colunas de entrada, todas do mesmo tamanho.
+        patient_ids (array, opcional): Paciente de cada linha. As linhas de um
+            paciente nunca são divididas entre processos; se não estiverem
+            agrupadas, a tabela é ordenada por paciente (ordenação estável) e
+            o resultado volta para a ordem original.
+        workers (int, opcional): Número de processos (padrão: núcleos da CPU).
+
+    Retorna:
+        dict[str, numpy.ndarray]: Mesmas chaves de ``compute_table``.
+    """
+    workers = workers or default_workers()
+    in_columns = tuple(table)
+    columns = [np.asarray(table[name], dtype=np.float64) for name in in_columns]
+    rows = len(columns[0]) if columns else 0
+    # Descobre quais índices serão calculados a partir de uma linha vazia
+    out_columns = tuple(compute_table({name: np.empty(0) for name in in_columns}))
+    if not out_columns or not rows:
+        return compute_table(dict(zip(in_columns, columns)))
+
+    order = None
+    if patient_ids is not None:
+        patient_ids = np.asarray(patient_ids)
+        if np.any(patient_ids[1:] < patient_ids[:-1]):
+            order = np.argsort(patient_ids, kind="stable")
+            patient_ids = patient_ids[order]
+
+    in_block = shared_memory.SharedMemory(create=True, size=max(len(in_columns) * rows * 8, 1))
+    out_block = shared_memory.SharedMemory(create=True, size=max(len(out_columns) * rows * 8, 1))
+    try:
+        inputs = np.ndarray((len(in_columns), rows), dtype=np.float64, buffer=in_block.buf)
+        for i, values in enumerate(columns):
+            inputs[i] = values if order is None else values[order]
+        del inputs
+
+        bounds = _shard_bounds(rows, workers * SHARDS_PER_WORKER, patient_ids)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_compute_shard, in_block.name, out_block.name, rows, in_columns, out_columns, lo, hi)
+                for lo, hi in bounds
+            ]
+            for future in futures:
+                future.result()
+
+        outputs = np.ndarray((len(out_columns), rows), dtype=np.float64, buffer=out_block.buf)
+        result = {}
+        for i, name in enumerate(out_columns):
+            if order is None:
+                result[name] = outputs[i].copy()
+            else:
+                result[name] = np.empty(rows)
+                result[name][order] = outputs[i]
+        del outputs
+        return result
+    finally:
+        for block in (in_block, out_block):
+            block.close()
+            block.unlink()
+
+
+def backfill_files(sources, out_dir, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, mapping=None):
+    """
+    Processa vários arquivos de log em paralelo, um arquivo por tarefa.
+
+    Retorna:
+        list[tuple[str, int]]: Arquivo de saída e linhas processadas, na mesma
+        ordem de ``sources``.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    targets = [os.path.join(out_dir, os.path.basename(src)) for src in sources]
+    if len(set(targets)) != len(targets):
+        raise ValueError("Arquivos de entrada com o mesmo nome gerariam a mesma saída.")
+    with ProcessPoolExecutor(max_workers=workers or default_workers()) as pool:
+        counts = pool.map(
+            process_file, sources, targets, [chunk_size] * len(sources), [mapping] * len(sources)
+        )
+        return list(zip(targets, counts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m smartcalc_core.parallel",
+        description="Backfill paralelo dos índices de ventilação, um arquivo por processo.",
+    )
+    parser.add_argument("sources", nargs="+", help="Arquivos de entrada (.csv ou .parquet)")
+    parser.add_argument("--out-dir", required=True, help="Diretório dos arquivos de saída")
+    parser.add_argument("--workers", type=int, default=None, help="Número de processos (padrão: núcleos)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Linhas por bloco")
+    parser.add_argument("--map", action="append", default=[], metavar="COLUNA=NOME")
+    args = parser.parse_args(argv)
+    try:
+        mapping = _parse_mapping(args.map)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    for target, total in backfill_files(args.sources, args.out_dir, args.workers, args.chunk_size, mapping):
+        print(f"{target}: {total} linhas", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
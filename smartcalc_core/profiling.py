@@ -0,0 +1,213 @@
+"""
+Modo de profiling por amostragem dos reruns do aplicativo.
+
+Uma thread de amostragem lê, a cada ``SMARTCALC_PROFILE_INTERVAL`` segundos
+(padrão 0,01), a pilha das threads que estão executando um rerun ou um
+fragmento sorteado para profiling. As pilhas são agregadas entre os reruns no
+formato "folded" (``a;b;c contagem``), aceito por flamegraph.pl, speedscope e
+inferno, com dois níveis na raiz: a categoria do menu e a calculadora
+(a função ``render_*`` presente na pilha, ou ``-``).
+
+Configuração:
+    SMARTCALC_PROFILE=0.05         sorteia 5% dos reruns (1 = todos; 0 = só com
+                                   ``?profile=1`` na URL)
+    SMARTCALC_PROFILE_FILE=...     arquivo de saída (padrão: smartcalc.folded)
+
+Sem ``SMARTCALC_PROFILE``, ou com um valor que não é número, nada é instalado. Com amostragem, o custo fica
+restrito aos reruns sorteados e a cada leitura de pilha.
+
+Um rerun interrompido antes de ``end`` (RerunException, ``st.stop``, erro não
+tratado) é detectado pela thread de amostragem: a thread terminou ou a pilha
+dela não passa mais pelo frame raiz. As amostras dele vão para a categoria
+"interrompido".
+
+Uso:
+    run = begin(force="profile" in st.query_params)
+    ...
+    end(run, menu)
+"""
+
+import functools
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+DEFAULT_INTERVAL = 0.01
+
+
+def _read_setting(name, default, positive=False):
+    # Valor do ambiente como float; inválido devolve None (com aviso)
+    text = os.environ.get(name) or default
+    try:
+        value = float(text)
+    except ValueError:
+        value = math.nan
+    if not math.isfinite(value) or value < 0 or (positive and value == 0):
+        print(f"{name}={text!r} inválido; profiling desativado.", file=sys.stderr)
+        return None
+    return value
+
+
+_setting = os.environ.get("SMARTCALC_PROFILE")
+RATE = INTERVAL = None
+if _setting is not None:
+    RATE = _read_setting("SMARTCALC_PROFILE", 0.0)
+    INTERVAL = _read_setting("SMARTCALC_PROFILE_INTERVAL", DEFAULT_INTERVAL, positive=True)
+ENABLED = RATE is not None and INTERVAL is not None
+RATE = RATE or 0.0
+INTERVAL = INTERVAL or DEFAULT_INTERVAL
+OUTPUT = os.environ.get("SMARTCALC_PROFILE_FILE", "smartcalc.folded")
+FLUSH_SECONDS = 10
+INTERRUPTED = "interrompido"
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class Sampler:
+    """
+    Amostrador de pilhas de um conjunto de threads.
+
+    Parâmetros:
+        interval (float): Segundos entre amostras.
+        output (str): Arquivo "folded" reescrito a cada ``FLUSH_SECONDS``.
+    """
+
+    def __init__(self, interval=INTERVAL, output=OUTPUT):
+        self.interval = interval
+        self.output = output
+        self.counts = {}  # pilha "folded" -> amostras
+        self.reruns = 0
+        self._watched = {}  # id da thread -> (frame raiz, {pilha: amostras})
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._last_flush = time.monotonic()
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            if not self._watched:
+                self._wake.wait()
+                self._wake.clear()
+            time.sleep(self.interval)
+            with self._lock:
+                # Lidas com o lock: uma thread que acabou de chamar ``watch`` já
+                # aparece com o frame raiz na pilha
+                frames = sys._current_frames()
+                ended = []
+                for thread_id, (root, counts) in self._watched.items():
+                    if thread_id == own:
+                        continue
+                    frame = frames.get(thread_id)
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_name(frame))
+                        if frame is root:
+                            break
+                        frame = frame.f_back
+                    if frame is None:
+                        # Thread encerrada ou rerun que saiu sem chamar ``end``
+                        ended.append(thread_id)
+                        continue
+                    key = tuple(reversed(stack))
+                    counts[key] = counts.get(key, 0) + 1
+                for thread_id in ended:
+                    self._finish(thread_id, INTERRUPTED)
+
+    def watch(self, root):
+        """Passa a amostrar a thread atual, com as pilhas cortadas em ``root``."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            if thread_id in self._watched:
+                # Rerun anterior da mesma thread que não chegou ao ``end``
+                self._finish(thread_id, INTERRUPTED)
+            self._watched[thread_id] = (root, {})
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="smartcalc-profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _finish(self, thread_id, category):
+        # Agrega as pilhas da thread sob ``category`` (chamado com o lock).
+        # Thread já encerrada pela amostragem (``unwatch`` atrasado): nada a contar
+        if thread_id not in self._watched:
+            return
+        _, counts = self._watched.pop(thread_id)
+        for stack, count in counts.items():
+            calculator = next(
+                (name.split(":", 1)[1] for name in stack if ":render_" in name), "-"
+            )
+            key = ";".join((category, calculator) + stack)
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.reruns += 1
+
+    def unwatch(self, category):
+        """Para de amostrar a thread atual e agrega as pilhas sob ``category``."""
+        with self._lock:
+            self._finish(threading.get_ident(), category)
+            due = time.monotonic() - self._last_flush >= FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self):
+        # Reescreve o arquivo inteiro com o agregado (troca atômica)
+        with self._lock:
+            lines = [f"{stack} {count}\n" for stack, count in sorted(self.counts.items())]
+            self._last_flush = time.monotonic()
+        tmp = f"{self.output}.tmp"
+        with open(tmp, "w") as f:
+            f.writelines(lines)
+        os.replace(tmp, self.output)
+
+
+_sampler = Sampler() if ENABLED else None
+
+
+def begin(force=False):
+    """
+    Começa a amostrar o rerun atual, se sorteado (ou se ``force``).
+
+    Devolve True se o rerun está sendo amostrado; passe o valor para ``end``.
+    """
+    if not ENABLED or not (force or random.random() < RATE):
+        return False
+    _sampler.watch(sys._getframe(1))
+    return True
+
+
+def end(run, category):
+    if run:
+        _sampler.unwatch(category)
+
+
+def profile_fragment(force, category="fragmento"):
+    """
+    Decorador que amostra os reruns de um fragmento, como ``begin``/``end``.
+
+    ``force`` é chamado a cada execução e diz se o profiling foi pedido (por
+    exemplo, pela URL).
+    """
+    def decorator(function):
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            # Dentro de um rerun completo já amostrado, não recomeça
+            if threading.get_ident() in _sampler._watched:
+                return function(*args, **kwargs)
+            run = begin(force())
+            try:
+                return function(*args, **kwargs)
+            finally:
+                end(run, category)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,157 @@
+"""
+Registro único das fórmulas: entradas, unidades, faixas válidas e resultado.
+
+Cada fórmula declara as entradas na unidade em que o usuário as informa. A
+interface (``smartcalc.py``) gera daqui os widgets, o título, a validação dos
+campos e a linha de resultado (``output`` e ``unit``) de cada calculadora, e a
+API usa os mesmos nomes, unidades e faixas, então todos os caminhos validam e
+convertem da mesma forma. Os fatores de conversão para a unidade da fórmula (por
+exemplo, VC em mL para L no mechanical power) são reunidos uma vez, na
+importação do módulo.
+
+Uso:
+    formula = FORMULAS["mechanical_power"]
+    errors = validate(formula, [20, 500, 30, 10])
+    to_formula_units(formula, [20, 500, 30, 10])  # [20, 0.5, 30, 10]: VC em L
+"""
+
+import math
+from typing import NamedTuple
+
+from smartcalc_core import ui_assets
+
+
+class Input(NamedTuple):
+    """
+    Entrada de uma fórmula.
+
+    ``options`` são as opções do selectbox (a primeira vazia); sem opções, o
+    campo é de texto. Sem ``minimum``/``maximum``, a faixa válida vem das
+    opções. ``scale`` converte o valor informado para a unidade da fórmula.
+    """
+
+    name: str
+    label: str
+    key: str
+    unit: str = ""
+    options: tuple = None
+    minimum: float = None
+    maximum: float = None
+    scale: float = 1.0
+
+
+class Formula(NamedTuple):
+    name: str
+    title: str
+    function: str
+    inputs: tuple
+    output: str
+    unit: str = ""
+
+
+def _range(item):
+    # Faixa declarada ou, nos selectboxes numéricos, a das opções
+    if item.minimum is not None or item.options is None:
+        return item.minimum, item.maximum
+    numbers = [o for o in item.options if isinstance(o, (int, float))]
+    return (min(numbers), max(numbers)) if numbers else (None, None)
+
+
+def _gender(key):
+    return Input("gender", "Gênero:", key, "", ui_assets.GENDERS)
+
+
+FORMULAS = {formula.name: formula for formula in (
+    Formula("rox_index", "ROX Index", "calculate_rox_index", (
+        Input("spo2", "SpO2 (%):", "rox_spo2", "%", ui_assets.ZERO_TO_100),
+        Input("fio2", "FiO2 (fração):", "rox_fio2", "", ui_assets.FIO2),
+        Input("fr", "Frequência Respiratória (FR):", "rox_fr", "irpm", ui_assets.ZERO_TO_100),
+    ), "ROX Index"),
+    Formula("pimax", "PImáx Predita", "calculate_predicted_pimax", (
+        _gender("pimax_gender"),
+        Input("age", "Idade (anos):", "pimax_age", "anos", ui_assets.AGE_ADULT),
+    ), "PImáx Predita", "cmH2O"),
+    Formula("pemax", "PEmáx Predita", "calculate_predicted_pemax", (
+        _gender("pemax_gender"),
+        Input("age", "Idade (anos):", "pemax_age", "anos", ui_assets.AGE_ADULT),
+    ), "PEmáx Predita", "cmH2O"),
+    Formula("height_chumlea", "Altura estimada", "calculate_height_chumlea", (
+        _gender("chumlea_gender"),
+        Input("age", "Idade (anos):", "chumlea_age", "anos", ui_assets.AGE_CHUMLEA),
+        Input("aj", "AJ (cm):", "chumlea_aj", "cm", ui_assets.AJ),
+    ), "Altura Calculada", "cm"),
+    Formula("ideal_weight", "Peso predito", "calculate_ideal_weight", (
+        _gender("weight_gender"),
+        Input("height", "Altura (cm):", "weight_height", "cm", ui_assets.HEIGHT),
+    ), "Peso Ideal", "kg"),
+    Formula("time_constant", "Constante de Tempo", "calculate_time_constant", (
+        Input("rva", "Rva (cmH2O/L.s):", "time_constant_rva", "cmH2O/L/s", ui_assets.RVA),
+        Input("cst", "Cst (mL/cmH2O):", "time_constant_cst", "mL/cmH2O", ui_assets.CST),
+    ), "Constante de Tempo", "s"),
+    Formula("driving_pressure", "Driving Pressure (ΔP)", "calculate_driving_pressure", (
+        Input("plateau_pressure", "Pressão de Platô (cmH2O):", "dp_plateau", "cmH2O", ui_assets.PLATEAU_DP),
+        Input("peep", "PEEP (cmH2O):", "dp_peep", "cmH2O", ui_assets.PEEP_DP),
+    ), "Driving Pressure", "cmH2O"),
+    Formula("static_compliance", "Complacência Estática (Cst)", "calculate_static_compliance", (
+        Input("tidal_volume", "Volume Corrente (ml):", "cst_tidal_volume", "mL", ui_assets.TIDAL_VOLUME_ML),
+        Input("plateau_pressure", "Pressão de Platô (cmH2O):", "cst_plateau", "cmH2O", ui_assets.PLATEAU),
+        Input("peep", "PEEP (cmH2O):", "cst_peep", "cmH2O", ui_assets.PEEP),
+    ), "Complacência Estática", "ml/cmH2O"),
+    Formula("resistance", "Resistência de Vias Aéreas (Rva)", "calculate_resistance", (
+        Input("peak_pressure", "Pressão de Pico (cmH2O):", "rva_peak", "cmH2O", ui_assets.ZERO_TO_100),
+        Input("plateau_pressure", "Pressão de Platô (cmH2O):", "rva_plateau", "cmH2O", ui_assets.PLATEAU),
+        Input("flow_lmin", "Fluxo (L/min):", "rva_flow", "L/min", ui_assets.FLOW),
+    ), "Resistência de Vias Aéreas", "cmH2O/L/s"),
+    Formula("pao2_fio2", "Relação PaO2/FiO2", "calculate_pao2_fio2", (
+        Input("pao2", "Pressão arterial de oxigênio (PaO2):", "pao2", "mmHg", ui_assets.PAO2),
+        Input("fio2", "Fração inspirada de oxigênio (FiO2):", "fio2", "", ui_assets.FIO2),
+    ), "Relação PaO2/FiO2"),
+    Formula("muscular_pressure", "Pressão Muscular (Pmus)", "calculate_muscular_pressure", (
+        Input("delta_pocc", "ΔPocc:", "pmus_delta_pocc", "cmH2O", ui_assets.ZERO_TO_100),
+    ), "Pressão Muscular", "cmH2O"),
+    Formula("irrs", "Índice de respiração rápida e superficial", "calculate_irrs", (
+        Input("fr", "Frequência Respiratória (FR):", "irrs_fr", "irpm", ui_assets.FR_IRRS),
+        Input("vt", "Volume Corrente (L):", "irrs_vt", "L", ui_assets.TIDAL_VOLUME_L),
+    ), "IRRS"),
+    Formula("ri_ratio", "R/I Ratio", "calculate_ri_ratio", (
+        Input("vteh_l", "VTeH →L (mL):", "vteh_l", "mL", None, 0, 5000),
+        Input("vteh", "VTeH (mL):", "vteh", "mL", None, 0, 5000),
+        Input("vti", "VTi (mL):", "vti", "mL", None, 0, 5000),
+        Input("pplatl", "PplatL (cmH2O):", "pplatl", "cmH2O", None, 0, 100),
+        Input("peepl", "PEEPL (cmH2O):", "peepl", "cmH2O", None, 0, 100),
+        Input("peeph", "PEEPH (cmH2O):", "peeph", "cmH2O", None, 0, 100),
+    ), "R/I Ratio"),
+    Formula("mechanical_power", "Mechanical Power", "calculate_mechanical_power", (
+        Input("fr", "Frequência Respiratória (FR):", "mp_fr", "irpm", None, 0, 100),
+        Input("vc_ml", "Volume Corrente (ml):", "mp_vc", "mL", None, 0, 3000, 0.001),
+        Input("ppico", "Pressão Pico (cmH2O):", "mp_ppico", "cmH2O", None, 0, 100),
+        Input("dp", "Driving Pressure (cmH2O):", "mp_dp", "cmH2O", None, 0, 100),
+    ), "Mechanical Power", "J/min"),
+)}
+
+# Montados uma vez: faixas e fatores de conversão de cada fórmula
+RANGES = {name: tuple(_range(item) for item in formula.inputs) for name, formula in FORMULAS.items()}
+SCALES = {
+    name: tuple((i, item.scale) for i, item in enumerate(formula.inputs) if item.scale != 1.0)
+    for name, formula in FORMULAS.items()
+}
+
+
+def validate(formula, values):
+    """Mensagens de erro para valores numéricos fora da faixa (lista vazia se válidos)."""
+    errors = []
+    for item, (low, high), value in zip(formula.inputs, RANGES[formula.name], values):
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or math.isnan(value):
+            continue
+        if (low is not None and value < low) or (high is not None and value > high):
+            errors.append(f"{item.label.rstrip(':')} deve estar entre {low:g} e {high:g} {item.unit}".rstrip() + ".")
+    return errors
+
+
+def to_formula_units(formula, values):
+    """Converte os valores informados para as unidades da fórmula."""
+    values = list(values)
+    for i, scale in SCALES[formula.name]:
+        values[i] = values[i] * scale
+    return values
+
@@ -0,0 +1,160 @@
+"""
+Backends do estado de sessão (histórico de resultados) do aplicativo.
+
+A sessão é identificada pelo parâmetro ``?session=`` da URL, e não pela
+sessão interna do Streamlit, então qualquer processo atrás do balanceador
+pode atender qualquer clínico: ao abrir a página, o processo carrega o
+histórico da sessão a partir do backend.
+
+Backends (``SMARTCALC_SESSION_BACKEND``):
+    memory                      padrão; no próprio processo (equivale a
+                                sessões fixas em um nó)
+    sqlite:///caminho/banco.db  compartilhado entre processos; também serve
+                                de modelo para um armazenamento externo
+
+No SQLite, resultados mais antigos que ``SMARTCALC_SESSION_MAX_AGE`` segundos
+(padrão 7 dias; 0 desativa) são apagados ao abrir o banco e depois a cada
+hora, na gravação seguinte.
+
+Uso:
+    backend = get_backend()
+    history = backend.history(session_id, "oxigenoterapia", capacity=500)
+    history.record("ROX Index", 4.87)
+    backend.append(session_id, "oxigenoterapia", "ROX Index", 4.87, t)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from smartcalc_core.history import DEFAULT_CAPACITY, ResultHistory
+
+MAX_MEMORY_SESSIONS = 1000
+DEFAULT_MAX_AGE = 7 * 24 * 3600  # s
+PRUNE_INTERVAL = 3600  # s
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+class MemoryBackend:
+    """
+    Históricos guardados no processo, com limite de sessões.
+
+    Parâmetros:
+        max_sessions (int): Sessões mantidas; a usada há mais tempo sai primeiro.
+    """
+
+    def __init__(self, max_sessions=MAX_MEMORY_SESSIONS):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def history(self, session, category, capacity=DEFAULT_CAPACITY):
+        with self._lock:
+            histories = self._sessions.get(session)
+            if histories is None:
+                histories = self._sessions[session] = {}
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(session)
+            if category not in histories:
+                histories[category] = ResultHistory(capacity)
+            return histories[category]
+
+    def append(self, session, category, name, value, t):
+        # O histórico devolvido por history() já é o guardado aqui
+        pass
+
+
+class SQLiteBackend:
+    """
+    Históricos num banco SQLite compartilhado pelos processos.
+
+    Cada resultado é uma linha; carregar uma sessão lê só os últimos
+    ``capacity`` resultados de cada categoria, pelo índice
+    (session, category, t).
+
+    Parâmetros:
+        path (str): Arquivo do banco (criado se não existir).
+        max_age (float, opcional): Idade máxima dos resultados (s); os mais
+            antigos são apagados ao abrir e a cada ``PRUNE_INTERVAL``.
+    """
+
+    def __init__(self, path, max_age=None):
+        self.path = path
+        self.max_age = max_age
+        self._local = threading.local()
+        self._pruned_at = time.monotonic()
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "session TEXT NOT NULL, category TEXT NOT NULL, t INTEGER NOT NULL, "
+                "calculator TEXT NOT NULL, value REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS results_session ON results (session, category, t)")
+        if max_age:
+            self.prune(max_age)
+
+    def _connection(self):
+        # Uma conexão por thread (cada sessão do Streamlit roda na sua)
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def history(self, session, category, capacity=DEFAULT_CAPACITY):
+        rows = self._connection().execute(
+            "SELECT t, calculator, value FROM results WHERE session = ? AND category = ? "
+            "ORDER BY t DESC LIMIT ?",
+            (session, category, capacity),
+        ).fetchall()
+        history = ResultHistory(capacity)
+        for t, calculator, value in reversed(rows):
+            history.record(calculator, value, t)
+        return history
+
+    def append(self, session, category, name, value, t):
+        with self._connection() as db:
+            db.execute("INSERT INTO results VALUES (?, ?, ?, ?, ?)", (session, category, t, name, value))
+        if self.max_age and time.monotonic() - self._pruned_at >= PRUNE_INTERVAL:
+            # Sem lock: no pior caso duas threads apagam as mesmas linhas
+            self._pruned_at = time.monotonic()
+            self.prune(self.max_age)
+
+    def prune(self, max_age_seconds):
+        """Apaga resultados mais antigos que ``max_age_seconds``; devolve quantos."""
+        cutoff = int((time.time() - max_age_seconds) * 1000)
+        with self._connection() as db:
+            return db.execute("DELETE FROM results WHERE t < ?", (cutoff,)).rowcount
+
+
+def create_backend(url, max_age=None):
+    """Backend a partir de uma URL (``memory`` ou ``sqlite:///caminho``)."""
+    if url in ("", "memory"):
+        return MemoryBackend()
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):], max_age)
+    raise ValueError(f"Backend de sessão desconhecido: {url!r}")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Backend do processo, criado na primeira chamada a partir do ambiente."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(
+                os.environ.get("SMARTCALC_SESSION_BACKEND", "memory"),
+                float(os.environ.get("SMARTCALC_SESSION_MAX_AGE", DEFAULT_MAX_AGE)),
+            )
+    return _backend
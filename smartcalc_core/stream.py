@@ -0,0 +1,239 @@
+"""
+Processamento em fluxo de registros de ventiladores (CSV ou Parquet).
+
+Lê o arquivo em blocos de tamanho fixo, calcula os índices por ciclo
+respiratório com ``smartcalc_core.batch.compute_table`` e grava cada bloco
+antes de ler o próximo, de modo que o uso de memória não depende do tamanho
+do arquivo.
+
+No CSV, valores não numéricos ("NA", "-", ...) são tratados como vazios (NaN)
+e linhas com número de campos diferente do cabeçalho são completadas com
+vazios ou cortadas; os dois casos são avisados no stderr com o número da
+linha.
+
+Uso:
+    python -m smartcalc_core.stream entrada.csv saida.csv
+    python -m smartcalc_core.stream entrada.parquet saida.parquet --chunk-size 200000
+    python -m smartcalc_core.stream log.csv out.csv --map plateau_pressure=Pplat --map peep=PEEP
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import sys
+
+import numpy as np
+
+from smartcalc_core.batch import compute_table
+
+# Colunas de entrada usadas pelas fórmulas de ventilação
+INPUT_COLUMNS = ("peak_pressure", "plateau_pressure", "peep", "flow", "tidal_volume", "rr")
+
+# Índices derivados gravados na saída, nesta ordem
+OUTPUT_COLUMNS = (
+    "driving_pressure",
+    "static_compliance",
+    "resistance",
+    "time_constant",
+    "mechanical_power",
+)
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _derive(columns):
+    derived = compute_table(columns)
+    return [(name, derived[name]) for name in OUTPUT_COLUMNS if name in derived]
+
+def _parse_floats(values):
+    """
+    Converte os textos de uma coluna em float64.
+
+    Campos vazios viram NaN, assim como nas divisões inválidas; textos não
+    numéricos também. Devolve (valores, posições dos textos não numéricos).
+    """
+    values = np.asarray(values, dtype=str)
+    try:
+        return np.where(values == "", "nan", values).astype(np.float64), []
+    except ValueError:
+        pass
+    # Caminho lento, só nos blocos com algum texto não numérico
+    result = np.full(len(values), np.nan)
+    invalid = []
+    for i, value in enumerate(values.tolist()):
+        if value:
+            try:
+                result[i] = float(value)
+            except ValueError:
+                invalid.append(i)
+    return result, invalid
+
+def _format_floats(values):
+    text = np.char.mod("%.6g", values)
+    text[np.isnan(values)] = ""
+    return text
+
+
+def _check_chunk_size(chunk_size):
+    # islice com 0 devolve bloco vazio (o arquivo sai sem linhas) e com negativo levanta
+    if chunk_size < 1:
+        raise ValueError(f"O tamanho do bloco deve ser de pelo menos uma linha, não {chunk_size}.")
+
+def process_csv(src, dst, chunk_size=DEFAULT_CHUNK_SIZE, mapping=None):
+    """
+    Processa um CSV em blocos de ``chunk_size`` linhas.
+
+    Parâmetros:
+        src, dst (str): Caminhos de entrada e saída.
+        chunk_size (int): Número de linhas por bloco.
+        mapping (dict): Nome da coluna no arquivo para cada coluna de
+            ``INPUT_COLUMNS`` (quando diferente do padrão).
+
+    Retorna:
+        int: Número de linhas processadas.
+    """
+    _check_chunk_size(chunk_size)
+    mapping = mapping or {}
+    total = 0
+    with open(src, newline="") as fin, open(dst, "w", newline="") as fout:
+        reader = csv.reader(fin)
+        writer = csv.writer(fout)
+        header = next(reader, None)
+        if header is None:
+            return 0
+        width = len(header)
+        positions = {
+            name: header.index(mapping.get(name, name))
+            for name in INPUT_COLUMNS
+            if mapping.get(name, name) in header
+        }
+        wrote_header = False
+        while True:
+            try:
+                rows = list(itertools.islice(reader, chunk_size))
+            except csv.Error as e:
+                raise ValueError(f"{src}, linha {reader.line_num}: {e}") from None
+            if not rows:
+                break
+            # Linha do arquivo do primeiro registro do bloco (o cabeçalho é a 1)
+            first = total + 2
+            ragged = [i for i, row in enumerate(rows) if len(row) != width]
+            if ragged:
+                # Completa com vazios (ou corta) para os índices ficarem nas colunas certas
+                print(
+                    f"{src}, linha {first + ragged[0]}: {len(ragged)} linha(s) do bloco com número de campos "
+                    f"diferente do cabeçalho ({width}), ajustadas",
+                    file=sys.stderr,
+                )
+                for i in ragged:
+                    rows[i] = (rows[i] + [""] * width)[:width]
+            columns = {}
+            for name, i in positions.items():
+                columns[name], invalid = _parse_floats([row[i] for row in rows])
+                if invalid:
+                    print(
+                        f"{src}, linha {first + invalid[0]}: {len(invalid)} valor(es) não numérico(s) na coluna "
+                        f"{header[i]!r} do bloco, tratados como vazios",
+                        file=sys.stderr,
+                    )
+            derived = _derive(columns)
+            if not wrote_header:
+                writer.writerow(header + [name for name, _ in derived])
+                wrote_header = True
+            extra = zip(*(_format_floats(values).tolist() for _, values in derived))
+            writer.writerows(row + list(values) for row, values in zip(rows, extra))
+            total += len(rows)
+        if not wrote_header:
+            writer.writerow(header)
+    return total
+
+def process_parquet(src, dst, chunk_size=DEFAULT_CHUNK_SIZE, mapping=None):
+    """
+    Processa um arquivo Parquet lote a lote (requer ``pyarrow``).
+
+    Mesmos parâmetros e retorno de ``process_csv``.
+    """
+    _check_chunk_size(chunk_size)
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("O processamento de Parquet requer o pacote 'pyarrow'.") from None
+
+    mapping = mapping or {}
+    total = 0
+    writer = None
+    source = pq.ParquetFile(src)
+    try:
+        for batch in source.iter_batches(batch_size=chunk_size):
+            names = batch.schema.names
+            columns = {
+                name: batch.column(names.index(mapping.get(name, name)))
+                .cast(pa.float64())
+                .to_numpy(zero_copy_only=False)
+                for name in INPUT_COLUMNS
+                if mapping.get(name, name) in names
+            }
+            for name, values in _derive(columns):
+                batch = batch.append_column(name, pa.array(values, from_pandas=True))
+            if writer is None:
+                writer = pq.ParquetWriter(dst, batch.schema)
+            writer.write_batch(batch)
+            total += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+def process_file(src, dst, chunk_size=DEFAULT_CHUNK_SIZE, mapping=None):
+    # Escolhe o formato pela extensão do arquivo de entrada
+    if os.path.splitext(src)[1].lower() in (".parquet", ".pq"):
+        return process_parquet(src, dst, chunk_size, mapping)
+    return process_csv(src, dst, chunk_size, mapping)
+
+
+def _parse_mapping(items):
+    mapping = {}
+    for item in items:
+        name, sep, column = item.partition("=")
+        if not sep or name not in INPUT_COLUMNS:
+            raise argparse.ArgumentTypeError(
+                f"Mapeamento inválido: {item!r} (use COLUNA=NOME, COLUNA em {', '.join(INPUT_COLUMNS)})"
+            )
+        mapping[name] = column
+    return mapping
+
+def _chunk_size(text):
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Número inválido: {text!r}") from None
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"O tamanho do bloco deve ser de pelo menos uma linha, não {value}.")
+    return value
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m smartcalc_core.stream",
+        description="Calcula ΔP, Cst, Rva, constante de tempo e mechanical power por ciclo.",
+    )
+    parser.add_argument("src", help="Arquivo de entrada (.csv ou .parquet)")
+    parser.add_argument("dst", help="Arquivo de saída (mesmo formato da entrada)")
+    parser.add_argument("--chunk-size", type=_chunk_size, default=DEFAULT_CHUNK_SIZE, help="Linhas por bloco")
+    parser.add_argument(
+        "--map", action="append", default=[], metavar="COLUNA=NOME",
+        help="Nome da coluna no arquivo para uma coluna de entrada (pode repetir)",
+    )
+    args = parser.parse_args(argv)
+    try:
+        mapping = _parse_mapping(args.map)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    total = process_file(args.src, args.dst, args.chunk_size, mapping)
+    print(f"{total} linhas processadas", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Simulação de ajustes do ventilador: mechanical power e ΔP em grades de parâmetros.
+
+Os eixos (FR, VC, PEEP, platô) são arrays 1-D; ``sweep`` os coloca em
+dimensões diferentes e calcula a grade inteira num único broadcast com as
+fórmulas vetorizadas de ``smartcalc_core.batch``, sem montar a grade
+explicitamente. Uma grade de um milhão de pontos leva poucas dezenas de
+milissegundos.
+
+A pressão de pico de cada ponto é o platô mais um componente resistivo
+constante (pico - platô medido no paciente).
+
+Uso:
+    vt = tidal_volumes("Masculino", 175)           # 4 a 8 mL/kg do peso predito
+    grid = sweep(rr=np.arange(10, 36), tidal_volume=vt,
+                 peep=np.arange(5, 21), plateau=np.arange(15, 36))
+    grid["mechanical_power"].shape                 # (26, 5, 16, 21)
+"""
+
+import numpy as np
+
+from smartcalc_core.batch import calculate_driving_pressure, calculate_mechanical_power
+from smartcalc_core.formulas import calculate_ideal_weight
+
+def tidal_volumes(gender, height, ml_per_kg=(4, 5, 6, 7, 8)):
+    """Volumes correntes (mL) para cada mL/kg do peso predito; vazio se o gênero for inválido."""
+    weight = calculate_ideal_weight(gender, height)
+    if weight is None:
+        return np.empty(0)
+    return np.asarray(ml_per_kg, dtype=np.float64) * weight
+
+
+def sweep(rr, tidal_volume, peep, plateau, resistive_pressure=5.0):
+    """
+    Calcula ΔP e mechanical power em todas as combinações dos eixos.
+
+    Parâmetros:
+        rr (array): Frequências respiratórias (ciclos/min).
+        tidal_volume (array): Volumes correntes (mL).
+        peep (array): PEEPs (cmH2O).
+        plateau (array): Pressões de platô (cmH2O).
+        resistive_pressure (float): Pico - platô (cmH2O).
+
+    Retorna:
+        dict: Os eixos e os arrays ``driving_pressure`` (PEEP x platô) e
+        ``mechanical_power`` (FR x VC x PEEP x platô). Combinações com platô
+        menor ou igual à PEEP ficam NaN.
+    """
+    rr = np.asarray(rr, dtype=np.float64).reshape(-1, 1, 1, 1)
+    volume = np.asarray(tidal_volume, dtype=np.float64).reshape(1, -1, 1, 1) / 1000
+    peep = np.asarray(peep, dtype=np.float64).reshape(1, 1, -1, 1)
+    plateau = np.asarray(plateau, dtype=np.float64).reshape(1, 1, 1, -1)
+
+    driving_pressure = calculate_driving_pressure(plateau, peep)
+    driving_pressure = np.where(driving_pressure > 0, driving_pressure, np.nan)
+    mechanical_power = calculate_mechanical_power(rr, volume, plateau + resistive_pressure, driving_pressure)
+    return {
+        "rr": rr.ravel(),
+        "tidal_volume": volume.ravel() * 1000,
+        "peep": peep.ravel(),
+        "plateau": plateau.ravel(),
+        "driving_pressure": driving_pressure[0, 0],
+        "mechanical_power": mechanical_power,
+    }
+
+
+def to_records(x_name, x_values, y_name, y_values, values, value_name):
+    """Uma linha (dict) por célula de uma fatia 2-D, no formato aceito pelo heatmap do altair."""
+    xx, yy = np.meshgrid(x_values, y_values, indexing="ij")
+    return [
+        {x_name: x, y_name: y, value_name: value}
+        for x, y, value in zip(xx.ravel().tolist(), yy.ravel().tolist(), np.asarray(values).ravel().tolist())
+    ]
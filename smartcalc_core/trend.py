@@ -0,0 +1,202 @@
+"""
+Estatísticas móveis incrementais dos índices de ventilação por paciente.
+
+A cada novo ciclo, ``TrendEngine.update`` calcula Cst, Rva, ΔP e mechanical
+power com as fórmulas de ``smartcalc_core.formulas`` e atualiza, em O(1)
+amortizado, média, mínimo, máximo e inclinação (regressão linear) da janela
+dos últimos N ciclos e/ou dos últimos S segundos. A memória por paciente é
+limitada pelo tamanho da janela.
+
+Uso:
+    engine = TrendEngine(window=60, span=300)
+    engine.update("leito-12", t=time.time(), peak_pressure=32, plateau_pressure=25,
+                  peep=8, flow=60, tidal_volume=450, rr=20)
+    engine.summary("leito-12")["static_compliance"]
+"""
+
+from collections import deque
+
+from smartcalc_core.formulas import (
+    calculate_driving_pressure,
+    calculate_mechanical_power,
+    calculate_resistance,
+    calculate_static_compliance,
+)
+
+METRICS = ("static_compliance", "resistance", "driving_pressure", "mechanical_power")
+
+
+class RollingStats:
+    """
+    Janela deslizante com média, mínimo, máximo e inclinação incrementais.
+
+    Parâmetros:
+        window (int): Número máximo de amostras na janela.
+        span (float, opcional): Idade máxima das amostras, na unidade de ``t``.
+    """
+
+    __slots__ = (
+        "window", "span", "_values", "_min", "_max", "_seq",
+        "_origin", "_sum_x", "_sum_t", "_sum_tt", "_sum_tx", "_evictions",
+    )
+
+    def __init__(self, window, span=None):
+        if window < 1:
+            raise ValueError("A janela deve ter pelo menos uma amostra.")
+        self.window = window
+        self.span = span
+        self._values = deque()  # (t, x)
+        self._min = deque()  # (seq, x), valores crescentes
+        self._max = deque()  # (seq, x), valores decrescentes
+        self._seq = 0
+        self._origin = None
+        self._evictions = 0
+        self._sum_x = self._sum_t = self._sum_tt = self._sum_tx = 0.0
+
+    def __len__(self):
+        return len(self._values)
+
+    def _add(self, t, x, sign):
+        t -= self._origin
+        self._sum_x += sign * x
+        self._sum_t += sign * t
+        self._sum_tt += sign * t * t
+        self._sum_tx += sign * t * x
+
+    def _rebuild(self):
+        # Recalcula as somas com a origem no início da janela, evitando que
+        # erros de arredondamento se acumulem ao longo de horas de dados
+        self._origin = self._values[0][0] if self._values else None
+        self._sum_x = self._sum_t = self._sum_tt = self._sum_tx = 0.0
+        for t, x in self._values:
+            self._add(t, x, 1)
+        self._evictions = 0
+
+    def push(self, t, x):
+        """Acrescenta a amostra ``x`` no instante ``t``; None/NaN são ignorados."""
+        if x is None or x != x:
+            return
+        if self._origin is None:
+            self._origin = t
+        self._seq += 1
+        self._values.append((t, x))
+        self._add(t, x, 1)
+
+        while len(self._values) > self.window or (self.span is not None and t - self._values[0][0] > self.span):
+            old_t, old_x = self._values.popleft()
+            self._add(old_t, old_x, -1)
+            self._evictions += 1
+        if self._evictions >= self.window:
+            self._rebuild()
+
+        # Filas monotônicas: o extremo da janela está sempre na frente
+        first = self._seq - len(self._values) + 1
+        lows, highs = self._min, self._max
+        while lows and lows[-1][1] >= x:
+            lows.pop()
+        while highs and highs[-1][1] <= x:
+            highs.pop()
+        lows.append((self._seq, x))
+        highs.append((self._seq, x))
+        while lows[0][0] < first:
+            lows.popleft()
+        while highs[0][0] < first:
+            highs.popleft()
+
+    @property
+    def mean(self):
+        n = len(self._values)
+        return self._sum_x / n if n else None
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._values else None
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._values else None
+
+    @property
+    def slope(self):
+        # Inclinação da reta de mínimos quadrados (unidades de x por unidade de t)
+        n = len(self._values)
+        denominator = n * self._sum_tt - self._sum_t ** 2
+        if n < 2 or denominator <= 1e-12 * max(n * self._sum_tt, 1.0):
+            return None
+        return (n * self._sum_tx - self._sum_t * self._sum_x) / denominator
+
+    def summary(self):
+        return {"count": len(self), "mean": self.mean, "min": self.min, "max": self.max, "slope": self.slope}
+
+
+class _PatientTrend:
+    __slots__ = ("breaths",) + METRICS
+
+    def __init__(self, window, span):
+        self.breaths = 0
+        for name in METRICS:
+            setattr(self, name, RollingStats(window, span))
+
+
+def derive_metrics(peak_pressure, plateau_pressure, peep, flow, tidal_volume, rr):
+    """
+    Índices de um ciclo (flow em L/min, tidal_volume em mL).
+
+    Índices que não podem ser calculados (platô igual à PEEP, fluxo zero)
+    ficam None.
+    """
+    driving_pressure = calculate_driving_pressure(plateau_pressure, peep)
+    try:
+        compliance = calculate_static_compliance(tidal_volume, plateau_pressure, peep)
+    except ZeroDivisionError:
+        compliance = None
+    return {
+        "static_compliance": compliance,
+        "resistance": calculate_resistance(peak_pressure, plateau_pressure, flow),
+        "driving_pressure": driving_pressure,
+        "mechanical_power": calculate_mechanical_power(rr, tidal_volume / 1000, peak_pressure, driving_pressure),
+    }
+
+
+class TrendEngine:
+    """
+    Tendências de vários pacientes num mesmo processo.
+
+    Parâmetros:
+        window (int): Número máximo de ciclos por janela.
+        span (float, opcional): Duração máxima da janela, na unidade de ``t``
+            (segundos, se ``t`` vier de ``time.time()``).
+    """
+
+    def __init__(self, window=60, span=None):
+        self.window = window
+        self.span = span
+        self._patients = {}
+
+    def __len__(self):
+        return len(self._patients)
+
+    def update(self, patient, peak_pressure, plateau_pressure, peep, flow, tidal_volume, rr, t=None):
+        """
+        Registra um ciclo e devolve os índices calculados para ele.
+
+        Sem ``t``, o tempo é o número do ciclo e a inclinação fica por ciclo.
+        """
+        trend = self._patients.get(patient)
+        if trend is None:
+            trend = self._patients[patient] = _PatientTrend(self.window, self.span)
+        trend.breaths += 1
+        if t is None:
+            t = trend.breaths
+        metrics = derive_metrics(peak_pressure, plateau_pressure, peep, flow, tidal_volume, rr)
+        for name, value in metrics.items():
+            getattr(trend, name).push(t, value)
+        return metrics
+
+    def summary(self, patient):
+        trend = self._patients[patient]
+        return {name: getattr(trend, name).summary() for name in METRICS}
+
+    def discard(self, patient):
+        # Libera a memória de um paciente (alta, transferência)
+        self._patients.pop(patient, None)
@@ -0,0 +1,105 @@
+"""
+Recursos estáticos da interface: listas de opções dos selectboxes e blocos HTML.
+
+Este módulo é importado uma única vez por processo (fica em ``sys.modules``),
+então as listas e os textos abaixo são construídos uma vez e compartilhados
+entre todas as sessões, em vez de serem recriados a cada rerun do
+``smartcalc.py``. As listas são tuplas para que nenhuma sessão as altere.
+"""
+
+EMPTY = ("",)
+
+# Listas de opções (a primeira opção vazia significa "não preenchido")
+GENDERS = EMPTY + ("Masculino", "Feminino")
+ZERO_TO_100 = EMPTY + tuple(range(0, 101))  # SpO2, FR (ROX), pressão de pico, ΔPocc
+FIO2 = EMPTY + tuple(round(i * 0.01, 2) for i in range(21, 101))  # ROX e PaO2/FiO2
+AGE_ADULT = EMPTY + tuple(range(18, 101))
+AGE_CHUMLEA = EMPTY + tuple(range(0, 105))
+AJ = EMPTY + tuple(range(0, 101))
+HEIGHT = EMPTY + tuple(range(130, 211))
+RVA = EMPTY + tuple(range(1, 81))
+CST = EMPTY + tuple(range(1, 201))
+PLATEAU_DP = EMPTY + tuple(range(0, 501))
+PEEP_DP = EMPTY + tuple(range(0, 301))
+PLATEAU = EMPTY + tuple(range(0, 51))  # Cst e Rva
+PEEP = EMPTY + tuple(range(0, 31))
+TIDAL_VOLUME_ML = EMPTY + tuple(range(0, 1501, 10))
+FLOW = EMPTY + tuple(range(0, 601))
+PAO2 = EMPTY + tuple(range(0, 1001))
+FR_IRRS = EMPTY + tuple(range(0, 81))
+TIDAL_VOLUME_L = EMPTY + tuple(round(i * 0.01, 2) for i in range(10, 101))
+
+# Estilos e cabeçalho, enviados num único bloco markdown
+HEADER_HTML = """
+    <style>
+    @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap');
+
+    /* Configurações gerais */
+    body {
+        font-family: 'Roboto', sans-serif;
+    }
+
+    /* Layout responsivo */
+    .main {
+        padding-top: 10px !important;
+        padding-left: 20px !important;
+        padding-right: 20px !important;
+    }
+
+    /* Sidebar estilizada */
+    [data-testid="stSidebar"] {
+        background-color: #f0f4f7;
+        color: #333333;
+        border-right: 1px solid #e0e0e0;
+    }
+    [data-testid="stSidebar"] * {
+        color: #004080 !important;
+    }
+    [data-testid="stSidebar"] a {
+        color: #007BFF !important;
+        text-decoration: none;
+    }
+    [data-testid="stSidebar"] a:hover {
+        color: #0056b3 !important;
+        text-decoration: underline;
+    }
+
+    /* Header com gradiente */
+    .header {
+        background: linear-gradient(to right, #09184D, #004080);
+        padding: 20px;
+        border-radius: 10px;
+        text-align: center;
+        color: white;
+        font-family: 'Roboto', sans-serif;
+    }
+    .header {
+        background-color: #333333; /* Cor de fundo alterada */
+    }
+    </style>
+    <div class="header">
+        <h1>Facilite sua Análise</h1>
+        <p>Cálculos práticos e rápidos no seu atendimento</p>
+    </div>
+    """
+
+# Rodapé
+FOOTER_HTML = """
+    <hr style="border:1px solid #e1e1e1;margin-top:20px;">
+    <div style="text-align: center;">
+        <p style="font-size:14px;color:grey;">
+            Desenvolvido por Dyego Tavares de Lima - Fisioterapeuta Intensivista | 2025 <br> Qualquer sugestão, entre em contato conosco.
+        </p>
+        <p style="font-size:14px;color:grey;">
+            <a href="https://www.instagram.com/fisioterapeuta.dyegotavares" target="_blank" style="text-decoration:none;color:#3f729b;">
+                <img src="https://upload.wikimedia.org/wikipedia/commons/a/a5/Instagram_icon.png" alt="Instagram" style="width:20px;height:20px;vertical-align:middle;margin-right:5px;">
+                Instagram
+            </a> 
+            |
+            <a href="https://wa.me/5583998113637" target="_blank" style="text-decoration:none;color:#25d366;">
+                <img src="https://upload.wikimedia.org/wikipedia/commons/6/6b/WhatsApp.svg" alt="WhatsApp" style="width:20px;height:20px;vertical-align:middle;margin-right:5px;">
+                WhatsApp
+            </a>
+        </p>
+    </div>
+    """
@@ -0,0 +1,229 @@
+"""
+Análise das curvas de pressão e fluxo do ventilador, ciclo a ciclo.
+
+A partir dos sinais amostrados (pressão em cmH2O, fluxo em L/min, tipicamente
+100-200 Hz), ``analyze``:
+
+1. separa os ciclos pelo início de cada inspiração (fluxo cruzando o limiar);
+2. mede pico, platô (média da pausa inspiratória, se houver), PEEP (fim da
+   expiração), volume corrente (integral do fluxo) e o fluxo no fim da
+   inspiração;
+3. calcula Cst, Rva e constante de tempo com as versões vetorizadas de
+   ``calculate_static_compliance``, ``calculate_resistance`` (que converte
+   L/min) e ``calculate_time_constant``;
+4. ajusta a equação do movimento ``P = E·V + R·V' + P0`` por mínimos quadrados
+   em cada ciclo, todos de uma vez: as somas das equações normais saem de
+   somas acumuladas e os sistemas 3x3 são resolvidos em lote.
+
+Nada é feito em loop Python por amostra ou por ciclo. ``WaveformChannel``
+guarda o sinal de um canal em tempo real e devolve os ciclos completos a cada
+trecho recebido.
+
+Uso:
+    results = analyze(pressure, flow, fs=100)
+    results["static_compliance"], results["compliance_fit"]
+
+    channel = WaveformChannel(fs=200)
+    for pressure_chunk, flow_chunk in stream:
+        breaths = channel.push(pressure_chunk, flow_chunk)
+"""
+
+import numpy as np
+
+from smartcalc_core.batch import calculate_resistance, calculate_static_compliance, calculate_time_constant
+
+FLOW_THRESHOLD = 3.0  # L/min; abaixo disso o fluxo é considerado zero
+MIN_PAUSE_SECONDS = 0.1
+
+RESULT_FIELDS = (
+    "start", "peak_pressure", "plateau_pressure", "peep", "tidal_volume", "flow",
+    "static_compliance", "resistance", "time_constant", "compliance_fit", "resistance_fit",
+)
+
+
+def _segment_mean(cumulative, start, end):
+    # Média de [start, end) a partir da soma acumulada (com 0 na frente)
+    return (cumulative[end] - cumulative[start]) / np.maximum(end - start, 1)
+
+
+def _empty():
+    return {name: np.empty(0, dtype=np.int64 if name == "start" else np.float64) for name in RESULT_FIELDS}
+
+
+def breath_starts(flow, threshold=FLOW_THRESHOLD):
+    """Índices onde começa cada inspiração (fluxo passa a ficar acima do limiar)."""
+    inspiring = np.asarray(flow) > threshold
+    return np.flatnonzero(inspiring[1:] & ~inspiring[:-1]) + 1
+
+
+def analyze(pressure, flow, fs, threshold=FLOW_THRESHOLD, starts=None):
+    """
+    Analisa todos os ciclos completos dos sinais.
+
+    Parâmetros:
+        pressure (array): Pressão de vias aéreas (cmH2O).
+        flow (array): Fluxo (L/min), positivo na inspiração.
+        fs (float): Frequência de amostragem (Hz).
+        threshold (float): Limiar de fluxo (L/min) para início e fim da inspiração.
+        starts (array, opcional): Inícios de ciclo já calculados.
+
+    Retorna:
+        dict: Um array por campo de ``RESULT_FIELDS``, um elemento por ciclo
+        completo (do início de uma inspiração ao início da seguinte). Sem
+        pausa inspiratória, platô, Cst, Rva e constante de tempo ficam NaN;
+        o ajuste da equação do movimento não depende da pausa.
+    """
+    pressure = np.asarray(pressure, dtype=np.float64)
+    flow = np.asarray(flow, dtype=np.float64)
+    if starts is None:
+        starts = breath_starts(flow, threshold)
+    if len(starts) < 2:
+        return _empty()
+    begin, end = starts[:-1], starts[1:]
+
+    # Fim da inspiração e início da expiração de cada ciclo
+    not_inspiring = np.flatnonzero(flow <= threshold)
+    expiring = np.flatnonzero(flow < -threshold)
+    insp_end = not_inspiring[np.minimum(np.searchsorted(not_inspiring, begin), len(not_inspiring) - 1)]
+    if len(expiring):
+        exp_index = np.searchsorted(expiring, insp_end)
+        exp_start = np.where(exp_index < len(expiring), expiring[np.minimum(exp_index, len(expiring) - 1)], end)
+    else:
+        # Sem fluxo expiratório (ex.: sinal retificado), a pausa vai até o próximo ciclo
+        exp_start = end
+    insp_end = np.minimum(insp_end, end)
+    exp_start = np.clip(exp_start, insp_end, end)
+
+    flow_ls = flow / 60
+    cum_pressure = np.concatenate(([0.0], np.cumsum(pressure)))
+    cum_flow = np.concatenate(([0.0], np.cumsum(flow)))
+    # Volume (L) a partir do início de cada ciclo; na amostra i, o fluxo das
+    # amostras anteriores (o da própria amostra ainda não entrou no pulmão)
+    absolute_volume = np.concatenate(([0.0], np.cumsum(flow_ls[:-1]))) / fs
+    offset = absolute_volume[begin]
+    owner = np.repeat(np.arange(len(begin)), end - begin)
+    span = slice(begin[0], end[-1])
+    volume = absolute_volume[span] - offset[owner]
+    pressure_span = pressure[span]
+    flow_span = flow_ls[span]
+
+    peak = np.maximum.reduceat(pressure_span, begin - begin[0])
+    tidal_volume = np.maximum.reduceat(volume, begin - begin[0]) * 1000
+
+    # Platô: segunda metade da pausa inspiratória; PEEP: último décimo do ciclo
+    pause = exp_start - insp_end
+    has_pause = pause >= max(int(MIN_PAUSE_SECONDS * fs), 1)
+    plateau = np.where(has_pause, _segment_mean(cum_pressure, insp_end + pause // 2, exp_start), np.nan)
+    tail = np.maximum((end - begin) // 10, 1)
+    peep = _segment_mean(cum_pressure, end - tail, end)
+    last_insp = np.maximum((insp_end - begin) // 4, 1)
+    end_flow = _segment_mean(cum_flow, insp_end - last_insp, insp_end)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        compliance = calculate_static_compliance(tidal_volume, plateau, peep)
+        resistance = calculate_resistance(peak, plateau, end_flow)
+        time_constant = calculate_time_constant(resistance, compliance)
+
+    # Equação do movimento na inspiração e pausa: somas por ciclo das equações normais
+    local = np.arange(span.start, span.stop)
+    fitted = local < exp_start[owner]
+    ones = fitted.astype(np.float64)
+    v, f, p = volume * ones, flow_span * ones, pressure_span * ones
+    products = np.stack((v * v, v * f, v, f * f, f, ones, p * v, p * f, p))
+    sums = np.add.reduceat(products, begin - begin[0], axis=1)
+    vv, vf, vs, ff, fs_, n, pv, pf, ps = sums
+    matrix = np.stack((
+        np.stack((vv, vf, vs), axis=-1),
+        np.stack((vf, ff, fs_), axis=-1),
+        np.stack((vs, fs_, n), axis=-1),
+    ), axis=-2)
+    rhs = np.stack((pv, pf, ps), axis=-1)
+    solvable = np.abs(np.linalg.det(matrix)) > 1e-12
+    coefficients = np.full((len(begin), 3), np.nan)
+    if solvable.any():
+        coefficients[solvable] = np.linalg.solve(matrix[solvable], rhs[solvable][..., None])[..., 0]
+    elastance, resistance_fit = coefficients[:, 0], coefficients[:, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        compliance_fit = np.where(elastance > 0, 1000 / elastance, np.nan)
+
+    return {
+        "start": begin,
+        "peak_pressure": peak,
+        "plateau_pressure": plateau,
+        "peep": peep,
+        "tidal_volume": tidal_volume,
+        "flow": end_flow,
+        "static_compliance": compliance,
+        "resistance": resistance,
+        "time_constant": time_constant,
+        "compliance_fit": compliance_fit,
+        "resistance_fit": resistance_fit,
+    }
+
+
+class WaveformChannel:
+    """
+    Canal de curvas em tempo real (um leito).
+
+    Parâmetros:
+        fs (float): Frequência de amostragem (Hz).
+        max_seconds (float): Tamanho máximo do trecho guardado sem ciclo
+            completo (ex.: desconexão); o excesso mais antigo é descartado.
+    """
+
+    def __init__(self, fs, max_seconds=30.0, threshold=FLOW_THRESHOLD):
+        self.fs = fs
+        self.threshold = threshold
+        self.max_samples = int(max_seconds * fs)
+        self.samples = 0  # amostras já descartadas do buffer
+        self._pressure = np.empty(0)
+        self._flow = np.empty(0)
+
+    def push(self, pressure, flow):
+        """
+        Acrescenta um trecho e devolve os ciclos que ficaram completos.
+
+        ``start`` dos resultados é o índice absoluto da amostra no canal.
+        """
+        self._pressure = np.concatenate((self._pressure, pressure))
+        self._flow = np.concatenate((self._flow, flow))
+        starts = breath_starts(self._flow, self.threshold)
+        results = analyze(self._pressure, self._flow, self.fs, self.threshold, starts)
+        results["start"] = results["start"] + self.samples
+        # Mantém o ciclo em andamento, com uma amostra antes do início para
+        # que ele seja detectado de novo no próximo trecho
+        keep = starts[-1] - 1 if len(starts) else 0
+        keep = max(keep, len(self._flow) - self.max_samples)
+        self._pressure = self._pressure[keep:]
+        self._flow = self._flow[keep:]
+        self.samples += keep
+        return results
+
+
+def synthesize(breaths, fs, resistance=10.0, compliance=50.0, peep=5.0, flow=60.0,
+               inspiratory_time=0.5, pause=0.3, rr=20, noise=0.0, rng=None):
+    """
+    Curvas de ventilação controlada a volume com fluxo constante (para testes).
+
+    Parâmetros em cmH2O/L/s, mL/cmH2O, cmH2O, L/min, s e ciclos/min.
+    Devolve (pressão, fluxo) com ``breaths`` ciclos.
+    """
+    period = int(round(60 / rr * fs))
+    t = np.arange(period) / fs
+    flow_ls = flow / 60
+    tidal_volume = flow_ls * inspiratory_time  # L
+    tau = resistance * compliance / 1000
+    elastance = 1000 / compliance
+    inspiring = t < inspiratory_time
+    pausing = (t >= inspiratory_time) & (t < inspiratory_time + pause)
+    t_exp = t - inspiratory_time - pause
+    volume = np.where(inspiring, flow_ls * t, np.where(pausing, tidal_volume, tidal_volume * np.exp(-np.maximum(t_exp, 0) / tau)))
+    cycle_flow = np.where(inspiring, flow_ls, np.where(pausing, 0.0, -volume / tau))
+    cycle_pressure = peep + elastance * volume + resistance * cycle_flow
+    pressure = np.tile(cycle_pressure, breaths)
+    flow_lmin = np.tile(cycle_flow * 60, breaths)
+    if noise:
+        rng = rng or np.random.default_rng()
+        pressure = pressure + rng.normal(0, noise, pressure.shape)
+        flow_lmin = flow_lmin + rng.normal(0, noise, flow_lmin.shape)
+    return pressure, flow_lmin
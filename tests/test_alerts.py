@@ -0,0 +1,56 @@
+import pytest
+
+from smartcalc_core.alerts import AlertEngine, Rule
+
+
+def states(alerts):
+    return [(a.rule, a.state) for a in alerts]
+
+
+def dp_event(bed, plateau, t=0):
+    return {"bed": bed, "t": t, "plateau_pressure": plateau, "peep": 10}
+
+
+def test_driving_pressure_hysteresis():
+    engine = AlertEngine()
+    # ΔP 16 dispara; 15 e 14 ficam na faixa de histerese; 13 limpa
+    assert states(engine.process(dp_event("1", 26))) == [("driving_pressure_alto", "raised")]
+    assert engine.process(dp_event("1", 27)) == []
+    assert engine.process(dp_event("1", 25)) == []
+    assert engine.process(dp_event("1", 24)) == []
+    assert states(engine.process(dp_event("1", 23))) == [("driving_pressure_alto", "cleared")]
+    assert engine.process(dp_event("1", 23)) == []
+    assert engine.active() == []
+
+
+def test_threshold_itself_does_not_raise():
+    engine = AlertEngine()
+    assert engine.process(dp_event("1", 25)) == []
+
+
+def test_beds_have_independent_state():
+    engine = AlertEngine()
+    engine.process(dp_event("1", 30))
+    assert engine.process(dp_event("2", 20)) == []
+    assert engine.active() == [("1", "driving_pressure_alto")]
+    assert engine.active("2") == []
+    assert states(engine.process(dp_event("2", 30))) == [("driving_pressure_alto", "raised")]
+
+
+def test_below_rule_clears_above_clear_value():
+    engine = AlertEngine([Rule("pf", "pao2_fio2", "<", 200, 210)])
+    event = {"bed": "3", "pao2": 60, "fio2": 0.4}  # P/F 150
+    assert states(engine.process(event)) == [("pf", "raised")]
+    assert engine.process(dict(event, pao2=82)) == []  # 205: ainda em alerta
+    assert states(engine.process(dict(event, pao2=86))) == [("pf", "cleared")]  # 215
+
+
+def test_rule_without_clear_uses_threshold():
+    engine = AlertEngine([Rule("irrs", "irrs", ">", 105)])
+    assert states(engine.process({"bed": "1", "rr": 40, "tidal_volume": 300})) == [("irrs", "raised")]
+    assert states(engine.process({"bed": "1", "rr": 30, "tidal_volume": 300})) == [("irrs", "cleared")]
+
+
+def test_invalid_operator():
+    with pytest.raises(ValueError):
+        AlertEngine([Rule("x", "irrs", ">=", 105)])
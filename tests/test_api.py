@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+import pytest
+
+from smartcalc_core import api
+
+
+def post(path, body, length=None):
+    """Envia uma requisição ao servidor numa porta livre e devolve (status, corpo)."""
+    async def run():
+        server = await asyncio.start_server(api.handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        writer.write(
+            f"POST {path} HTTP/1.1\r\nContent-Length: {len(data) if length is None else length}\r\n"
+            "Connection: close\r\n\r\n".encode() + data
+        )
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    head, _, payload = asyncio.run(run()).partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+def test_single_calculation():
+    status, body = post("/calculators/rox_index", {"spo2": 95, "fio2": 0.4, "fr": 22})
+    assert status == 200
+    assert body["result"] == pytest.approx(95 / 0.4 / 22)
+
+
+@pytest.mark.parametrize("name, payload", [
+    ("rox_index", {"spo2": 95, "fio2": 0.4}),                       # ausente
+    ("rox_index", {"spo2": "95", "fio2": 0.4, "fr": 22}),            # texto
+    ("rox_index", {"spo2": True, "fio2": 0.4, "fr": 22}),            # booleano
+    ("rox_index", {"spo2": 95, "fio2": 0.4, "fr": 500}),             # fora da faixa
+    ("ri_ratio", {"vteh_l": 600, "vteh": 450, "vti": 500, "pplatl": 20, "peepl": 5, "peeph": 5}),
+    ("pimax", {"gender": "Outro", "age": 40}),                      # gênero inválido
+])
+def test_invalid_single_is_422(name, payload):
+    with pytest.raises(api.ApiError) as error:
+        api.calculate(name, payload)
+    assert error.value.status == 422
+
+
+@pytest.mark.parametrize("raw", [b'{"spo2": NaN, "fio2": 0.4, "fr": 22}', b'{"spo2": 95, "fio2": Infinity, "fr": 22}'])
+def test_non_finite_is_422(raw):
+    status, body = post("/calculators/rox_index", raw)
+    assert status == 422
+    assert "finito" in body["error"]
+
+
+def test_huge_integer_is_422():
+    status, body = post("/calculators/rox_index", {"spo2": 10 ** 400, "fio2": 0.4, "fr": 22})
+    assert status == 422
+    assert "finito" in body["error"]
+
+
+def test_non_finite_result_is_422(monkeypatch):
+    monkeypatch.setattr(api.formulas, "calculate_muscular_pressure", lambda delta_pocc: float("inf"))
+    status, _ = post("/calculators/muscular_pressure", {"delta_pocc": 10})
+    assert status == 422
+
+
+def test_unserializable_response_is_500(monkeypatch):
+    monkeypatch.setattr(api, "route", lambda method, path, payload: (200, {"result": float("nan")}))
+    status, body = post("/calculators/rox_index", {})
+    assert status == 500
+    assert "error" in body
+
+
+def test_unknown_calculator_is_404():
+    status, body = post("/calculators/nada", {})
+    assert status == 404
+    assert "error" in body
+
+
+@pytest.mark.parametrize("length", ["-5", "abc"])
+def test_invalid_content_length_is_400(length):
+    status, body = post("/calculators/rox_index", b"", length=length)
+    assert status == 400
+    assert "Content-Length" in body["error"]
+
+
+def test_invalid_json_is_400():
+    status, _ = post("/calculators/rox_index", b"{")
+    assert status == 400
+
+
+def test_batch_invalid_rows_are_null():
+    patients = [{"spo2": 95, "fio2": 0.4, "fr": 22}, {"spo2": 95, "fio2": 0.4}, {"spo2": 95, "fio2": 0.4, "fr": 500}]
+    status, body = post("/calculators/rox_index/batch", {"patients": patients})
+    assert status == 200
+    assert body["results"][0] == pytest.approx(95 / 0.4 / 22)
+    assert body["results"][1:] == [None, None]
+
+
+@pytest.mark.parametrize("value", ["95", True, [95], 10 ** 400])
+def test_batch_wrong_type_is_422(value):
+    patients = [{"spo2": 95, "fio2": 0.4, "fr": 22}, {"spo2": value, "fio2": 0.4, "fr": 22}]
+    status, body = post("/calculators/rox_index/batch", {"patients": patients})
+    assert status == 422
+    assert "spo2" in body["error"]
+
+
+@pytest.mark.parametrize("gender", [["Masculino"], 1, {}])
+def test_batch_non_text_gender_is_422(gender):
+    patients = [{"gender": "Masculino", "age": 40}, {"gender": gender, "age": 40}]
+    status, body = post("/calculators/pimax/batch", {"patients": patients})
+    assert status == 422
+    assert "gender" in body["error"]
+
+
+def test_batch_non_finite_rows_are_null():
+    raw = b'{"patients": [{"spo2": 95, "fio2": 0.4, "fr": 22}, {"spo2": NaN, "fio2": 0.4, "fr": 22}, ' \
+          b'{"spo2": 95, "fio2": 0.4, "fr": -Infinity}]}'
+    status, body = post("/calculators/rox_index/batch", raw)
+    assert status == 200
+    assert body["results"][1:] == [None, None]
+
+
+def test_batch_matches_single():
+    patients = [{"gender": "Masculino", "age": 40}, {"gender": "Feminino", "age": 70}]
+    results = api.calculate_batch("pimax", {"patients": patients})
+    assert results == pytest.approx([api.calculate("pimax", p) for p in patients])
+
+
+def test_batch_requires_patient_list():
+    with pytest.raises(api.ApiError) as error:
+        api.calculate_batch("rox_index", {"patients": {}})
+    assert error.value.status == 400
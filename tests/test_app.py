@@ -0,0 +1,50 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "smartcalc.py")
+
+
+@pytest.fixture
+def app():
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    return at
+
+
+def results(at, label):
+    return [m.value for m in at.markdown if m.value.startswith(f"**{label}:**")]
+
+
+@pytest.mark.parametrize("vc", ["nan", "inf", "abc"])
+def test_registry_calculator_rejects_invalid_numbers(app, vc):
+    app.sidebar.radio[0].set_value("Ventilação Mecânica").run()
+    for key, value in dict(mp_fr="20", mp_vc=vc, mp_ppico="30", mp_dp="10").items():
+        app.text_input(key=key).set_value(value)
+    app.button(key="mp_button").click().run()
+    assert [e.value for e in app.error] == ["Por favor, insira valores numéricos válidos."]
+    assert results(app, "Mechanical Power") == []
+    assert not app.exception
+
+
+def test_registry_calculator_result(app):
+    app.sidebar.radio[0].set_value("Ventilação Mecânica").run()
+    for key, value in dict(mp_fr="20", mp_vc="500", mp_ppico="30", mp_dp="10").items():
+        app.text_input(key=key).set_value(value)
+    app.button(key="mp_button").click().run()
+    assert results(app, "Mechanical Power") == ["**Mechanical Power:** 24.50 J/min"]
+
+
+@pytest.mark.parametrize("pimax, message", [
+    ("0", "Não foi possível calcular com os valores informados."),
+    ("nan", "Por favor, insira valores numéricos válidos."),
+])
+def test_expression_calculator_rejects_undefined_results(app, pimax, message):
+    app.sidebar.radio[0].set_value("Outros Índices").run()
+    app.text_input(key="expr_p01_pimax_p01").set_value("3")
+    app.text_input(key="expr_p01_pimax_pimax").set_value(pimax)
+    app.button(key="expr_p01_pimax_button").click().run()
+    assert [e.value for e in app.error] == [message]
+    assert results(app, "P0.1 / PImáx") == []
+    assert not app.exception
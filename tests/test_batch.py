@@ -0,0 +1,110 @@
+import math
+
+import numpy as np
+import pytest
+
+from smartcalc_core import batch, formulas
+
+# Pacientes válidos: a versão em lote deve repetir a escalar, posição a posição
+CASES = {
+    "calculate_height_chumlea": [("Masculino", 70, 50), ("Feminino", 80, 45), ("Homem", 65, 52)],
+    "calculate_ideal_weight": [("Masculino", 175), ("Mulher", 160), ("Feminino", 190)],
+    "calculate_predicted_pimax": [("Masculino", 40), ("Feminino", 75)],
+    "calculate_predicted_pemax": [("Homem", 30), ("Mulher", 60)],
+    "calculate_time_constant": [(10, 50), (25, 30)],
+    "calculate_driving_pressure": [(25, 10), (18, 5)],
+    "calculate_static_compliance": [(450, 25, 10), (600, 30, 8)],
+    "calculate_resistance": [(35, 25, 60), (40, 20, 45)],
+    "calculate_mechanical_power": [(20, 0.45, 30, 12), (28, 0.38, 35, 15)],
+    "calculate_muscular_pressure": [(8,), (12,)],
+    "calculate_irrs": [(30, 0.3), (18, 0.5)],
+    "calculate_rox_index": [(95, 0.4, 22), (88, 0.6, 32)],
+    "calculate_ri_ratio": [(600, 450, 500, 20, 5, 15), (550, 400, 480, 22, 6, 12)],
+}
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_batch_matches_scalar(name):
+    cases = CASES[name]
+    expected = [getattr(formulas, name)(*case) for case in cases]
+    columns = [np.array(column) for column in zip(*cases)]
+    result = getattr(batch, name)(*columns)
+    assert result.dtype == np.float64
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+
+def test_pao2_fio2_matches_scalar():
+    pao2, fio2 = np.array([80.0, 120.0]), np.array([0.5, 0.3])
+    expected = [formulas.calculate_pao2_fio2(p, f)[0] for p, f in zip(pao2, fio2)]
+    np.testing.assert_allclose(batch.calculate_pao2_fio2(pao2, fio2), expected)
+
+
+def test_scalar_inputs_broadcast():
+    result = batch.calculate_rox_index(95, np.array([0.4, 0.5]), 22)
+    np.testing.assert_allclose(result, [95 / 0.4 / 22, 95 / 0.5 / 22])
+
+
+def test_pao2_fio2_masks_invalid_fio2():
+    result = batch.calculate_pao2_fio2([80, 80, 80, math.nan], [0.5, 0.0, -0.2, 0.5])
+    assert result[0] == pytest.approx(160)
+    assert np.isnan(result[1:]).all()
+    # A escalar recusa os mesmos casos
+    assert formulas.calculate_pao2_fio2(80, 0.0)[0] is None
+
+
+def test_resistance_masks_zero_flow():
+    result = batch.calculate_resistance([35, 35], [25, 25], [60, 0])
+    assert result[0] == pytest.approx(formulas.calculate_resistance(35, 25, 60))
+    assert np.isnan(result[1])
+    assert formulas.calculate_resistance(35, 25, 0) is None
+
+
+def test_irrs_masks_zero_tidal_volume():
+    result = batch.calculate_irrs([30, 30], [0.3, 0.0])
+    assert result[0] == pytest.approx(100)
+    assert np.isnan(result[1])
+
+
+def test_static_compliance_masks_zero_driving_pressure():
+    result = batch.calculate_static_compliance([450, 450], [25, 10], [10, 10])
+    assert result[0] == pytest.approx(30)
+    assert np.isnan(result[1])
+
+
+def test_rox_masks_zero_fio2_and_rate():
+    result = batch.calculate_rox_index([95, 95, 95], [0.4, 0.0, 0.4], [22, 22, 0])
+    assert not np.isnan(result[0])
+    assert np.isnan(result[1:]).all()
+
+
+def test_ri_ratio_masks_equal_peeps_and_zero_vti():
+    result = batch.calculate_ri_ratio([600] * 3, [450] * 3, [500, 500, 0], [20] * 3, [5, 5, 5], [15, 5, 15])
+    assert result[0] == pytest.approx(formulas.calculate_ri_ratio(600, 450, 500, 20, 5, 15))
+    assert np.isnan(result[1:]).all()
+    with pytest.raises(ZeroDivisionError):
+        formulas.calculate_ri_ratio(600, 450, 500, 20, 5, 5)
+
+
+def test_invalid_gender_is_nan():
+    result = batch.calculate_ideal_weight(["Masculino", "", "Outro"], [175, 175, 175])
+    assert result[0] == pytest.approx(formulas.calculate_ideal_weight("Masculino", 175))
+    assert np.isnan(result[1:]).all()
+    assert formulas.calculate_ideal_weight("", 175) is None
+
+
+def test_boolean_gender_mask():
+    result = batch.calculate_predicted_pimax(np.array([True, False]), [40, 40])
+    np.testing.assert_allclose(result, [
+        formulas.calculate_predicted_pimax("Masculino", 40),
+        formulas.calculate_predicted_pimax("Feminino", 40),
+    ])
+
+
+def test_compute_table_only_available_metrics():
+    table = {"spo2": [95, 90], "fio2": [0.4, 0.0], "rr": [22, 25], "tidal_volume": [400, 0]}
+    result = batch.compute_table(table)
+    assert set(result) == {"rox_index", "irrs"}
+    assert result["rox_index"][0] == pytest.approx(formulas.calculate_rox_index(95, 0.4, 22))
+    assert np.isnan(result["rox_index"][1])
+    assert result["irrs"][0] == pytest.approx(formulas.calculate_irrs(22, 0.4))
+    assert np.isnan(result["irrs"][1])
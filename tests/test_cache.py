@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from smartcalc_core.cache import LRUCache, memoize
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: pytest.fail("a deveria estar no cache"))
+    # "b" é o menos usado agora
+    cache.get("c", lambda: 3)
+    assert list(cache._data) == ["a", "c"]
+    assert cache.get("b", lambda: 20) == 20
+    assert list(cache._data) == ["c", "b"]
+    assert cache.info()["evictions"] == 2
+
+
+def test_counters():
+    cache = LRUCache(maxsize=10)
+    for key in "abab":
+        cache.get(key, lambda: key.upper())
+    assert cache.info() == {"hits": 2, "misses": 2, "evictions": 0, "size": 2, "maxsize": 10}
+    cache.clear()
+    assert cache.info() == {"hits": 0, "misses": 0, "evictions": 0, "size": 0, "maxsize": 10}
+
+
+def test_exceptions_are_not_cached():
+    cache = LRUCache(maxsize=10)
+    with pytest.raises(ZeroDivisionError):
+        cache.get("x", lambda: 1 / 0)
+    assert len(cache) == 0
+    assert cache.get("x", lambda: 1) == 1
+
+
+def test_memoize():
+    calls = []
+
+    def double(x):
+        calls.append(x)
+        return 2 * x
+
+    cache = LRUCache(maxsize=10)
+    cached = memoize(double, cache)
+    assert [cached(1), cached(1), cached([2])] == [2, 2, [2, 2]]
+    # A lista não é chave válida e passa direto, sem contar no cache
+    assert calls == [1, [2]]
+    assert cache.info()["hits"] == 1
+    assert memoize(double, LRUCache(maxsize=0)) is double
+
+
+def test_concurrent_get():
+    cache = LRUCache(maxsize=50)
+    errors = []
+
+    def worker(seed):
+        try:
+            for i in range(2000):
+                key = (seed * 7 + i) % 80
+                assert cache.get(key, lambda: key * 3) == key * 3
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    info = cache.info()
+    assert errors == []
+    assert info["size"] == len(cache._data) <= 50
+    assert info["hits"] + info["misses"] == 8 * 2000
+    assert all(value == key * 3 for key, value in cache._data.items())
@@ -0,0 +1,63 @@
+import pytest
+
+from smartcalc_core.cohort import HOUR_MS, CohortStore
+
+# Início de uma hora cheia, longe de zero
+BASE = 1_000 * HOUR_MS
+
+
+@pytest.fixture
+def cohort(tmp_path):
+    store = CohortStore(str(tmp_path / "coorte.db"), batch_size=1000, flush_interval=0)
+    yield store
+    store.close()
+
+
+def test_patients_below_across_hour_boundaries(cohort):
+    end = BASE + 5 * HOUR_MS + 30 * 60_000  # 5h30 depois de BASE
+    # Janela de 3 h: [2h30, 5h30]; ponta inicial, hora cheia e ponta final
+    cohort.add("antes", BASE + 2 * HOUR_MS + 29 * 60_000, pao2=60, fio2=0.5)  # fora da janela
+    cohort.add("inicio", BASE + 2 * HOUR_MS + 30 * 60_000, pao2=60, fio2=0.5)
+    cohort.add("meio", BASE + 4 * HOUR_MS, pao2=60, fio2=0.5)
+    cohort.add("fim", end, pao2=60, fio2=0.5)
+    cohort.add("depois", end + 1, pao2=60, fio2=0.5)
+    cohort.add("normal", BASE + 4 * HOUR_MS, pao2=200, fio2=0.5)
+    cohort.flush()
+    assert cohort.patients_below(hours=3, end=end, pao2_fio2=150) == ["fim", "inicio", "meio"]
+
+
+def test_patients_below_window_inside_one_hour(cohort):
+    cohort.add("a", BASE + 10 * 60_000, pao2=60, fio2=0.5)
+    cohort.add("b", BASE + 40 * 60_000, pao2=60, fio2=0.5)
+    cohort.flush()
+    assert cohort.patients_below(hours=0.25, end=BASE + 45 * 60_000, pao2_fio2=150) == ["b"]
+
+
+def test_patients_below_requires_every_limit(cohort):
+    t = BASE + HOUR_MS
+    cohort.add("1", t, pao2=60, fio2=0.5)                 # P/F 120
+    cohort.add("1", t, spo2=88, fio2=0.6, rr=40)          # ROX 3,67
+    cohort.add("2", t, pao2=60, fio2=0.5)
+    cohort.add("2", t, spo2=98, fio2=0.3, rr=20)          # ROX 16
+    cohort.flush()
+    assert cohort.patients_below(end=t, pao2_fio2=150, rox_index=3.85) == ["1"]
+
+
+def test_hourly_and_before_extubation(cohort):
+    cohort.add("1", BASE + 10, rr=30, tidal_volume=300)     # IRRS 100
+    cohort.add("1", BASE + 20, rr=20, tidal_volume=400)     # IRRS 50
+    cohort.add("1", BASE + HOUR_MS + 10, rr=20, tidal_volume=200)
+    cohort.flush()
+    hours = cohort.hourly("irrs", hours=2, end=BASE + HOUR_MS + 20)
+    assert hours[0] == (BASE, 2, pytest.approx(75), 50, 100)
+    assert hours[1][:2] == (BASE + HOUR_MS, 1)
+    cohort.record_extubation("1", BASE + 2 * HOUR_MS)
+    rows = cohort.before_extubation("irrs", hours=3, since_hours=1, end=BASE + 2 * HOUR_MS)
+    assert [row[:2] for row in rows] == [(0, 1), (1, 2)]
+
+
+def test_unknown_metric_and_input(cohort):
+    with pytest.raises(ValueError):
+        cohort.patients_below(spo2=90)
+    with pytest.raises(ValueError):
+        cohort.add("1", BASE, lactate=2)
@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+from smartcalc_core.colstore import ColumnStore, bed_store
+
+
+def test_append_and_range(tmp_path):
+    store = ColumnStore(str(tmp_path / "s"), ("a", "b"))
+    store.append([1000, 2000], a=[1.0, 2.0])
+    store.append(3000, a=3.0, b=30.0)
+    assert len(store) == 3
+    rows = store.range(2000)
+    assert rows["timestamp"].tolist() == [2000, 3000]
+    assert rows["a"].tolist() == [2.0, 3.0]
+    assert np.isnan(rows["b"][0]) and rows["b"][1] == 30.0
+    assert store.last(1.5, now=3000)["timestamp"].tolist() == [2000, 3000]
+
+
+def test_rejects_out_of_order(tmp_path):
+    store = ColumnStore(str(tmp_path / "s"), ("a",))
+    store.append([1000, 2000], a=[1, 2])
+    with pytest.raises(ValueError):
+        store.append([1500], a=[1])
+    with pytest.raises(ValueError):
+        store.append([3000, 2500], a=[1, 2])
+    with pytest.raises(ValueError):
+        store.append([3000], c=[1])
+    assert len(store) == 2
+
+
+def test_interrupted_write_is_overwritten(tmp_path):
+    store = ColumnStore(str(tmp_path / "s"), ("a",))
+    store.append([1000], a=[1.0])
+    # Coluna gravada sem o timestamp correspondente (processo interrompido)
+    with open(os.path.join(store.path, "a.f4"), "ab") as f:
+        f.write(np.float32(99).tobytes())
+    store.append([2000], a=[2.0])
+    assert store.range(0)["a"].tolist() == [1.0, 2.0]
+
+
+def test_short_column_limits_reads(tmp_path):
+    store = ColumnStore(str(tmp_path / "s"), ("a", "b"))
+    store.append([1000, 2000, 3000], a=[1, 2, 3], b=[4, 5, 6])
+    with open(os.path.join(store.path, "b.f4"), "r+b") as f:
+        f.truncate(8)
+    reader = ColumnStore(store.path)
+    assert reader.last(10, now=3000)["timestamp"].tolist() == [1000, 2000]
+    assert reader.range(0)["b"].tolist() == [4, 5]
+
+
+def _writer(path, worker, batches):
+    store = ColumnStore(path)
+    for _ in range(batches):
+        # Mesmo instante em todos os processos, para a ordem nunca ser violada
+        store.append([1000, 1000], a=[worker, worker], b=[worker, worker])
+
+
+def test_concurrent_writers(tmp_path):
+    path = str(tmp_path / "s")
+    ColumnStore(path, ("a", "b"))
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_writer, args=(path, worker, 200)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+    store = ColumnStore(path)
+    assert len(store) == 4 * 200 * 2
+    for name in ("a", "b"):
+        assert os.path.getsize(os.path.join(path, f"{name}.f4")) == len(store) * 4
+    # Cada lote de duas linhas veio inteiro de um único processo
+    rows = store.range(0)
+    a, b = rows["a"].reshape(-1, 2), rows["b"].reshape(-1, 2)
+    assert (a[:, 0] == a[:, 1]).all() and (a == b).all()
+    assert np.bincount(a[:, 0].astype(int)).tolist() == [200] * 4
+
+
+def test_bed_store_validates_id(tmp_path):
+    bed_store(str(tmp_path), "UTI-1_2")
+    with pytest.raises(ValueError):
+        bed_store(str(tmp_path), "../x")
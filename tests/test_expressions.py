@@ -0,0 +1,95 @@
+import math
+
+import numpy as np
+import pytest
+
+from smartcalc_core.expressions import BUILTIN, Expression, ExpressionError, compile_expression, load_expressions
+
+
+@pytest.mark.parametrize("source", [
+    "__import__('os')",           # chamada fora de FUNCTIONS
+    "a.real",                     # atributo
+    "a[0]",                       # subscrito
+    "a if a else b",              # condicional
+    "a < b",                      # comparação
+    "lambda: a",                  # lambda
+    "[a, b]",                     # lista
+    "'texto'",                    # constante não numérica
+    "True + a",                   # booleano
+    "c * 2",                      # entrada desconhecida
+    "sqrt(a=a)",                  # argumento nomeado
+    "np.sqrt(a)",                 # função fora do nome simples
+    "a +",                        # sintaxe
+    "a" + " + a" * 200,           # expressão longa demais
+])
+def test_rejected_expressions(source):
+    with pytest.raises(ExpressionError):
+        compile_expression(source, ["a", "b"])
+
+
+@pytest.mark.parametrize("source", ["min(a)", "max(a, b, 1)", "sqrt()", "sqrt(a, b)", "abs(*a)"])
+def test_function_arity_is_checked(source):
+    with pytest.raises(ExpressionError):
+        compile_expression(source, ["a", "b"])
+
+
+@pytest.mark.parametrize("name", ["1a", "sqrt", "a-b"])
+def test_invalid_input_names(name):
+    with pytest.raises(ExpressionError):
+        compile_expression("1", [name])
+
+
+def test_no_builtins_available():
+    function = compile_expression("a * 2", ["a"])
+    assert function.__globals__["__builtins__"] == {}
+
+
+def test_scalar_and_array_evaluation():
+    cdyn = BUILTIN["dynamic_compliance"]
+    assert cdyn(450, 30, 8) == pytest.approx(450 / 22)
+    assert cdyn("450", "30", "8") == pytest.approx(450 / 22)
+    result = cdyn.evaluate({"tidal_volume": [450, 450], "peak_pressure": [30, 8], "peep": [8, 8]})
+    assert result[0] == pytest.approx(450 / 22)
+    assert np.isnan(result[1])
+
+
+def test_division_by_zero_through_numpy_function():
+    # abs() devolve np.float64, que divide por zero sem levantar
+    with pytest.raises(ArithmeticError):
+        BUILTIN["p01_pimax"](3, 0)
+    with pytest.raises(ZeroDivisionError):
+        Expression("x", "x", "a / b", [("a", "a"), ("b", "b")])(1, 0)
+
+
+@pytest.mark.parametrize("source, value", [("a ** 0.5", -4), ("log(a)", -1), ("sqrt(a)", -1), ("exp(a)", 1000)])
+def test_complex_and_non_finite_results(source, value):
+    with pytest.raises(ArithmeticError):
+        Expression("x", "x", source, [("a", "a")])(value)
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-inf", "abc", ""])
+def test_invalid_inputs(value):
+    with pytest.raises(ValueError):
+        Expression("x", "x", "a + 1", [("a", "a")])(value)
+
+
+def test_result_is_float():
+    result = Expression("x", "x", "max(a, b) ** 2", [("a", "a"), ("b", "b")])(2, 3)
+    assert type(result) is float and result == 9
+
+
+def test_integer_powers_overflow_instead_of_hanging():
+    with pytest.raises(OverflowError):
+        Expression("x", "x", "a ** 100000", [("a", "a")])(10)
+
+
+def test_load_expressions(tmp_path):
+    path = tmp_path / "formulas.json"
+    path.write_text(
+        '[{"name": "cdyn", "title": "Cdyn", "unit": "mL/cmH2O", "expression": "vt / (ppico - peep)",'
+        ' "inputs": [{"name": "vt"}, {"name": "ppico"}, {"name": "peep", "label": "PEEP"}]}]'
+    )
+    loaded = load_expressions(str(path))
+    assert loaded["cdyn"](450, 30, 8) == pytest.approx(450 / 22)
+    assert loaded["cdyn"].inputs[2] == ("peep", "PEEP", "")
+    assert math.isclose(loaded["cdyn"].evaluate({"vt": [450], "ppico": [30], "peep": [8]})[0], 450 / 22, rel_tol=1e-12)
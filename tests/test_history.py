@@ -0,0 +1,70 @@
+import threading
+
+import numpy as np
+import pytest
+
+from smartcalc_core import history
+from smartcalc_core.history import ResultHistory
+
+
+def test_wraps_around_keeping_latest():
+    results = ResultHistory(3)
+    for i in range(5):
+        results.record("ROX Index", float(i), t=i)
+    assert len(results) == 3
+    entries = results.entries()
+    # Do mais recente ao mais antigo, só os três últimos
+    np.testing.assert_array_equal(entries["timestamp"], [4, 3, 2])
+    np.testing.assert_array_equal(entries["value"], [4.0, 3.0, 2.0])
+    assert results.latest("ROX Index", 5) == [4.0, 3.0, 2.0]
+
+
+def test_latest_filters_by_calculator_after_overflow():
+    results = ResultHistory(4)
+    for i in range(7):
+        results.record("ROX Index" if i % 2 else "PImáx", float(i), t=i)
+    # Sobram 3..6: ROX em 3 e 5, PImáx em 4 e 6
+    assert results.latest("ROX Index", 5) == [5.0, 3.0]
+    assert results.latest("PImáx", 1) == [6.0]
+    assert results.entries()["calculator"] == ["PImáx", "ROX Index", "PImáx", "ROX Index"]
+    assert results.latest("Desconhecida") == []
+
+
+def test_capacity_per_category():
+    # Cada categoria tem o seu buffer: encher um não apaga o outro
+    oxygen, ventilation = ResultHistory(2), ResultHistory(5)
+    for i in range(4):
+        oxygen.record("ROX Index", float(i), t=i)
+        ventilation.record("Mechanical Power", float(i), t=i)
+    assert (len(oxygen), len(ventilation)) == (2, 4)
+    assert oxygen.latest("ROX Index") == [3.0, 2.0]
+    assert ventilation.latest("Mechanical Power") == [3.0, 2.0, 1.0, 0.0]
+
+
+def test_clear_and_invalid_capacity():
+    results = ResultHistory(2)
+    results.record("ROX Index", 1.0)
+    results.clear()
+    assert len(results) == 0
+    assert results.latest("ROX Index") == []
+    with pytest.raises(ValueError):
+        ResultHistory(0)
+
+
+def test_codes_are_unique_across_threads():
+    names = [f"Calculadora {i}" for i in range(50)]
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        for name in names:
+            history._code(name)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    codes = [history._codes[name] for name in names]
+    assert len(set(codes)) == len(names)
+    assert [history._names[code] for code in codes] == names
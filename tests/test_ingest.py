@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from smartcalc_core import ingest
+from smartcalc_core.cohort import CohortStore
+from smartcalc_core.colstore import bed_store
+
+LINE = "12|t=1700000000|spo2=90|fio2=0.5|rr=30|peak_pressure=32|plateau_pressure=24|peep=8|tidal_volume=400|flow=60"
+
+
+def test_parse_line():
+    event = ingest.parse_line(LINE + "|desconhecido=1\n")
+    assert event["bed"] == "12"
+    assert event["spo2"] == 90.0 and event["t"] == 1_700_000_000.0
+    assert "desconhecido" not in event
+
+
+@pytest.mark.parametrize("line", ["", "|spo2=90", "12|spo2", "12|spo2=abc", "12|t=nan", "12|spo2=inf", "12|rr=-inf"])
+def test_parse_line_rejects(line):
+    with pytest.raises(ValueError):
+        ingest.parse_line(line)
+
+
+def test_bad_event_is_counted_and_skipped(tmp_path):
+    ingestor = ingest.Ingestor(store_dir=str(tmp_path))
+    good = ingest.parse_line(LINE)
+    events = [dict(good, t=float("nan")), dict(good, t=1e300), good]
+    rows, observations = ingestor.process(events)
+    assert ingestor.invalid == 2
+    assert ingestor.processed == 1
+    ingestor.write(rows, observations)
+    stored = bed_store(str(tmp_path), "12").range(0)
+    assert stored["timestamp"].tolist() == [1_700_000_000_000]
+    assert stored["static_compliance"][0] == pytest.approx(25)
+
+
+def test_alert_callback_errors_do_not_stop_the_batch():
+    def on_alert(alert):
+        raise RuntimeError("falha no destino")
+
+    ingestor = ingest.Ingestor(on_alert=on_alert)
+    event = ingest.parse_line("1|t=1|plateau_pressure=30|peep=5")
+    ingestor.process([event, ingest.parse_line("2|t=1|spo2=99|fio2=0.21|rr=12")])
+    assert (ingestor.invalid, ingestor.processed) == (1, 1)
+
+
+def test_consumer_writes_off_the_loop(tmp_path):
+    cohort = CohortStore(str(tmp_path / "coorte.db"), flush_interval=0)
+    ingestor = ingest.Ingestor(store_dir=str(tmp_path / "leitos"), cohort_store=cohort)
+
+    async def run():
+        consumer = asyncio.create_task(ingestor.consume())
+        for i in range(3):
+            await ingestor.queue.put(ingest.parse_line(LINE.replace("t=1700000000", f"t={1700000000 + i}")))
+        await ingestor.queue.put({"bed": "12", "t": float("inf")})
+        await asyncio.wait_for(ingestor.queue.join(), 5)
+        assert not consumer.done()
+        consumer.cancel()
+
+    asyncio.run(run())
+    cohort.flush()
+    assert ingestor.invalid == 1
+    assert len(bed_store(str(tmp_path / "leitos"), "12")) == 3
+    assert cohort.patients_below(hours=1, end=1_700_000_002_000, rox_index=7) == ["12"]
+    cohort.close()
+
+
+def test_serve_fails_when_consumer_stops(monkeypatch):
+    ingestor = ingest.Ingestor()
+
+    async def broken():
+        raise RuntimeError("consumidor quebrado")
+
+    monkeypatch.setattr(ingestor, "consume", broken)
+    with pytest.raises(RuntimeError, match="consumidor quebrado"):
+        asyncio.run(asyncio.wait_for(ingestor.serve(port=0, report_every=60), 5))
+
+
+def test_store_columns_match_formulas(tmp_path):
+    ingestor = ingest.Ingestor(store_dir=str(tmp_path))
+    ingestor.write(*ingestor.process([ingest.parse_line(LINE)]))
+    stored = bed_store(str(tmp_path), "12").range(0)
+    metrics = ingest.compute_metrics(ingest.parse_line(LINE))
+    for name in ("static_compliance", "resistance", "time_constant", "driving_pressure"):
+        assert stored[name][0] == pytest.approx(metrics[name], rel=1e-6)
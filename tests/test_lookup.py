@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from smartcalc_core import batch
+from smartcalc_core.lookup import LookupTables, get_tables
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return get_tables()
+
+
+def test_scalar_queries_on_and_off_grid(tables):
+    assert tables.pimax("Masculino", 40) == pytest.approx(batch.calculate_predicted_pimax("Masculino", 40))
+    # Idade 10 fica fora da grade (18-100): cálculo direto
+    assert tables.pimax("Masculino", 10) == pytest.approx(batch.calculate_predicted_pimax("Masculino", 10))
+    assert np.isnan(tables.pemax("Outro", 40))
+    assert tables.rox_index(95, 0.405, 22) == pytest.approx(95 / 0.405 / 22)
+
+
+def test_arrays_match_batch(tables):
+    rng = np.random.default_rng(0)
+    spo2 = rng.integers(0, 101, 1000)
+    fio2 = np.round(rng.uniform(0.15, 1.05, 1000), 2)  # parte fora da grade
+    fr = rng.integers(-5, 106, 1000)
+    np.testing.assert_array_equal(tables.rox_index(spo2, fio2, fr), batch.calculate_rox_index(spo2, fio2, fr))
+    gender = rng.choice(["Masculino", "Feminino", "Homem", "Mulher", ""], 1000)
+    age, aj = rng.integers(0, 110, 1000), rng.uniform(0, 100, 1000)
+    np.testing.assert_array_equal(
+        tables.height_chumlea(gender, age, aj), batch.calculate_height_chumlea(gender, age, aj)
+    )
+
+
+def test_save_and_load(tmp_path, tables):
+    path = str(tmp_path / "lookup.npz")
+    tables.save(path)
+    loaded = LookupTables.load(path)
+    np.testing.assert_array_equal(loaded.ideal_weight.values, tables.ideal_weight.values)
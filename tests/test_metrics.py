@@ -0,0 +1,81 @@
+import pytest
+
+from smartcalc_core import metrics
+from smartcalc_core.metrics import Counter, Histogram
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    # Métricas novas para cada teste, sem mexer nas do processo
+    names = ("CALLS", "ERRORS", "LATENCY", "BLOCK_LATENCY", "BLOCK_ERRORS", "RERUN_LATENCY")
+    for name in names:
+        old = getattr(metrics, name)
+        monkeypatch.setattr(metrics, name, type(old)(old.name, old.help, old.label))
+    monkeypatch.setattr(metrics, "METRICS", tuple(getattr(metrics, name) for name in names))
+    return metrics
+
+
+def rox(spo2, fio2, fr):
+    return spo2 / fio2 / fr
+
+
+def test_counter_and_histogram():
+    counter = Counter("calls_total", "Chamadas.", "formula")
+    counter.inc("rox")
+    counter.inc("rox", 2)
+    assert counter.expose()[-1] == 'calls_total{formula="rox"} 3'
+
+    histogram = Histogram("seconds", "Duração.", "formula", buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 5.0):
+        histogram.observe("rox", seconds)
+    assert histogram.expose()[2:] == [
+        'seconds_bucket{formula="rox",le="0.1"} 1',
+        'seconds_bucket{formula="rox",le="1"} 2',
+        'seconds_bucket{formula="rox",le="+Inf"} 3',
+        'seconds_sum{formula="rox"} 5.55',
+        'seconds_count{formula="rox"} 3',
+    ]
+
+
+def test_enabled_records_calls_errors_and_latency(fresh, monkeypatch):
+    monkeypatch.setattr(fresh, "ENABLED", True)
+    wrapped = fresh.instrument(rox)
+    assert wrapped is not rox
+    assert wrapped(95, 0.4, 22) == rox(95, 0.4, 22)
+    with pytest.raises(ZeroDivisionError):
+        wrapped(95, 0, 22)
+    assert fresh.CALLS._values == {"rox": 2}
+    assert fresh.ERRORS._values == {"rox": 1}
+    assert fresh.LATENCY._values["rox"][-1] == 2
+
+
+def test_enabled_counts_invalid_results_as_errors(fresh, monkeypatch):
+    monkeypatch.setattr(fresh, "ENABLED", True)
+    fresh.instrument(lambda: (None, "erro"), name="pao2_fio2")()
+    fresh.instrument(lambda: None, name="pimax")()
+    fresh.instrument(lambda: (1.0, None), name="ok")()
+    assert fresh.ERRORS._values == {"pao2_fio2": 1, "pimax": 1}
+
+
+def test_enabled_instruments_blocks(fresh, monkeypatch):
+    monkeypatch.setattr(fresh, "ENABLED", True)
+
+    @fresh.instrument_block
+    def render_rox_index():
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        render_rox_index()
+    assert fresh.BLOCK_ERRORS._values == {"rox_index": 1}
+    assert fresh.BLOCK_LATENCY._values["rox_index"][-1] == 1
+    assert 'smartcalc_calculator_errors_total{calculator="rox_index"} 1' in fresh.render()
+
+
+def test_disabled_records_nothing(fresh, monkeypatch):
+    monkeypatch.setattr(fresh, "ENABLED", False)
+    # Desligado, os decoradores devolvem a própria função
+    assert fresh.instrument(rox) is rox
+    assert fresh.instrument_block(rox) is rox
+    rox(95, 0.4, 22)
+    for metric in (fresh.CALLS, fresh.ERRORS, fresh.LATENCY, fresh.BLOCK_LATENCY, fresh.BLOCK_ERRORS):
+        assert metric._values == {}
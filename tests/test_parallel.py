@@ -0,0 +1,36 @@
+import numpy as np
+
+from smartcalc_core.batch import compute_table
+from smartcalc_core.parallel import _shard_bounds, compute_table_parallel
+
+
+def table(rows, rng):
+    return {
+        "spo2": rng.uniform(80, 100, rows),
+        "fio2": rng.choice([0.0, 0.21, 0.4, 0.6], rows),
+        "rr": rng.uniform(10, 40, rows),
+        "tidal_volume": rng.uniform(200, 600, rows),
+        "peak_pressure": rng.uniform(20, 40, rows),
+        "plateau_pressure": rng.uniform(15, 30, rows),
+        "peep": rng.uniform(5, 15, rows),
+        "flow": rng.choice([0.0, 40.0, 60.0], rows),
+    }
+
+
+def test_parallel_matches_compute_table():
+    rng = np.random.default_rng(0)
+    data = table(5000, rng)
+    patients = rng.integers(0, 50, 5000)  # fora de ordem
+    result = compute_table_parallel(data, patient_ids=patients, workers=2)
+    expected = compute_table(data)
+    assert result.keys() == expected.keys()
+    for name in expected:
+        np.testing.assert_array_equal(result[name], expected[name])
+
+
+def test_shards_do_not_split_patients():
+    patients = np.repeat(np.arange(10), 37)
+    bounds = _shard_bounds(len(patients), 8, patients)
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(patients)
+    for lo, hi in bounds[1:]:
+        assert patients[lo] != patients[lo - 1]
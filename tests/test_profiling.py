@@ -0,0 +1,124 @@
+import importlib
+import sys
+import threading
+import time
+
+import pytest
+
+from smartcalc_core import profiling
+
+
+def busy(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def render_busy(seconds):
+    busy(seconds)
+
+
+@pytest.fixture
+def sampler(tmp_path):
+    return profiling.Sampler(interval=0.002, output=str(tmp_path / "out.folded"))
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_completed_run_is_aggregated(sampler):
+    def run():
+        sampler.watch(sys._getframe())
+        render_busy(0.1)
+        sampler.unwatch("Menu")
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert sampler._watched == {}
+    assert sampler.reruns == 1
+    assert any(key.startswith("Menu;render_busy;") for key in sampler.counts)
+
+
+def test_interrupted_run_is_removed(sampler):
+    class Rerun(Exception):
+        pass
+
+    def script():
+        sampler.watch(sys._getframe())
+        render_busy(0.1)
+        raise Rerun  # sai sem chamar unwatch
+
+    def run():
+        try:
+            script()
+        except Rerun:
+            pass
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    wait_until(lambda: not sampler._watched)
+    assert sampler.reruns == 1
+    assert all(key.startswith(profiling.INTERRUPTED + ";") for key in sampler.counts)
+    assert any(";render_busy;" in key for key in sampler.counts)
+
+
+def test_next_run_on_same_thread_replaces_stale_entry(sampler):
+    def script(finish):
+        sampler.watch(sys._getframe())
+        if finish:
+            sampler.unwatch("Menu")
+
+    def run():
+        script(finish=False)
+        script(finish=True)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert sampler._watched == {}
+    assert sampler.reruns == 2
+
+
+def test_flush_writes_folded_file(sampler):
+    sampler.counts = {"Menu;-;a.py:f": 3}
+    sampler.flush()
+    with open(sampler.output) as f:
+        assert f.read() == "Menu;-;a.py:f 3\n"
+
+
+def test_late_unwatch_after_interrupted_is_not_counted(sampler):
+    thread_id = threading.get_ident()
+    sampler._watched[thread_id] = (sys._getframe(), {})
+    with sampler._lock:
+        sampler._finish(thread_id, profiling.INTERRUPTED)
+    sampler.unwatch("Menu")
+    assert sampler.reruns == 1
+
+
+@pytest.mark.parametrize("env, enabled, rate, interval", [
+    ({}, False, 0.0, profiling.DEFAULT_INTERVAL),
+    ({"SMARTCALC_PROFILE": ""}, True, 0.0, profiling.DEFAULT_INTERVAL),
+    ({"SMARTCALC_PROFILE": "0.05", "SMARTCALC_PROFILE_INTERVAL": "0.002"}, True, 0.05, 0.002),
+    ({"SMARTCALC_PROFILE": "abc"}, False, 0.0, profiling.DEFAULT_INTERVAL),
+    ({"SMARTCALC_PROFILE": "nan"}, False, 0.0, profiling.DEFAULT_INTERVAL),
+    ({"SMARTCALC_PROFILE": "1", "SMARTCALC_PROFILE_INTERVAL": "rápido"}, False, 1.0, profiling.DEFAULT_INTERVAL),
+    ({"SMARTCALC_PROFILE": "1", "SMARTCALC_PROFILE_INTERVAL": "0"}, False, 1.0, profiling.DEFAULT_INTERVAL),
+])
+def test_settings_from_environment(monkeypatch, capsys, env, enabled, rate, interval):
+    for name in ("SMARTCALC_PROFILE", "SMARTCALC_PROFILE_INTERVAL"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    try:
+        module = importlib.reload(profiling)
+        assert (module.ENABLED, module.RATE, module.INTERVAL) == (enabled, rate, interval)
+        assert ("profiling desativado" in capsys.readouterr().err) == (bool(env) and not enabled)
+    finally:
+        monkeypatch.undo()
+        importlib.reload(profiling)
@@ -0,0 +1,38 @@
+import pytest
+
+from smartcalc_core import batch, formulas
+from smartcalc_core.registry import FORMULAS, RANGES, to_formula_units, validate
+
+
+@pytest.mark.parametrize("name", sorted(FORMULAS))
+def test_functions_exist_in_both_paths(name):
+    formula = FORMULAS[name]
+    assert callable(getattr(formulas, formula.function))
+    assert callable(getattr(batch, formula.function))
+    assert formula.title and formula.output
+    assert len(RANGES[name]) == len(formula.inputs)
+
+
+def test_widget_keys_are_unique():
+    keys = [item.key for formula in FORMULAS.values() for item in formula.inputs]
+    assert len(keys) == len(set(keys))
+
+
+def test_validate_ranges():
+    formula = FORMULAS["mechanical_power"]
+    assert validate(formula, [20, 500, 30, 10]) == []
+    errors = validate(formula, [20, 5000, 30, 10])
+    assert len(errors) == 1 and "Volume Corrente" in errors[0]
+    # Textos e NaN ficam para a checagem de tipo de quem chama
+    assert validate(formula, ["", float("nan"), 30, 10]) == []
+
+
+def test_unit_conversion():
+    assert to_formula_units(FORMULAS["mechanical_power"], [20, 500, 30, 10]) == [20, 0.5, 30, 10]
+    assert to_formula_units(FORMULAS["rox_index"], [95, 0.4, 22]) == [95, 0.4, 22]
+
+
+def test_option_ranges():
+    # Sem faixa declarada, vale a das opções do selectbox (idade adulta)
+    assert RANGES["pimax"][1] == (18, 100)
+    assert RANGES["pimax"][0] == (None, None)
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from smartcalc_core import sessions
+from smartcalc_core.sessions import MemoryBackend, SQLiteBackend, create_backend
+
+
+def now_ms(offset=0.0):
+    return int((time.time() + offset) * 1000)
+
+
+def test_sqlite_round_trip(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    backend = SQLiteBackend(path)
+    for i in range(5):
+        backend.append("s1", "oxigenoterapia", "ROX Index", float(i), now_ms() + i)
+    backend.append("s1", "ventilacao_mecanica", "Mechanical Power", 12.0, now_ms())
+    backend.append("s2", "oxigenoterapia", "ROX Index", 99.0, now_ms())
+    # Outro processo (outro objeto) lê os últimos ``capacity`` resultados
+    history = create_backend(f"sqlite:///{path}").history("s1", "oxigenoterapia", capacity=3)
+    assert history.latest("ROX Index", 5) == [4.0, 3.0, 2.0]
+    assert len(SQLiteBackend(path).history("s1", "ventilacao_mecanica")) == 1
+    assert len(SQLiteBackend(path).history("s3", "oxigenoterapia")) == 0
+
+
+def test_sqlite_prune(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "sessions.db"))
+    backend.append("s1", "oxigenoterapia", "ROX Index", 1.0, now_ms(-7200))
+    backend.append("s1", "oxigenoterapia", "ROX Index", 2.0, now_ms())
+    assert backend.prune(3600) == 1
+    assert backend.history("s1", "oxigenoterapia").latest("ROX Index") == [2.0]
+
+
+def test_sqlite_prunes_on_open_and_periodically(tmp_path, monkeypatch):
+    path = str(tmp_path / "sessions.db")
+    SQLiteBackend(path).append("s1", "oxigenoterapia", "ROX Index", 1.0, now_ms(-7200))
+    backend = SQLiteBackend(path, max_age=3600)
+    assert len(backend.history("s1", "oxigenoterapia")) == 0
+
+    backend.append("s1", "oxigenoterapia", "ROX Index", 2.0, now_ms(-7200))
+    assert len(backend.history("s1", "oxigenoterapia")) == 1
+    # Passado o intervalo, a gravação seguinte apaga os antigos
+    monkeypatch.setattr(sessions, "PRUNE_INTERVAL", 0)
+    backend.append("s1", "oxigenoterapia", "ROX Index", 3.0, now_ms())
+    assert backend.history("s1", "oxigenoterapia").latest("ROX Index") == [3.0]
+
+
+def test_memory_backend_keeps_history_objects():
+    backend = MemoryBackend()
+    history = backend.history("s1", "oxigenoterapia", capacity=2)
+    history.record("ROX Index", 1.0)
+    assert backend.history("s1", "oxigenoterapia") is history
+    assert backend.history("s1", "forca_inspiratoria") is not history
+
+
+def test_memory_backend_cap_drops_least_recent_session():
+    backend = MemoryBackend(max_sessions=2)
+    first = backend.history("s1", "oxigenoterapia")
+    backend.history("s2", "oxigenoterapia")
+    backend.history("s1", "oxigenoterapia")  # s1 volta a ser a mais recente
+    backend.history("s3", "oxigenoterapia")
+    assert list(backend._sessions) == ["s1", "s3"]
+    assert backend.history("s1", "oxigenoterapia") is first
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_backend("redis://localhost")
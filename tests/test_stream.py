@@ -0,0 +1,98 @@
+import csv
+import math
+
+import pytest
+
+from smartcalc_core.stream import _parse_floats, main, process_csv, process_parquet
+
+
+def write_csv(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_derived_columns(tmp_path):
+    src = write_csv(tmp_path / "in.csv", [
+        "peak_pressure,plateau_pressure,peep,flow,tidal_volume,rr",
+        "32,24,8,60,400,20",
+        "30,20,20,0,450,18",
+    ])
+    dst = str(tmp_path / "out.csv")
+    assert process_csv(src, dst, chunk_size=1) == 2
+    header, first, second = read_csv(dst)
+    assert header[6:] == ["driving_pressure", "static_compliance", "resistance", "time_constant", "mechanical_power"]
+    assert [float(v) for v in first[6:9]] == [16, 25, 8]
+    # Platô igual à PEEP e fluxo zero: Cst e Rva vazias
+    assert second[7:10] == ["", "", ""]
+
+
+def test_ragged_rows_and_unparseable_cells(tmp_path, capsys):
+    src = write_csv(tmp_path / "in.csv", [
+        "id,plateau_pressure,peep,tidal_volume",
+        "1,24,8,400",
+        "2,24",
+        "3,NA,8,400",
+        "4,24,8,400,extra",
+        "5,-,8,400",
+    ])
+    dst = str(tmp_path / "out.csv")
+    assert process_csv(src, dst) == 5
+    header, *rows = read_csv(dst)
+    assert header == ["id", "plateau_pressure", "peep", "tidal_volume", "driving_pressure", "static_compliance"]
+    assert all(len(row) == len(header) for row in rows)
+    assert rows[0][4:] == ["16", "25"]
+    assert rows[1] == ["2", "24", "", "", "", ""]
+    assert rows[2][4:] == ["", ""]
+    assert rows[3] == ["4", "24", "8", "400", "16", "25"]
+    err = capsys.readouterr().err
+    assert "linha 3: 2 linha(s)" in err
+    assert "linha 4: 2 valor(es) não numérico(s) na coluna 'plateau_pressure'" in err
+
+
+def test_row_number_in_csv_errors(tmp_path):
+    src = write_csv(tmp_path / "in.csv", ["peep,plateau_pressure", "5,20", "5," + "2" * 100])
+    limit = csv.field_size_limit(50)
+    try:
+        with pytest.raises(ValueError, match="linha 3"):
+            process_csv(src, str(tmp_path / "out.csv"))
+    finally:
+        csv.field_size_limit(limit)
+
+
+@pytest.mark.parametrize("chunk_size", [0, -1])
+def test_invalid_chunk_size(tmp_path, chunk_size):
+    src = write_csv(tmp_path / "in.csv", ["peep,plateau_pressure", "5,20"])
+    dst = tmp_path / "out.csv"
+    with pytest.raises(ValueError, match="pelo menos uma linha"):
+        process_csv(src, str(dst), chunk_size=chunk_size)
+    # Recusado antes de abrir a saída
+    assert not dst.exists()
+    with pytest.raises(ValueError, match="pelo menos uma linha"):
+        process_parquet(str(tmp_path / "in.parquet"), str(tmp_path / "out.parquet"), chunk_size=chunk_size)
+
+
+@pytest.mark.parametrize("chunk_size", ["0", "-5", "abc"])
+def test_cli_rejects_invalid_chunk_size(tmp_path, capsys, chunk_size):
+    src = write_csv(tmp_path / "in.csv", ["peep,plateau_pressure", "5,20"])
+    with pytest.raises(SystemExit) as error:
+        main([src, str(tmp_path / "out.csv"), "--chunk-size", chunk_size])
+    assert error.value.code == 2
+    assert "--chunk-size" in capsys.readouterr().err
+
+
+def test_empty_file(tmp_path):
+    src = tmp_path / "in.csv"
+    src.write_text("")
+    assert process_csv(str(src), str(tmp_path / "out.csv")) == 0
+
+
+def test_parse_floats():
+    values, invalid = _parse_floats(["1.5", "", "NA", "2"])
+    assert values[0] == 1.5 and values[3] == 2
+    assert math.isnan(values[1]) and math.isnan(values[2])
+    assert invalid == [2]
@@ -0,0 +1,49 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from smartcalc_core import formulas
+from smartcalc_core.sweep import sweep, tidal_volumes, to_records
+
+
+def test_grid_matches_scalar_formulas():
+    rr, vt, peep, plateau = [10, 20, 35], [300, 450.5], [5, 10, 15], [10, 15, 28]
+    grid = sweep(rr, vt, peep, plateau, resistive_pressure=4.0)
+    assert grid["mechanical_power"].shape == (3, 2, 3, 3)
+    assert grid["driving_pressure"].shape == (3, 3)
+    for (i, r), (j, v), (k, p), (m, pl) in itertools.product(*map(enumerate, (rr, vt, peep, plateau))):
+        dp = formulas.calculate_driving_pressure(pl, p)
+        if dp <= 0:
+            # Platô igual à PEEP (ΔP zero) ou abaixo dela: sem valor
+            assert np.isnan(grid["driving_pressure"][k, m])
+            assert np.isnan(grid["mechanical_power"][i, j, k, m])
+            continue
+        assert grid["driving_pressure"][k, m] == pytest.approx(dp)
+        expected = formulas.calculate_mechanical_power(r, v / 1000, pl + 4.0, dp)
+        assert grid["mechanical_power"][i, j, k, m] == pytest.approx(expected)
+
+
+def test_zero_driving_pressure_is_nan_without_warnings():
+    with np.errstate(all="raise"):
+        grid = sweep([20], [500], [10], [10])
+    assert np.isnan(grid["mechanical_power"]).all()
+    assert np.isnan(grid["driving_pressure"]).all()
+
+
+def test_axes_are_returned_flat():
+    grid = sweep(np.arange(10, 13), [400, 500], 5, [20, 25])
+    np.testing.assert_array_equal(grid["rr"], [10, 11, 12])
+    np.testing.assert_array_equal(grid["tidal_volume"], [400, 500])
+    np.testing.assert_array_equal(grid["peep"], [5])
+
+
+def test_tidal_volumes():
+    weight = formulas.calculate_ideal_weight("Feminino", 160)
+    np.testing.assert_allclose(tidal_volumes("Feminino", 160, (6, 8)), [6 * weight, 8 * weight])
+    assert len(tidal_volumes("Outro", 160)) == 0
+
+
+def test_to_records():
+    records = to_records("PEEP", [5, 10], "Platô", [20], [[15.0], [10.0]], "ΔP")
+    assert records == [{"PEEP": 5, "Platô": 20, "ΔP": 15.0}, {"PEEP": 10, "Platô": 20, "ΔP": 10.0}]
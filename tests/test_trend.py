@@ -0,0 +1,51 @@
+import random
+import statistics
+
+import pytest
+
+from smartcalc_core.trend import RollingStats, TrendEngine
+
+
+def reference_slope(points):
+    ts, xs = zip(*points)
+    return statistics.linear_regression(ts, xs).slope
+
+
+@pytest.mark.parametrize("window, span", [(20, None), (500, 30.0), (7, 5.0)])
+def test_rolling_stats_match_statistics(window, span):
+    rng = random.Random(window)
+    stats = RollingStats(window, span)
+    points = []
+    t = 1_700_000_000.0  # instantes grandes, como time.time()
+    for _ in range(3000):
+        t += rng.uniform(0.5, 3.0)
+        x = rng.gauss(40, 8)
+        stats.push(t, x)
+        points.append((t, x))
+        points = [(pt, px) for pt, px in points[-window:] if span is None or t - pt <= span]
+        xs = [px for _, px in points]
+        assert len(stats) == len(points)
+        assert stats.mean == pytest.approx(statistics.fmean(xs), rel=1e-9)
+        assert stats.min == min(xs)
+        assert stats.max == max(xs)
+        if len(points) >= 2:
+            assert stats.slope == pytest.approx(reference_slope(points), rel=1e-6, abs=1e-9)
+
+
+def test_nan_and_none_are_ignored():
+    stats = RollingStats(5)
+    stats.push(0, 1.0)
+    stats.push(1, None)
+    stats.push(2, float("nan"))
+    assert len(stats) == 1
+    assert stats.slope is None
+
+
+def test_engine_skips_undefined_metrics():
+    engine = TrendEngine(window=10)
+    engine.update("1", peak_pressure=30, plateau_pressure=10, peep=10, flow=0, tidal_volume=400, rr=20, t=0)
+    summary = engine.summary("1")
+    # Platô igual à PEEP e fluxo zero: Cst e Rva indefinidas
+    assert summary["static_compliance"]["count"] == 0
+    assert summary["resistance"]["count"] == 0
+    assert summary["driving_pressure"]["mean"] == 0
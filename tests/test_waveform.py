@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from smartcalc_core.waveform import WaveformChannel, analyze, synthesize
+
+
+@pytest.mark.parametrize("resistance, compliance", [(10, 50), (5, 80), (20, 30)])
+def test_recovers_resistance_and_compliance(resistance, compliance):
+    pressure, flow = synthesize(10, 100, resistance=resistance, compliance=compliance)
+    results = analyze(pressure, flow, fs=100)
+    # O primeiro ciclo começa na amostra 0, sem cruzamento do limiar
+    assert len(results["start"]) == 8
+    np.testing.assert_allclose(results["compliance_fit"], compliance, rtol=1e-6)
+    np.testing.assert_allclose(results["resistance_fit"], resistance, rtol=1e-6)
+    np.testing.assert_allclose(results["static_compliance"], compliance, rtol=1e-6)
+    np.testing.assert_allclose(results["tidal_volume"], 500, rtol=1e-6)
+    np.testing.assert_allclose(results["peep"], 5, atol=1e-3)
+    # O pico amostrado fica uma amostra antes do fim da inspiração
+    np.testing.assert_allclose(results["resistance"], resistance, rtol=0.05)
+
+
+def test_recovers_with_noise():
+    pressure, flow = synthesize(20, 200, resistance=12, compliance=40, noise=0.2, rng=np.random.default_rng(0))
+    results = analyze(pressure, flow, fs=200)
+    assert np.median(results["compliance_fit"]) == pytest.approx(40, rel=0.02)
+    assert np.median(results["resistance_fit"]) == pytest.approx(12, rel=0.02)
+
+
+def test_without_pause_plateau_is_nan():
+    pressure, flow = synthesize(5, 100, pause=0.0)
+    results = analyze(pressure, flow, fs=100)
+    assert np.isnan(results["plateau_pressure"]).all()
+    assert np.isnan(results["static_compliance"]).all()
+    np.testing.assert_allclose(results["tidal_volume"], 500, rtol=1e-6)
+
+
+def test_without_expiratory_flow():
+    # Sinal retificado: o fluxo nunca fica abaixo de -limiar
+    pressure, flow = synthesize(5, 100)
+    results = analyze(pressure, np.maximum(flow, 0), fs=100)
+    assert len(results["start"]) == 3
+    np.testing.assert_allclose(results["tidal_volume"], 500, rtol=1e-6)
+    assert np.isfinite(results["plateau_pressure"]).all()
+
+
+def test_channel_matches_whole_signal():
+    pressure, flow = synthesize(8, 100)
+    channel = WaveformChannel(fs=100)
+    chunks = [channel.push(pressure[i:i + 37], flow[i:i + 37]) for i in range(0, len(pressure), 37)]
+    whole = analyze(pressure, flow, fs=100)
+    np.testing.assert_array_equal(np.concatenate([c["start"] for c in chunks]), whole["start"])
+    np.testing.assert_allclose(np.concatenate([c["compliance_fit"] for c in chunks]), whole["compliance_fit"])
+
+
+def test_short_signal_is_empty():
+    results = analyze(np.zeros(10), np.zeros(10), fs=100)
+    assert all(len(values) == 0 for values in results.values())